@@ -0,0 +1,234 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import router
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from ..models import CustomUser, Profile
+from ..revocation import get_revocation_list
+
+# Claims `CustomTokenObtainPairSerializer.get_token` adds for `ClaimsUser`.
+USER_CLAIMS = ("email", "profile_id", "is_staff", "is_superuser", "is_verified")
+
+
+class ClaimsUser(TokenUser):
+    '''
+    Request user backed by the access token's claims.
+
+    `id`, `email`, `profile_id`, `is_staff`, `is_superuser` and `is_verified`
+    come from the token, and `profile` is a `Profile` holding only its id and user, so
+    authenticating and the usual permission and ownership checks cost no
+    queries. Everything else (`check_password`, `save`, other fields, ...)
+    goes to the `CustomUser` row, loaded on first use, so writes always start
+    from the current row rather than from the claims.
+
+    Claims are as old as the token, so changing `is_active`, `is_staff`,
+    `is_superuser` or `is_verified` revokes the user's tokens (see
+    `accounts.signals`).
+    '''
+
+    @cached_property
+    def email(self):
+        return self.token["email"]
+
+    @cached_property
+    def profile_id(self):
+        return self.token["profile_id"]
+
+    @cached_property
+    def is_staff(self):
+        return self.token["is_staff"]
+
+    @cached_property
+    def is_verified(self):
+        return self.token["is_verified"]
+
+    @cached_property
+    def is_superuser(self):
+        return self.token["is_superuser"]
+
+    @cached_property
+    def user(self):
+        try:
+            return CustomUser.objects.get(pk=self.id)
+        except CustomUser.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    @cached_property
+    def profile(self):
+        # Deferred instances: other fields load on access, `save()` writes
+        # only the loaded ones.
+        user = CustomUser.from_db(router.db_for_read(CustomUser), ["id", "email"], [self.id, self.email])
+        profile = Profile.from_db(router.db_for_read(Profile), ["id", "user_id"], [self.profile_id, self.id])
+        Profile.user.field.set_cached_value(profile, user)
+        Profile.user.field.remote_field.set_cached_value(user, profile)
+        return profile
+
+    def __str__(self):
+        return self.email
+
+    def __eq__(self, other):
+        if isinstance(other, CustomUser):
+            return self.id == other.pk
+        return super().__eq__(other)
+
+    __hash__ = TokenUser.__hash__
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") or attr == "token":
+            raise AttributeError(attr)
+        return getattr(self.user, attr)
+
+    def save(self, *args, **kwargs):
+        self.user.save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self.user.delete(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        self.user.set_password(raw_password)
+
+    def check_password(self, raw_password):
+        return self.user.check_password(raw_password)
+
+    @property
+    def groups(self):
+        return self.user.groups
+
+    @property
+    def user_permissions(self):
+        return self.user.user_permissions
+
+    def get_group_permissions(self, obj=None):
+        return self.user.get_group_permissions(obj)
+
+    def get_all_permissions(self, obj=None):
+        return self.user.get_all_permissions(obj)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.user.has_module_perms(module)
+
+    def get_username(self):
+        return self.email
+
+
+class TokenCache:
+    '''
+    Thread-safe LRU of validated tokens, keyed by a SHA-256 digest of the raw
+    token so the tokens themselves aren't kept, holding at most `maxsize`
+    entries (0 disables it). An entry is served until the token's `exp`.
+    `hits` and `misses` count lookups.
+    '''
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, raw_token):
+        key = self.key(raw_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                token, expires = entry
+                if expires > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return token
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, raw_token, token):
+        expires = token.get("exp")
+        if not self.maxsize or expires is None:
+            return
+        key = self.key(raw_token)
+        with self._lock:
+            self._entries[key] = (token, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _token_cache
+    with _token_cache_lock:
+        if _token_cache is None:
+            _token_cache = TokenCache(**getattr(settings, "JWT_TOKEN_CACHE", {}))
+        return _token_cache
+
+
+class JWTClaimsAuthentication(JWTAuthentication):
+    '''
+    `JWTAuthentication` without the user query: tokens carrying the
+    `USER_CLAIMS` authenticate as a `ClaimsUser`. Tokens issued before those
+    claims existed still load the user from the database.
+
+    Validated tokens are kept in the process-wide `TokenCache`, so a token
+    sent again skips decoding and signature verification. Revocation is
+    checked on every request, see `accounts.revocation`.
+    '''
+
+    def get_validated_token(self, raw_token):
+        cache = get_token_cache()
+        token = cache.get(raw_token)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            cache.set(raw_token, token)
+        if get_revocation_list().is_revoked(token):
+            raise InvalidToken(_("Token has been revoked"))
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM in validated_token and all(
+            claim in validated_token for claim in USER_CLAIMS
+        ):
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+
+class JWTClaimsScheme(SimpleJWTScheme):
+    # drf-spectacular matches authentication classes exactly.
+    target_class = JWTClaimsAuthentication
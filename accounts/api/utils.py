@@ -1,9 +1,124 @@
+import atexit
 import threading
+import time
 
-class EmailThread(threading.Thread):
-    def __init__(self, email_obj):
-        threading.Thread.__init__(self)
-        self.email_obj = email_obj
-    
-    def run(self):
-        self.email_obj.send()
\ No newline at end of file
+from django.conf import settings
+from django.core.mail import get_connection
+
+
+class EmailConnection:
+    '''
+    One email backend connection per thread, kept open between sends, so a
+    job worker delivering a run of emails pays for the SMTP handshake once.
+
+    A connection unused for `idle_timeout` seconds is replaced, servers drop
+    idle sessions. A send that fails on a reused connection is retried once on
+    a fresh one; a failure on a fresh connection is raised, so the job that
+    sent it is retried by the queue. `close_all()` closes every thread's
+    connection, `get_email_connection` runs it at exit.
+
+    The job queue does the rest: `run_jobs --concurrency` bounds the senders,
+    `--batch-size` claims several email jobs at once, and the "email" queue's
+    `max_backlog` sends inline when workers fall behind (see `jobs.tasks`).
+    `send_total`, `send_max` and `send_avg` in `metrics()` are seconds spent
+    in successful sends.
+    '''
+
+    def __init__(self, idle_timeout=30, backend=None):
+        self.idle_timeout = idle_timeout
+        self.backend = backend
+        self._local = threading.local()
+        self._open = set()
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'sent': 0,
+            'connects': 0,
+            'failed': 0,
+            'send_total': 0.0,
+            'send_max': 0.0,
+        }
+
+    def send(self, email_obj):
+        while True:
+            connection, fresh = self._connection()
+            email_obj.connection = connection
+            started = time.monotonic()
+            try:
+                email_obj.send()
+            except Exception:
+                self._count('failed')
+                self.close()
+                if fresh:
+                    raise
+                continue
+            self._local.used = now = time.monotonic()
+            with self._metrics_lock:
+                self._metrics['sent'] += 1
+                self._metrics['send_total'] += now - started
+                self._metrics['send_max'] = max(self._metrics['send_max'], now - started)
+            return
+
+    def close(self):
+        '''Close this thread's connection.'''
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            self._close(connection)
+
+    def close_all(self):
+        '''Close every thread's connection, e.g. when the worker exits.'''
+        with self._metrics_lock:
+            connections, self._open = self._open, set()
+        for connection in connections:
+            self._close(connection)
+
+    def _close(self, connection):
+        with self._metrics_lock:
+            self._open.discard(connection)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def metrics(self):
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        metrics['send_avg'] = metrics['send_total'] / metrics['sent'] if metrics['sent'] else 0.0
+        return metrics
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None and time.monotonic() - self._local.used < self.idle_timeout:
+            return connection, False
+        self.close()
+        connection = get_connection(self.backend)
+        # Opened here, so `send_messages` leaves it open afterwards.
+        connection.open()
+        self._local.connection = connection
+        self._local.used = time.monotonic()
+        with self._metrics_lock:
+            self._open.add(connection)
+        self._count('connects')
+        return connection, True
+
+    def _count(self, name):
+        with self._metrics_lock:
+            self._metrics[name] += 1
+
+
+_email_connection = None
+_email_connection_lock = threading.Lock()
+
+
+def get_email_connection():
+    global _email_connection
+    with _email_connection_lock:
+        if _email_connection is None:
+            _email_connection = EmailConnection(**getattr(settings, 'EMAIL_CONNECTION', {}))
+            atexit.register(_email_connection.close_all)
+        return _email_connection
+
+
+def send_email(email_obj):
+    '''Send `email_obj` over the calling thread's reused email connection.'''
+    get_email_connection().send(email_obj)
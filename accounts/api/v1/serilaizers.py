@@ -1,8 +1,11 @@
 from rest_framework import serializers
-from ...models import CustomUser , Profile
+from ...models import CustomUser , Profile, RevokedToken
 from django.core.exceptions import ValidationError
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+from ...revocation import GENERATION_CLAIM, get_revocation_list
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -38,6 +41,16 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         
         token['email'] = user.email 
         token['user_id'] = user.id 
+        # Read by `JWTClaimsAuthentication` instead of loading the user.
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['is_verified'] = user.is_verified
+        # Checked by `accounts.revocation` for "log out everywhere".
+        token[GENERATION_CLAIM] = RevokedToken.objects.generation(user.pk)
+        try:
+            token['profile_id'] = user.profile.pk
+        except Profile.DoesNotExist:
+            pass
         return token
     
     def validate(self, attrs):
@@ -49,6 +62,21 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         validated_data['email'] = self.user.email
         return validated_data
 
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    def validate(self, attrs):
+        if get_revocation_list().is_revoked(RefreshToken(attrs['refresh'])):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e))
+
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = Profile
@@ -0,0 +1,20 @@
+import time
+
+import pytest
+from django.conf import settings
+from django.utils import timezone
+from accounts import revocation
+
+
+@pytest.fixture(autouse=True)
+def revocation_list():
+    # Each process keeps one list, and user ids get reused once a test's
+    # transaction rolls back. Every test starts from an empty table, so start
+    # from an empty list too, already built as in a warmed up process.
+    revocations = revocation.RevocationList(**getattr(settings, "JWT_REVOCATION", {}))
+    revocations.bloom = revocation.BloomFilter(revocations.capacity, revocations.error_rate)
+    revocations.cutoffs, revocations._seen, revocations._read_at = {}, {}, timezone.now()
+    revocations._built_at = revocations._refreshed_at = time.monotonic()
+    revocation._revocations = revocations
+    yield revocations
+    revocation._revocations = None
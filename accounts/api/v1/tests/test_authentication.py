@@ -0,0 +1,214 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.api import authentication
+from accounts.api.authentication import ClaimsUser, TokenCache
+from blog.models import Category, Post
+
+User = get_user_model()
+
+POSTS_URL = reverse("blog:api-v1:post-list")
+
+
+def _user(email="claims@example.com", **extra):
+    return User.objects.create_user(email=email, password="StrongPass!234", is_verified=True, **extra)
+
+
+def _login(client, user):
+    response = client.post(
+        reverse("accounts:api-v1:jwt-create"), {"email": user.email, "password": "StrongPass!234"}, format="json"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def _client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+    return client
+
+
+def _account_queries(captured):
+    # Queries loading users or profiles, joins through them don't count.
+    tables = ('FROM "accounts_customuser"', 'FROM "accounts_profile"')
+    return [q["sql"] for q in captured if any(table in q["sql"] for table in tables)]
+
+
+@pytest.fixture
+def post_of(db):
+    category = Category.objects.create(title="Django", slug="django")
+
+    def create(user, slug):
+        return Post.objects.create(
+            title=slug, slug=slug, content="Content", status="published", category=category, author=user.profile
+        )
+    return create
+
+
+@pytest.mark.django_db
+def test_token_carries_user_claims():
+    user = _user(is_staff=True)
+    tokens = _login(APIClient(), user)
+    access = AccessToken(tokens["access"])
+    assert (access["profile_id"], access["is_staff"], access["is_verified"]) == (user.profile.pk, True, True)
+
+    refreshed = APIClient().post(reverse("accounts:api-v1:jwt-refresh"), {"refresh": tokens["refresh"]}, format="json")
+    assert AccessToken(refreshed.data["access"])["profile_id"] == user.profile.pk
+
+
+@pytest.mark.django_db
+def test_requests_do_not_load_the_user(post_of):
+    user = _user()
+    post_of(user, "mine")
+    client = _client(_login(APIClient(), user)["access"])
+    with CaptureQueriesContext(connection) as captured:
+        assert client.get(POSTS_URL).status_code == status.HTTP_200_OK
+    assert _account_queries(captured) == []
+
+
+@pytest.mark.django_db
+def test_ownership_is_checked_against_claims(post_of):
+    author, other, staff = _user("author@example.com"), _user("other@example.com"), _user("staff@example.com", is_staff=True)
+    post = post_of(author, "owned")
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+
+    response = _client(_login(APIClient(), other)["access"]).patch(url, {"content": "No"}, format="json")
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    for user in (author, staff):
+        client = _client(_login(APIClient(), user)["access"])
+        with CaptureQueriesContext(connection) as captured:
+            response = client.patch(url, {"content": f"By {user.email}"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert _account_queries(captured) == []
+
+
+@pytest.mark.django_db
+def test_create_uses_profile_claim(post_of):
+    user = _user()
+    client = _client(_login(APIClient(), user)["access"])
+    payload = {"title": "Claimed", "content": "Content", "category": {"title": "Django", "slug": "django"}, "tags": []}
+    post_of(user, "existing")
+    with CaptureQueriesContext(connection) as captured:
+        response = client.post(POSTS_URL, payload, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data["author"] == user.email
+    assert Post.objects.get(slug="claimed").author_id == user.profile.pk
+    assert _account_queries(captured) == []
+
+
+@pytest.mark.django_db
+def test_tokens_without_claims_load_the_user():
+    user = _user()
+    client = _client(str(RefreshToken.for_user(user).access_token))
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(reverse("accounts:api-v1:user-profile"))
+    assert response.status_code == status.HTTP_200_OK
+    assert 'FROM "accounts_customuser"' in captured[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_account_views_work_with_claims_user():
+    user = _user()
+    client = _client(_login(APIClient(), user)["access"])
+    assert client.get(reverse("accounts:api-v1:user-profile")).data["id"] == user.profile.pk
+
+    response = client.put(
+        reverse("accounts:api-v1:change-password"),
+        {"old_password": "StrongPass!234", "new_password": "NewStrongPass!567", "confirm_password": "NewStrongPass!567"},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert user.check_password("NewStrongPass!567")
+    assert user.is_verified
+
+
+@pytest.mark.django_db
+def test_claims_user():
+    user = _user(is_staff=True)
+    claims_user = ClaimsUser(AccessToken(_login(APIClient(), user)["access"]))
+    assert claims_user == user
+    assert (claims_user.pk, claims_user.email, claims_user.is_staff) == (user.pk, user.email, True)
+    assert claims_user.is_superuser is False
+    assert "user" not in claims_user.__dict__
+    assert claims_user.profile.user.email == user.email
+    # Fields that aren't claims come from the row.
+    assert claims_user.password == user.password
+
+
+class TestTokenCache:
+    def _token(self, lifetime=60):
+        return {"exp": time.time() + lifetime}
+
+    def test_hits_and_misses(self):
+        cache = TokenCache(maxsize=2)
+        token = self._token()
+        assert cache.get(b"a") is None
+        cache.set(b"a", token)
+        assert cache.get(b"a") is token
+        assert cache.get("a") is token
+        assert cache.metrics() == {"hits": 2, "misses": 1, "size": 1, "maxsize": 2}
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TokenCache(maxsize=2)
+        for raw in (b"a", b"b"):
+            cache.set(raw, self._token())
+        cache.get(b"a")
+        cache.set(b"c", self._token())
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") is not None and cache.get(b"c") is not None
+
+    def test_expired_tokens_are_dropped(self, monkeypatch):
+        cache = TokenCache()
+        cache.set(b"a", self._token(lifetime=10))
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        assert cache.get(b"a") is None
+        assert cache.metrics()["size"] == 0
+
+    def test_disabled(self):
+        cache = TokenCache(maxsize=0)
+        cache.set(b"a", self._token())
+        assert cache.get(b"a") is None
+
+    def test_thread_safe(self):
+        cache = TokenCache(maxsize=50)
+        tokens = [(str(i).encode(), self._token()) for i in range(200)]
+
+        def work():
+            for raw, token in tokens:
+                cache.set(raw, token)
+                found = cache.get(raw)
+                assert found is None or found is token
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = cache.metrics()
+        assert metrics["size"] == 50
+        assert metrics["hits"] + metrics["misses"] == 8 * 200
+
+
+@pytest.mark.django_db
+def test_authentication_reuses_validated_tokens(monkeypatch):
+    cache = TokenCache()
+    monkeypatch.setattr(authentication, "_token_cache", cache)
+    client = _client(_login(APIClient(), _user())["access"])
+    url = reverse("accounts:api-v1:user-profile")
+    for _ in range(3):
+        assert client.get(url).status_code == status.HTTP_200_OK
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    assert _client("not-a-token").get(url).status_code == status.HTTP_401_UNAUTHORIZED
+    assert cache.metrics()["size"] == 1
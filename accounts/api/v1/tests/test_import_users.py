@@ -0,0 +1,119 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from accounts.importer import UserImporter, read_records
+from accounts.models import Profile
+
+User = get_user_model()
+
+CSV = (
+    "email,password,first_name,last_name,is_verified\n"
+    "ada@example.com,secret-1,Ada,Lovelace,true\n"
+    "alan@example.com,secret-2,Alan,Turing,0\n"
+    "not-an-email,secret-3,,,\n"
+    "ada@example.com,secret-4,Ada,Again,\n"
+)
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    return str(path)
+
+
+def _ndjson(n, start=0):
+    return "".join(
+        json.dumps({"email": f"user{i}@example.com", "password_hash": make_password(None), "first_name": f"User {i}"})
+        + "\n"
+        for i in range(start, start + n)
+    )
+
+
+@pytest.mark.django_db
+def test_import_csv(tmp_path):
+    out = io.StringIO()
+    call_command("import_users", _write(tmp_path, "users.csv", CSV), "--workers", "0", stdout=out, stderr=io.StringIO())
+    assert "Imported 2 users" in out.getvalue()
+
+    ada = User.objects.get(email="ada@example.com")
+    assert ada.check_password("secret-1")
+    assert ada.is_verified and not ada.is_staff
+    assert not User.objects.get(email="alan@example.com").is_verified
+    assert Profile.objects.get(user=ada).last_name == "Lovelace"
+    assert Profile.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_import_hashes_in_a_process_pool(tmp_path):
+    call_command("import_users", _write(tmp_path, "users.csv", CSV), "--workers", "2", stdout=io.StringIO(), stderr=io.StringIO())
+    assert User.objects.get(email="alan@example.com").check_password("secret-2")
+
+
+@pytest.mark.django_db
+def test_import_ndjson_with_pre_hashed_passwords(tmp_path):
+    password_hash = make_password("legacy")
+    content = json.dumps({"email": "old@example.com", "password_hash": password_hash, "is_staff": True}) + "\n"
+    content += "not json\n" + json.dumps({"email": "bad@example.com", "password_hash": "plain"}) + "\n"
+    err = io.StringIO()
+    call_command("import_users", _write(tmp_path, "users.ndjson", content), stdout=io.StringIO(), stderr=err)
+
+    user = User.objects.get()
+    assert user.password == password_hash and user.check_password("legacy")
+    assert user.is_staff
+    assert "Line 2" in err.getvalue() and "Line 3" in err.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_skips_existing_users(tmp_path, django_user_model):
+    django_user_model.objects.create_user(email="ada@example.com", password="kept")
+    importer = UserImporter(workers=0)
+    with open(_write(tmp_path, "users.csv", CSV)) as stream:
+        importer.run(read_records(stream, "csv"))
+    assert (importer.imported, importer.skipped, len(importer.errors)) == (1, 2, 1)
+    assert User.objects.get(email="ada@example.com").check_password("kept")
+
+
+@pytest.mark.django_db
+def test_queries_per_batch_are_fixed():
+    def queries(n):
+        records = read_records(io.StringIO(_ndjson(n, start=n)), "ndjson")
+        with CaptureQueriesContext(connection) as captured:
+            UserImporter(batch_size=100, workers=0).run(records)
+        return len(captured)
+
+    # Existing-email lookup and the two bulk inserts, plus savepoint bookkeeping.
+    assert queries(3) == queries(90)
+    assert User.objects.count() == Profile.objects.count() == 93
+
+
+@pytest.mark.django_db
+def test_resume_from_checkpoint(tmp_path):
+    path = _write(tmp_path, "users.ndjson", _ndjson(25))
+    checkpoint = str(tmp_path / "import.checkpoint")
+
+    class Interrupted(Exception):
+        pass
+
+    def interrupt(importer):
+        if importer.checkpoint == 10:
+            raise Interrupted
+
+    with pytest.raises(Interrupted), open(path) as stream:
+        UserImporter(batch_size=10, workers=0, on_batch=interrupt).run(read_records(stream, "ndjson"))
+    assert User.objects.count() == 10
+    with open(checkpoint, "w") as f:
+        json.dump({"source": path, "records": 10}, f)
+
+    out = io.StringIO()
+    call_command("import_users", path, "--checkpoint", checkpoint, "--batch-size", "10", stdout=out)
+    assert "Resuming after 10 records." in out.getvalue()
+    assert "Imported 15 users" in out.getvalue()
+    assert User.objects.count() == 25
+    with open(checkpoint) as f:
+        assert json.load(f)["records"] == 25
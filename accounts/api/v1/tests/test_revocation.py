@@ -0,0 +1,241 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from accounts.models import RevokedToken
+from accounts.revocation import BloomFilter, RevocationList, revoke_user_tokens
+
+User = get_user_model()
+
+PROFILE_URL = reverse("accounts:api-v1:user-profile")
+LOGOUT_URL = reverse("accounts:api-v1:jwt-logout")
+LOGOUT_ALL_URL = reverse("accounts:api-v1:jwt-logout-all")
+REFRESH_URL = reverse("accounts:api-v1:jwt-refresh")
+
+
+def _user(email="revoke@example.com"):
+    return User.objects.create_user(email=email, password="StrongPass!234", is_verified=True)
+
+
+def _login(user):
+    response = APIClient().post(
+        reverse("accounts:api-v1:jwt-create"), {"email": user.email, "password": "StrongPass!234"}, format="json"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.data
+
+
+def _client(tokens):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    return client
+
+
+def _refresh(tokens):
+    return APIClient().post(REFRESH_URL, {"refresh": tokens["refresh"]}, format="json")
+
+
+class TestBloomFilter:
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        keys = [uuid.uuid4().hex for _ in range(1000)]
+        for key in keys:
+            bloom.add(key)
+        assert all(key in bloom for key in keys)
+        assert bloom.count == 1000
+
+    def test_false_positive_rate_is_near_the_target(self):
+        bloom = BloomFilter(5000, 0.01)
+        for _ in range(5000):
+            bloom.add(uuid.uuid4().hex)
+        false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+        assert false_positives / 20000 < 0.02
+
+
+@pytest.mark.django_db
+def test_logout_revokes_access_and_refresh_tokens():
+    tokens = _login(_user())
+    client = _client(tokens)
+    assert client.get(PROFILE_URL).status_code == status.HTTP_200_OK
+
+    response = client.post(LOGOUT_URL, {"refresh": tokens["refresh"]}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refresh(tokens).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_logout_rejects_another_users_refresh_token():
+    tokens, other = _login(_user()), _login(_user("other@example.com"))
+    response = _client(tokens).post(LOGOUT_URL, {"refresh": other["refresh"]}, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert _refresh(other).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_logout_all_revokes_every_session():
+    user = _user()
+    first, second = _login(user), _login(user)
+    assert _client(first).post(LOGOUT_ALL_URL).status_code == status.HTTP_200_OK
+
+    for tokens in (first, second):
+        assert _client(tokens).get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+        assert _refresh(tokens).status_code == status.HTTP_401_UNAUTHORIZED
+    # Within the same second, too: logins carry the new generation.
+    assert _client(_login(user)).get(PROFILE_URL).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_existing_tokens():
+    user = _user()
+    tokens = _login(user)
+    response = _client(tokens).put(
+        reverse("accounts:api-v1:change-password"),
+        {"old_password": "StrongPass!234", "new_password": "NewStrongPass!234", "confirm_password": "NewStrongPass!234"},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert _client(tokens).get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _refresh(tokens).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_password_reset_revokes_tokens_and_the_link():
+    user = _user()
+    tokens = _login(user)
+    reset_token = str(RefreshToken.for_user(user).access_token)
+    url = reverse("accounts:api-v1:password-reset-confirm", kwargs={"token": reset_token})
+    data = {"new_password": "NewStrongPass!234", "confirm_password": "NewStrongPass!234"}
+
+    assert APIClient().post(url, data, format="json").status_code == status.HTTP_200_OK
+    assert _client(tokens).get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+    assert APIClient().post(url, data, format="json").status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_deactivating_a_user_revokes_their_tokens():
+    user = _user()
+    client = _client(_login(user))
+    assert client.get(reverse("blog:api-v1:post-list")).status_code == status.HTTP_200_OK
+
+    user.is_active = False
+    user.save()
+    assert client.get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.get(reverse("blog:api-v1:post-list")).status_code == status.HTTP_401_UNAUTHORIZED
+    assert RevokedToken.objects.filter(user=user).count() == 1
+
+    # Other saves of the inactive user don't revoke again.
+    user.save()
+    assert RevokedToken.objects.filter(user=user).count() == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("field, value", [("is_staff", False), ("is_superuser", False), ("is_verified", False)])
+def test_claim_changes_revoke_tokens(field, value):
+    user = User.objects.create_superuser(email="admin@example.com", password="StrongPass!234")
+    tokens = _login(user)
+    # Saves that keep the claims leave tokens alone.
+    user.last_login = timezone.now()
+    user.save(update_fields=["last_login"])
+    user.save()
+    assert RevokedToken.objects.filter(user=user).count() == 0
+
+    setattr(user, field, value)
+    user.save()
+    # A demoted admin can't refresh into a new token with the old claims.
+    assert _refresh(tokens).status_code == status.HTTP_401_UNAUTHORIZED
+    assert _client(tokens).get(PROFILE_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_claim_changes_on_users_loaded_without_them_revoke_tokens():
+    user = _user()
+    tokens = _login(user)
+    deferred = User.objects.only("email").get(pk=user.pk)
+    deferred.is_staff = True
+    deferred.save()
+    assert _refresh(tokens).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_checking_an_unrevoked_token_costs_no_query():
+    access = AccessToken(_login(_user())["access"])
+    revoke_user_tokens(_user("other@example.com").pk)
+    local = RevocationList(refresh_interval=60)
+    local.rebuild()
+    with CaptureQueriesContext(connection) as captured:
+        assert local.is_revoked(access) is False
+    assert len(captured) == 0
+
+
+@pytest.mark.django_db
+def test_revocations_from_other_processes_apply_after_refresh():
+    user = _user()
+    tokens = _login(user)
+    local = RevocationList(refresh_interval=60)
+    access = AccessToken(tokens["access"])
+    assert local.is_revoked(access) is False
+
+    # Written by another worker: not seen until the next refresh.
+    RevokedToken.objects.create(user=user, jti=access["jti"], expires_at=timezone.now() + timedelta(days=1))
+    assert local.is_revoked(access) is False
+    local._refreshed_at -= 60
+    assert local.is_revoked(access) is True
+    assert local.metrics()["revoked_tokens"] == 1
+
+
+@pytest.mark.django_db
+def test_revocations_committed_out_of_order_are_not_skipped():
+    user = _user()
+    first, second = (AccessToken(_login(user)["access"]) for _ in range(2))
+    local = RevocationList(refresh_interval=60)
+    local.rebuild()
+    expires_at = timezone.now() + timedelta(days=1)
+
+    # Id 11 commits and is read before id 10, revoked a moment earlier, commits.
+    RevokedToken.objects.create(pk=11, user=user, jti=second["jti"], expires_at=expires_at)
+    local._refreshed_at -= 60
+    assert local.is_revoked(second) is True
+    RevokedToken.objects.create(
+        pk=10, user=user, jti=first["jti"], revoked_at=timezone.now() - timedelta(seconds=5), expires_at=expires_at,
+    )
+    local._refreshed_at -= 60
+    assert local.is_revoked(first) is True
+    # Rows read again by the overlapping refreshes are counted once.
+    local._refreshed_at -= 60
+    local.refresh()
+    assert local.metrics()["revoked_tokens"] == 2
+
+
+@pytest.mark.django_db
+def test_bloom_false_positives_are_confirmed_against_the_table():
+    tokens = _login(_user())
+    local = RevocationList()
+    local.rebuild()
+    access = AccessToken(tokens["access"])
+    local.bloom.add(access["jti"])  # pretend its bits were set by other JTIs
+
+    assert local.is_revoked(access) is False
+    assert local.metrics()["false_positives"] == 1
+
+
+@pytest.mark.django_db
+def test_prune_keeps_the_latest_generation():
+    user = _user()
+    expired = timezone.now() - timedelta(seconds=1)
+    RevokedToken.objects.create(user=user, jti="old", expires_at=expired)
+    RevokedToken.objects.create(user=user, generation=1, expires_at=expired)
+    RevokedToken.objects.create(user=user, generation=2, expires_at=expired)
+    RevokedToken.objects.create(user=user, jti="live", expires_at=timezone.now() + timedelta(days=1))
+
+    assert RevokedToken.objects.prune() == 2
+    assert set(RevokedToken.objects.values_list("jti", "generation")) == {(None, 2), ("live", None)}
+    assert revoke_user_tokens(user.pk).generation == 3
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from mail_templated import EmailMessage as TemplatedEmailMessage
+
+from accounts.api.utils import EmailConnection
+
+
+class CountingBackend(EmailBackend):
+    instances = 0
+    closed = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingBackend.instances += 1
+
+    def close(self):
+        CountingBackend.closed += 1
+
+
+class FlakyBackend(CountingBackend):
+    '''Fails its first send, like a session the server dropped.'''
+    failures = 1
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError("SMTP server went away")
+        return super().send_messages(messages)
+
+
+def _message(i=0):
+    return EmailMessage(f"Subject {i}", "Body", "admin@gmail.com", [f"user{i}@example.com"])
+
+
+@pytest.fixture(autouse=True)
+def reset_backends():
+    CountingBackend.instances = CountingBackend.closed = 0
+    FlakyBackend.failures = 1
+
+
+def test_sends_reuse_one_connection():
+    connection = EmailConnection(backend=f"{__name__}.CountingBackend")
+    for i in range(5):
+        connection.send(_message(i))
+    assert len(mail.outbox) == 5
+    assert CountingBackend.instances == 1
+    assert CountingBackend.closed == 0
+    metrics = connection.metrics()
+    assert (metrics["sent"], metrics["connects"], metrics["failed"]) == (5, 1, 0)
+    assert 0 <= metrics["send_max"] <= metrics["send_total"]
+    assert metrics["send_avg"] == pytest.approx(metrics["send_total"] / 5)
+
+
+def test_templated_messages_are_rendered():
+    email_obj = TemplatedEmailMessage(
+        "email/password_reset_email.tpl",
+        {"user": None, "reset_url": "http://testserver/reset/"},
+        "admin@gmail.com",
+        to=["user@example.com"],
+    )
+    EmailConnection().send(email_obj)
+    assert len(mail.outbox) == 1
+    assert "http://testserver/reset/" in mail.outbox[0].body
+
+
+def test_idle_connections_are_replaced():
+    connection = EmailConnection(idle_timeout=0, backend=f"{__name__}.CountingBackend")
+    connection.send(_message(0))
+    connection.send(_message(1))
+    assert CountingBackend.instances == 2
+    assert CountingBackend.closed == 1
+
+
+def test_failure_on_a_reused_connection_is_retried_on_a_fresh_one():
+    connection = EmailConnection(backend=f"{__name__}.CountingBackend")
+    connection.send(_message(0))
+    # The server dropped the session behind the kept connection.
+    connection._local.connection = FlakyBackend()
+    connection.send(_message(1))
+    assert len(mail.outbox) == 2
+    metrics = connection.metrics()
+    assert (metrics["sent"], metrics["connects"], metrics["failed"]) == (2, 2, 1)
+
+
+def test_failure_on_a_fresh_connection_is_raised():
+    connection = EmailConnection(backend=f"{__name__}.FlakyBackend")
+    with pytest.raises(ConnectionError):
+        connection.send(_message())
+    assert mail.outbox == []
+    # The next send starts over.
+    connection.send(_message(1))
+    assert len(mail.outbox) == 1
+
+
+def test_threads_get_their_own_connection():
+    connection = EmailConnection(backend=f"{__name__}.CountingBackend")
+    threads = [threading.Thread(target=connection.send, args=(_message(i),)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(mail.outbox) == 3
+    assert CountingBackend.instances == 3
+
+
+def test_close_all_closes_every_threads_connection():
+    connection = EmailConnection(backend=f"{__name__}.CountingBackend")
+    threads = [threading.Thread(target=connection.send, args=(_message(i),)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connection.close_all()
+    assert CountingBackend.closed == 3
+    connection.close_all()
+    assert CountingBackend.closed == 3
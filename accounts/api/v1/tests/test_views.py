@@ -6,6 +6,8 @@ from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from rest_framework import status
 from accounts.models import Profile
+from django.core import mail
+from jobs.worker import Worker
 
 User = get_user_model()
 
@@ -29,6 +31,24 @@ def test_registration_api_view():
     user_exists = User.objects.filter(email=data['email']).exists()
     assert user_exists
 
+
+@pytest.mark.django_db
+def test_registration_queues_activation_email():
+    client = APIClient()
+    url = reverse("accounts:api-v1:api-register")
+    data = {
+        "email": "queued@example.com",
+        "password": "strongpassword123",
+        "password2": "strongpassword123"
+    }
+    client.post(url, data, format='json')
+    assert mail.outbox == []
+
+    Worker(queues=["email"], burst=True).work()
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].to == [data['email']]
+    assert "activation/confirm/" in mail.outbox[0].message().as_string()
+
 @pytest.mark.django_db
 def test_activation_success():
     user = User.objects.create_user(email="test@example.com", password="testpass")
@@ -1,6 +1,5 @@
 from . import views
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
 
 app_name = "api-v1"
 
@@ -24,7 +23,10 @@ urlpatterns = [
     
     # login jwt
     path("jwt/create/", views.CustomTokenObtainPairView.as_view(), name="jwt-create"),
-    path("jwt/refresh/", TokenRefreshView.as_view(), name="jwt-refresh"),
+    path("jwt/refresh/", views.CustomTokenRefreshView.as_view(), name="jwt-refresh"),
+    # logout
+    path("jwt/logout/", views.LogoutApiView.as_view(), name="jwt-logout"),
+    path("jwt/logout-all/", views.LogoutAllApiView.as_view(), name="jwt-logout-all"),
     # profile endpoint
     path("profile/", views.ProfileApiView.as_view(),name="user-profile"),
     
@@ -1,18 +1,22 @@
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from accounts.models import  Profile
-from ..utils import EmailThread
+from ...tasks import send_activation_email, send_password_reset_email
 from .serilaizers import (ActivationResendSerializer, 
                           ProfileSerializer, 
                           RegistertionSerializer , 
                           PasswordChangeSerializer , 
                           CustomTokenObtainPairSerializer, 
                           PasswordResetRequestSerializer,
-                          PasswordResetConfirmSerializer)
+                          PasswordResetConfirmSerializer,
+                          CustomTokenRefreshSerializer,
+                          LogoutSerializer)
+from ...revocation import get_revocation_list, revoke_token, revoke_user_tokens
 
-from mail_templated import EmailMessage
 from rest_framework import generics
-from rest_framework_simplejwt.views import TokenObtainPairView
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import permissions
 import jwt
@@ -44,14 +48,7 @@ class RegisterationAPIView(generics.CreateAPIView):
         relative_url = reverse("accounts:api-v1:activation", kwargs={"token": token})
         activation_url = self.request.build_absolute_uri(f"{relative_url}?token={token}")
         
-        email_obj = EmailMessage('email/activation_email.tpl',
-                                 {'token': token, 'user': user, 'activation_url':activation_url},
-                                 'admin@gmail.com',
-                                 [user.email]
-        )
-        if email_obj.subject is None:
-            email_obj.subject = "Activate Your Account"
-        EmailThread(email_obj).start()
+        send_activation_email.enqueue(user_id=user.pk, activation_url=activation_url)
         
         headers = self.get_success_headers(serializer.data)
         return Response({'email': user.email, 'message': 'User created. Activation email sent.'},
@@ -102,14 +99,8 @@ class ActivationResendApiView(generics.GenericAPIView):
         base_url = getattr(settings, "BASE_URL", "http://127.0.0.1:8000")
         activation_url = f"{base_url}/accounts/api/v1/activation/confirm/?token={token}"
 
-        # Prepare and send email with activation URL and user context
-        email_obj = EmailMessage(
-            'email/activation_email.tpl',
-            {'activation_url': activation_url, 'user': user_obj},
-            'admin@gmail.com',
-            to=[user_obj.email]
-        )
-        EmailThread(email_obj).start()
+        # Queue the email, a `run_jobs` worker delivers it
+        send_activation_email.enqueue(user_id=user_obj.pk, activation_url=activation_url)
 
         return Response(
             {'detail': 'Activation email resent successfully.'},
@@ -125,13 +116,46 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     '''Custom JWT token view for handling user authentication'''
     serializer_class = CustomTokenObtainPairSerializer
 
+class CustomTokenRefreshView(TokenRefreshView):
+    '''Refresh view that rejects revoked refresh tokens.'''
+    serializer_class = CustomTokenRefreshSerializer
+
+class LogoutApiView(generics.GenericAPIView):
+    '''Revoke the access token of the request and, if given, a refresh token.'''
+    serializer_class = LogoutSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data.get('refresh')
+        if refresh is not None and refresh.get('user_id') != request.user.pk:
+            return Response({"refresh": ["Token belongs to another user."]}, status=status.HTTP_400_BAD_REQUEST)
+        if request.auth is not None:
+            revoke_token(request.auth)
+        if refresh is not None:
+            revoke_token(refresh)
+        return Response({"detail": "Logged out."}, status=status.HTTP_200_OK)
+
+class LogoutAllApiView(generics.GenericAPIView):
+    '''Revoke every token issued to the authenticated user.'''
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=None, responses={200: OpenApiTypes.OBJECT})
+    def post(self, request, *args, **kwargs):
+        revoke_user_tokens(request.user.pk)
+        # In case it predates the generation claim.
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response({"detail": "Logged out everywhere."}, status=status.HTTP_200_OK)
+
 class ProfileApiView(generics.RetrieveUpdateAPIView):
     '''API view to retrieve and update the authenticated user's profile.'''
     serializer_class = ProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
     
     def get_object(self):
-        profile = Profile.objects.get(user=self.request.user)
+        profile = Profile.objects.get(user_id=self.request.user.pk)
         return profile
 
 class PasswordChangeApiView(generics.GenericAPIView):
@@ -155,6 +179,10 @@ class PasswordChangeApiView(generics.GenericAPIView):
             
             user.set_password(serializer.validated_data.get("new_password"))
             user.save()
+            # Sessions opened with the old password end here.
+            revoke_user_tokens(user.pk)
+            if requset.auth is not None:
+                revoke_token(requset.auth)
             
             return Response({"details":"Password changed successfully."}, status=status.HTTP_200_OK)
         
@@ -175,14 +203,7 @@ class PasswordResetRequestApiView(generics.GenericAPIView):
         relative_url = reverse("accounts:api-v1:password-reset-confirm", kwargs={"token": token})
         reset_url = self.request.build_absolute_uri(relative_url)
         
-        email = EmailMessage(
-            'email/password_reset_email.tpl',
-            {'user': user, 'reset_url': reset_url},
-            'admin@gmail.com',
-            to=[user.email]
-        )
-        email.subject = "Password Reset Request"
-        EmailThread(email).start()
+        send_password_reset_email.enqueue(user_id=user.pk, reset_url=reset_url)
         
         return Response({'detail': 'Password reset email has been sent.'}, status=status.HTTP_200_OK)
     
@@ -202,11 +223,18 @@ class PasswordResetConfirmView(generics.GenericAPIView):
         except (jwt.ExpiredSignatureError, jwt.InvalidTokenError , jwt.DecodeError, User.DoesNotExist):
             return Response({"detail": "Invalid or expired token."}, status=status.HTTP_400_BAD_REQUEST)
 
+        if get_revocation_list().is_revoked(payload):
+            return Response({"detail": "Invalid or expired token."}, status=status.HTTP_400_BAD_REQUEST)
+
         serializer = self.get_serializer(data=request.data)
         
         if serializer.is_valid():
             user.set_password(serializer.validated_data['new_password'])
             user.save()
+            # Ends existing sessions and makes the reset link single-use.
+            revoke_user_tokens(user.pk)
+            if 'jti' in payload:
+                revoke_token(payload)
             return Response({"detail": "Password has been reset successfully."}, status=status.HTTP_200_OK)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import django
+from django.contrib.auth.hashers import identify_hasher, is_password_usable, make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from .models import CustomUser, Profile
+
+BOOLEAN_FIELDS = ("is_active", "is_staff", "is_verified")
+PROFILE_FIELDS = ("first_name", "last_name", "bio")
+TRUE_VALUES = {"1", "true", "yes", "y", "t"}
+
+
+def read_records(stream, format):
+    """
+    Yield `(line_number, record)` for each record of a CSV (with a header
+    row) or NDJSON stream, without reading the whole file.
+    """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif format == "ndjson":
+        for line_number, line in enumerate(stream, 1):
+            if line.strip():
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError:
+                    yield line_number, None
+    else:
+        raise ValueError(f"Unknown format '{format}'.")
+
+
+def _init_worker():
+    # Spawned (not forked) workers start without configured settings.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password)
+
+
+class UserImporter:
+    """
+    Creates users and their profiles with one `bulk_create` each per
+    `batch_size` records, in a transaction per batch.
+
+    `bulk_create` doesn't send `post_save`, so `accounts.signals.save_profile`
+    doesn't run and profiles are inserted here instead. Records need an
+    `email`; a plain `password` is hashed in a pool of `workers` processes
+    (inline with `workers=0`), a `password_hash` in any configured hasher's
+    format, or an unusable one, is stored as is, and users with neither get
+    an unusable password.
+    Emails that already exist, or repeat within the input, are skipped.
+
+    `checkpoint` is the number of input records already handled: records up
+    to it are skipped, and `on_batch(importer)` is called after each committed
+    batch so the caller can persist the new value.
+    """
+
+    def __init__(self, batch_size=1000, workers=None, checkpoint=0, on_batch=None):
+        self.batch_size = batch_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.checkpoint = checkpoint
+        self.on_batch = on_batch
+        self.imported = self.skipped = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def run(self, records):
+        records = islice(records, self.checkpoint, None)
+        start = time.perf_counter()
+        pool = ProcessPoolExecutor(self.workers, initializer=_init_worker) if self.workers > 1 else None
+        try:
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch, pool)
+                self.checkpoint += len(batch)
+                self.elapsed = time.perf_counter() - start
+                if self.on_batch is not None:
+                    self.on_batch(self)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.elapsed = time.perf_counter() - start
+        return self.imported
+
+    def parse(self, line_number, record):
+        """A `CustomUser` and `Profile` for `record`, or None (with the error noted) if it's invalid."""
+        if not isinstance(record, dict):
+            self.errors.append((line_number, "Not a JSON object."))
+            return None
+        email = CustomUser.objects.normalize_email((record.get("email") or "").strip())
+        try:
+            validate_email(email)
+        except ValidationError:
+            self.errors.append((line_number, f"Invalid email '{email}'."))
+            return None
+        password_hash = record.get("password_hash")
+        if password_hash and is_password_usable(password_hash):
+            try:
+                identify_hasher(password_hash)
+            except ValueError:
+                self.errors.append((line_number, "Unknown password hash format."))
+                return None
+
+        user = CustomUser(email=email, password=password_hash or "")
+        for field in BOOLEAN_FIELDS:
+            value = record.get(field)
+            if value not in (None, ""):
+                setattr(user, field, value if isinstance(value, bool) else str(value).lower() in TRUE_VALUES)
+        profile = Profile(**{field: record.get(field) or "" for field in PROFILE_FIELDS})
+        profile.bio = profile.bio or None
+        return user, profile, None if password_hash else record.get("password") or None
+
+    def import_batch(self, batch, pool=None):
+        parsed = {}
+        for line_number, record in batch:
+            item = self.parse(line_number, record)
+            if item is None:
+                continue
+            if item[0].email in parsed:
+                self.skipped += 1
+                continue
+            parsed[item[0].email] = item
+
+        existing = set(CustomUser.objects.filter(email__in=list(parsed)).values_list("email", flat=True))
+        self.skipped += len(existing)
+        items = [item for email, item in parsed.items() if email not in existing]
+        if not items:
+            return
+
+        # make_password(None) gives an unusable password.
+        plain = [(user, password) for user, _, password in items if not user.password]
+        passwords = [password for _, password in plain]
+        if pool is not None:
+            hashes = pool.map(_hash, passwords, chunksize=max(1, len(passwords) // (self.workers * 4)))
+        else:
+            hashes = map(_hash, passwords)
+        for (user, _), password_hash in zip(plain, hashes):
+            user.password = password_hash
+
+        users = [user for user, _, _ in items]
+        with transaction.atomic():
+            CustomUser.objects.bulk_create(users)
+            if any(user.pk is None for user in users):
+                # Backends that don't return ids from bulk inserts.
+                emails = [user.email for user in users]
+                ids = dict(CustomUser.objects.filter(email__in=emails).values_list("email", "pk"))
+                for user in users:
+                    user.pk = ids[user.email]
+            profiles = []
+            for user, profile, _ in items:
+                profile.user = user
+                profiles.append(profile)
+            Profile.objects.bulk_create(profiles)
+        self.imported += len(users)
@@ -0,0 +1,113 @@
+import time
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.api import authentication
+from accounts.api.authentication import JWTClaimsAuthentication, TokenCache
+from accounts.api.v1.serilaizers import CustomTokenObtainPairSerializer
+from accounts.models import CustomUser, RevokedToken
+from accounts.revocation import RevocationList
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request JWT authentication overhead: database lookup vs claims, "
+        "with and without the validated token cache, and the revocation check's cost and false "
+        "positive rate. Runs in a rolled back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20000, help="Requests authenticated per measurement.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best one is reported.")
+        parser.add_argument("--revoked", type=int, default=100000, help="Revoked tokens in the revocation list.")
+        parser.add_argument("--probes", type=int, default=1000000, help="Unrevoked JTIs checked against the filter.")
+
+    def handle(self, *args, **options):
+        count, repeat = options["requests"], options["repeat"]
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(email="benchmark@example.com", password="benchmark", is_verified=True)
+            token = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+            request = APIRequestFactory(SERVER_NAME="localhost").get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+            cases = [
+                ("JWTAuthentication (user query)", JWTAuthentication, 0),
+                ("JWTClaimsAuthentication, no cache", JWTClaimsAuthentication, 0),
+                ("JWTClaimsAuthentication, cached", JWTClaimsAuthentication, 10000),
+            ]
+            original = authentication._token_cache
+            try:
+                for label, backend_class, maxsize in cases:
+                    authentication._token_cache = cache = TokenCache(maxsize=maxsize)
+                    backend = backend_class()
+
+                    def run():
+                        for _ in range(count):
+                            backend.authenticate(Request(request))
+
+                    best = None
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        run()
+                        elapsed = time.perf_counter() - start
+                        best = elapsed if best is None else min(best, elapsed)
+                    reset_queries()
+                    with CaptureQueriesContext(connection) as captured:
+                        backend.authenticate(Request(request))
+                    self.stdout.write(
+                        f"{label:<40} {best / count * 1e6:8.1f} us/request "
+                        f"{len(captured):3d} queries  cache hits {cache.hits}, misses {cache.misses}"
+                    )
+            finally:
+                authentication._token_cache = original
+            self.measure_revocation(user, token, count, repeat, options["revoked"], options["probes"])
+            transaction.set_rollback(True)
+
+    def measure_revocation(self, user, token, count, repeat, revoked, probes):
+        expires_at = timezone.now() + timedelta(days=1)
+        RevokedToken.objects.bulk_create(
+            (RevokedToken(user=user, jti=uuid.uuid4().hex, expires_at=expires_at) for _ in range(revoked)),
+            batch_size=5000,
+        )
+        revocations = RevocationList(refresh_interval=3600)
+        start = time.perf_counter()
+        revocations.rebuild()
+        self.stdout.write(
+            f"Revocation list: {revoked} revoked tokens loaded in {(time.perf_counter() - start) * 1e3:.0f} ms, "
+            f"{len(revocations.bloom.bits) / 1024:.0f} KiB filter"
+        )
+
+        access = AccessToken(token)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(count):
+                revocations.is_revoked(access)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            revocations.is_revoked(access)
+        self.stdout.write(f"{'is_revoked, not revoked':<40} {best / count * 1e6:8.1f} us/request {len(captured):3d} queries")
+
+        # The filter is rebuilt with room to grow: the rate is measured at
+        # its current fill and again filled to capacity.
+        bloom = revocations.bloom
+        for label in ("current fill", "at capacity"):
+            if label == "at capacity":
+                for _ in range(bloom.capacity - bloom.count):
+                    bloom.add(uuid.uuid4().hex)
+            false_positives = sum(uuid.uuid4().hex in bloom for _ in range(probes))
+            self.stdout.write(
+                f"False positive rate, {label} ({bloom.count}/{bloom.capacity}): "
+                f"{false_positives / probes:.6f} measured over {probes} unrevoked JTIs, "
+                f"{bloom.expected_error_rate:.6f} expected, target {bloom.error_rate}"
+            )
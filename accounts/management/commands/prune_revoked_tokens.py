@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = "Delete revocations of tokens that have expired anyway. Safe to run from cron."
+
+    def handle(self, *args, **options):
+        deleted = RevokedToken.objects.prune()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired revocations."))
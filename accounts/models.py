@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager , PermissionsMixin)
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 # Create your models here.
@@ -52,6 +53,11 @@ class CustomUser(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    @property
+    def profile_id(self):
+        '''The profile's primary key, as `ClaimsUser` exposes it.'''
+        return self.profile.pk
+
 class Profile(models.Model):
     user = models.OneToOneField(CustomUser, on_delete=models.CASCADE)
     first_name = models.CharField(max_length=250)
@@ -63,3 +69,43 @@ class Profile(models.Model):
     
     def __str__(self):
         return self.user.email
+
+
+class RevokedTokenQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def generation(self, user_id):
+        '''The user's current token generation, 0 if they never logged out everywhere.'''
+        latest = self.filter(user_id=user_id, jti=None).aggregate(models.Max('generation'))
+        return latest['generation__max'] or 0
+
+    def prune(self):
+        '''
+        Delete revocations of tokens that have expired anyway, except each
+        user's latest generation, which the next one counts up from.
+        '''
+        latest = (
+            self.filter(user_id=models.OuterRef('user_id'), jti=None)
+            .order_by('-generation').values('pk')[:1]
+        )
+        expired = self.filter(expires_at__lte=timezone.now())
+        return expired.exclude(jti=None, pk=models.Subquery(latest)).delete()[0]
+
+
+class RevokedToken(models.Model):
+    '''
+    A revoked token (`jti` set) or, with `jti` empty, every token of `user`
+    issued before `generation` (or, for tokens without one, `revoked_at`).
+    Rows are only needed until `expires_at`, see `accounts.revocation`.
+    '''
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='revoked_tokens')
+    jti = models.CharField(max_length=255, null=True, blank=True, unique=True)
+    generation = models.PositiveIntegerField(null=True, blank=True)
+    revoked_at = models.DateTimeField(default=timezone.now, db_index=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = RevokedTokenQuerySet.as_manager()
+
+    def __str__(self):
+        return self.jti or f'{self.user_id} before {self.revoked_at}'
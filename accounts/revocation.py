@@ -0,0 +1,222 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser, RevokedToken
+
+# Claim holding the user's `RevokedToken.objects.generation()` at the time the
+# token was issued.
+GENERATION_CLAIM = 'gen'
+
+
+class BloomFilter:
+    '''
+    Set membership with no false negatives and a false positive rate of about
+    `error_rate` while it holds at most `capacity` keys.
+    '''
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: k positions from the two halves of one digest.
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    @property
+    def expected_error_rate(self):
+        '''False positive rate at the current fill.'''
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    '''
+    Per-process view of the `RevokedToken` table.
+
+    Revoked JTIs go into a `BloomFilter`, so checking a token that isn't
+    revoked, the common case, costs no query; only a filter hit is confirmed
+    against the table. "Every token of this user so far" revocations are few
+    and kept exactly, as user id -> (generation, time): tokens with a
+    `GENERATION_CLAIM` below the generation are revoked, and tokens without
+    one (issued with `RefreshToken.for_user`) if their `iat` is before the
+    time, to the second.
+
+    New rows are pulled by `revoked_at` at most every `refresh_interval`
+    seconds, and everything is reloaded every `rebuild_interval` seconds
+    (dropping expired revocations) or when the filter outgrows its capacity.
+    Revocations made in another process take effect here within
+    `refresh_interval`.
+
+    Rows become visible when they commit, not in id or `revoked_at` order, so
+    each refresh reads back `refresh_overlap` seconds before the previous one;
+    rows already read are skipped. A revocation committed more than that after
+    its `revoked_at` waits for the next rebuild.
+    '''
+
+    def __init__(
+        self, capacity=100000, error_rate=0.001, refresh_interval=2, rebuild_interval=3600, refresh_overlap=60,
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.rebuild_interval = rebuild_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self.filter_hits = self.false_positives = 0
+        self._lock = threading.Lock()
+        self._built_at = self._refreshed_at = None
+
+    def rebuild(self):
+        read_at = timezone.now()
+        active = RevokedToken.objects.active()
+        capacity = max(self.capacity, 2 * active.exclude(jti=None).count())
+        bloom = BloomFilter(capacity, self.error_rate)
+        cutoffs = {}
+        seen = {}
+        since = read_at - self.refresh_overlap
+        for pk, *row in active.values_list(*self.columns):
+            self._add(bloom, cutoffs, *row)
+            if row[-1] >= since:
+                seen[pk] = row[-1]
+        self.bloom, self.cutoffs, self._seen, self._read_at = bloom, cutoffs, seen, read_at
+        self._built_at = self._refreshed_at = time.monotonic()
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._built_at is not None and now - self._refreshed_at < self.refresh_interval:
+            return
+        with self._lock:
+            if self._built_at is None or now - self._built_at >= self.rebuild_interval:
+                self.rebuild()
+                return
+            if now - self._refreshed_at < self.refresh_interval:
+                return
+            read_at = timezone.now()
+            recent = RevokedToken.objects.filter(revoked_at__gte=self._read_at - self.refresh_overlap)
+            since = read_at - self.refresh_overlap
+            # Rows the next refresh reads again, kept so they're added once.
+            seen = {pk: revoked_at for pk, revoked_at in self._seen.items() if revoked_at >= since}
+            for pk, *row in recent.values_list(*self.columns):
+                if pk not in self._seen:
+                    self._add(self.bloom, self.cutoffs, *row)
+                if row[-1] >= since:
+                    seen[pk] = row[-1]
+            self._seen, self._read_at = seen, read_at
+            self._refreshed_at = now
+            if self.bloom.count > self.bloom.capacity:
+                self.rebuild()
+
+    columns = ('pk', 'user_id', 'jti', 'generation', 'revoked_at')
+
+    @staticmethod
+    def _add(bloom, cutoffs, user_id, jti, generation, revoked_at):
+        if jti:
+            bloom.add(jti)
+        else:
+            # Token `iat`s are whole seconds.
+            cutoff = (generation or 0, int(revoked_at.timestamp()))
+            cutoffs[user_id] = max(cutoffs.get(user_id, cutoff), cutoff)
+
+    def record(self, revoked):
+        '''Apply a revocation made by this process without waiting for `refresh`.'''
+        self.refresh()
+        with self._lock:
+            if revoked.pk in self._seen:
+                return
+            self._add(
+                self.bloom, self.cutoffs,
+                revoked.user_id, revoked.jti, revoked.generation, revoked.revoked_at,
+            )
+            self._seen[revoked.pk] = revoked.revoked_at
+
+    def is_revoked(self, token):
+        self.refresh()
+        cutoff = self.cutoffs.get(token.get(api_settings.USER_ID_CLAIM))
+        if cutoff is not None:
+            generation, revoked_at = cutoff
+            if GENERATION_CLAIM in token:
+                if token[GENERATION_CLAIM] < generation:
+                    return True
+            elif token.get('iat', 0) < revoked_at:
+                return True
+        jti = token.get(api_settings.JTI_CLAIM)
+        if not jti or jti not in self.bloom:
+            return False
+        self.filter_hits += 1
+        if RevokedToken.objects.filter(jti=jti).exists():
+            return True
+        self.false_positives += 1
+        return False
+
+    def metrics(self):
+        return {
+            'revoked_tokens': self.bloom.count if self._built_at is not None else 0,
+            'revoked_users': len(self.cutoffs) if self._built_at is not None else 0,
+            'filter_hits': self.filter_hits,
+            'false_positives': self.false_positives,
+        }
+
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+
+def get_revocation_list():
+    global _revocations
+    with _revocations_lock:
+        if _revocations is None:
+            _revocations = RevocationList(**getattr(settings, 'JWT_REVOCATION', {}))
+        return _revocations
+
+
+def _expiry(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+def revoke_token(token):
+    '''Revoke one access or refresh token.'''
+    revoked, _ = RevokedToken.objects.get_or_create(
+        jti=token[api_settings.JTI_CLAIM],
+        defaults={'user_id': token[api_settings.USER_ID_CLAIM], 'expires_at': _expiry(token)},
+    )
+    get_revocation_list().record(revoked)
+    return revoked
+
+
+def revoke_user_tokens(user_id):
+    '''Revoke every token issued to the user so far (log out everywhere).'''
+    now = timezone.now()
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    with transaction.atomic():
+        # The user row serializes concurrent generation bumps.
+        list(CustomUser.objects.select_for_update().filter(pk=user_id).values_list('pk'))
+        revoked = RevokedToken.objects.create(
+            user_id=user_id,
+            generation=RevokedToken.objects.generation(user_id) + 1,
+            revoked_at=now,
+            expires_at=now + lifetime,
+        )
+    get_revocation_list().record(revoked)
+    return revoked
@@ -1,8 +1,51 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save, pre_save
 from django.dispatch import receiver
 from .models import CustomUser , Profile
+from .revocation import revoke_user_tokens
 
 @receiver(post_save, sender=CustomUser)
 def save_profile(sender, instance, created ,**kwargs):
     if created:
-        Profile.objects.create(user=instance)
\ No newline at end of file
+        Profile.objects.create(user=instance)
+
+
+# Fields `ClaimsUser` takes from the token, or that tokens are only valid with.
+CLAIM_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'is_verified')
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_claim_fields(sender, instance, **kwargs):
+    # From __dict__, fields the user was loaded without aren't queried.
+    instance._claim_values = {field: instance.__dict__.get(field) for field in CLAIM_FIELDS}
+
+
+@receiver(pre_save, sender=CustomUser)
+def note_claim_changes(sender, instance, update_fields=None, **kwargs):
+    '''
+    Claims tokens authenticate without loading the user, so `is_active` is
+    never checked on requests and `is_staff`, `is_superuser` and `is_verified`
+    are as old as the token; changing any of them revokes the user's tokens.
+    Values are compared with the ones the user was loaded with, the stored
+    ones are looked up only for fields it was loaded without.
+    '''
+    instance._claims_changed = False
+    if instance._state.adding or instance.pk is None:
+        return
+    fields = [
+        field for field in CLAIM_FIELDS
+        if field in instance.__dict__ and (update_fields is None or field in update_fields)
+    ]
+    loaded = getattr(instance, '_claim_values', {})
+    unknown = [field for field in fields if loaded.get(field) is None]
+    stored = {field: loaded.get(field) for field in fields}
+    if unknown:
+        stored.update(CustomUser.objects.filter(pk=instance.pk).values(*unknown).first() or {})
+    instance._claims_changed = any(stored[field] != getattr(instance, field) for field in fields)
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_tokens_on_claim_change(sender, instance, created, **kwargs):
+    instance._claim_values = {field: instance.__dict__.get(field) for field in CLAIM_FIELDS}
+    if not created and getattr(instance, '_claims_changed', False):
+        instance._claims_changed = False
+        revoke_user_tokens(instance.pk)
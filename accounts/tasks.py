@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from mail_templated import EmailMessage
+
+from jobs.tasks import task
+
+from .api.utils import send_email
+
+User = get_user_model()
+
+
+@task(queue="email", priority=10)
+def send_activation_email(user_id, activation_url):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None or user.is_verified:
+        return
+    email_obj = EmailMessage(
+        'email/activation_email.tpl',
+        {'user': user, 'activation_url': activation_url},
+        'admin@gmail.com',
+        to=[user.email],
+    )
+    send_email(email_obj)
+
+
+@task(queue="email", priority=20)
+def send_password_reset_email(user_id, reset_url):
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    email_obj = EmailMessage(
+        'email/password_reset_email.tpl',
+        {'user': user, 'reset_url': reset_url},
+        'admin@gmail.com',
+        to=[user.email],
+    )
+    email_obj.subject = "Password Reset Request"
+    send_email(email_obj)
@@ -35,4 +35,11 @@ class CommentAdmin(admin.ModelAdmin):
     
     @admin.action(description="Approve selected comments")
     def approve_comments(self, request, queryset):
-        queryset.update(is_approved=True)
+        queryset.approve()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Keep the posts' counters in sync when a comment is moved or its
+        # approval toggled by hand, or both at once.
+        if change:
+            obj.update_post_counts(form.initial["post"], form.initial["is_approved"])
@@ -0,0 +1,76 @@
+"""
+Response cache for published post detail payloads.
+
+Entries are keyed on the post slug, its `updated_date`, a per-slug version and
+the request host (hyperlinked fields are absolute URLs). Saving a post moves
+its `updated_date` and therefore its key; changes that don't touch the post
+row (category, tags, author email) bump the version through
+`invalidate_post_details`, wired up in `blog.signals`.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+KEY_PREFIX = "blog:post-detail"
+TIMEOUT = 60 * 60
+
+
+def _version_key(slug):
+    return f"{KEY_PREFIX}:version:{slug}"
+
+
+def get_version(slug):
+    key = _version_key(slug)
+    version = cache.get(key)
+    if version is None:
+        # A fresh timestamp never collides with a version that was evicted.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def get_cache_key(request, slug, updated_date):
+    host = hashlib.md5(request.build_absolute_uri("/").encode()).hexdigest()
+    return f"{KEY_PREFIX}:{slug}:{updated_date.timestamp()}:{get_version(slug)}:{host}"
+
+
+def get_post_detail(request, slug, updated_date):
+    return cache.get(get_cache_key(request, slug, updated_date))
+
+
+def set_post_detail(request, slug, updated_date, data):
+    cache.set(get_cache_key(request, slug, updated_date), data, TIMEOUT)
+
+
+def _deletion_key(model):
+    return f"blog:deleted:{model._meta.label_lower}"
+
+
+def note_deletion(model):
+    """Remember when a `model` row was last deleted, see `last_deletion`."""
+    cache.set(_deletion_key(model), timezone.now(), None)
+
+
+def last_deletion(model):
+    """
+    When a `model` row was last deleted, or None. Deleting a row that isn't
+    the newest leaves `Max(updated_date)` where it was, so list validators
+    take this into account too.
+    """
+    return cache.get(_deletion_key(model))
+
+
+def invalidate_post_details(slugs):
+    """Drop cached payloads for `slugs` once the current transaction commits."""
+    slugs = [slug for slug in slugs if slug]
+    if not slugs:
+        return
+
+    def bump():
+        version = time.time_ns()
+        cache.set_many({_version_key(slug): version for slug in slugs}, None)
+
+    transaction.on_commit(bump)
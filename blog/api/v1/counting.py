@@ -0,0 +1,146 @@
+"""
+Counting strategies used by `CustomPagination` to fill in `total_items`.
+
+A strategy exposes `count(queryset)` and returns a `(total, approximate)` pair.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger
+from django.core.paginator import Paginator as DjangoPaginator
+from django.core.exceptions import EmptyResultSet
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+
+class ExactCount:
+    """Plain `COUNT(*)` over the filtered queryset."""
+
+    def count(self, queryset):
+        return queryset.order_by().count(), False
+
+
+class CachedCount:
+    """
+    Exact count stored in the cache for `timeout` seconds, keyed by the SQL of
+    the filtered queryset. A value served from the cache may be up to `timeout`
+    seconds stale, so it is reported as approximate.
+    """
+    key_prefix = "blog:count"
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+
+    def get_cache_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(repr((queryset.db, sql, params)).encode()).hexdigest()
+        return f"{self.key_prefix}:{digest}"
+
+    def count(self, queryset):
+        try:
+            key = self.get_cache_key(queryset)
+        except EmptyResultSet:
+            return 0, False
+        total = cache.get(key)
+        if total is not None:
+            return total, True
+        total, _ = ExactCount().count(queryset)
+        cache.set(key, total, self.timeout)
+        return total, False
+
+
+class EstimatedCount:
+    """
+    Row estimate for a whole table: the planner's `reltuples` on PostgreSQL and
+    the highest primary key everywhere else. Only meaningful for unfiltered
+    querysets; filtered ones fall back to an exact count.
+    """
+
+    def count(self, queryset):
+        if queryset.query.where:
+            return ExactCount().count(queryset)
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            # reltuples is -1 (or 0) until the table has been analyzed.
+            if row and row[0] > 0:
+                return row[0], True
+        highest = queryset.model._base_manager.using(queryset.db).aggregate(highest=Max("pk"))["highest"]
+        return highest or 0, True
+
+
+class AutoCount:
+    """
+    Exact count while the result is small, a planner estimate for large
+    unfiltered tables and a cached count for large filtered results.
+
+    The "small" check is a `COUNT(*)` over a subquery limited to
+    `exact_threshold + 1` rows, so it never scans more than that.
+    """
+
+    def __init__(self, exact_threshold=1000, cached=None, estimated=None):
+        self.exact_threshold = exact_threshold
+        self.cached = cached or CachedCount()
+        self.estimated = estimated or EstimatedCount()
+
+    def count(self, queryset):
+        bounded = queryset.order_by()[:self.exact_threshold + 1].count()
+        if bounded <= self.exact_threshold:
+            return bounded, False
+        if not queryset.query.where:
+            return self.estimated.count(queryset)
+        return self.cached.count(queryset)
+
+
+class LookaheadPage(Page):
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+
+class CountingPaginator(DjangoPaginator):
+    """
+    Paginator that only counts when `count` is actually read.
+
+    Pages are fetched with one extra row so `has_next()` never needs the total,
+    and page numbers are not validated against it either, which keeps
+    approximate counts from hiding real pages.
+    """
+
+    def __init__(self, object_list, per_page, strategy=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.strategy = strategy or ExactCount()
+        self.approximate = False
+
+    @cached_property
+    def count(self):
+        total, self.approximate = self.strategy.count(self.object_list)
+        return total
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage("That page contains no results")
+        return LookaheadPage(rows[:self.per_page], number, self, has_next=len(rows) > self.per_page)
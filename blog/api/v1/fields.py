@@ -0,0 +1,163 @@
+import re
+from functools import lru_cache
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.urls import get_script_prefix, reverse
+from django.utils.encoding import smart_str
+from rest_framework import serializers
+from rest_framework.reverse import reverse as drf_reverse
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    """Resolves the whole list through its child in one query before mapping it."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        data = list(data)
+        self.child_relation.resolve(data)
+        return [self.child_relation.to_internal_value(item) for item in data]
+
+
+class BatchedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    `SlugRelatedField` whose `many=True` form looks every slug up with a single
+    `IN` query instead of one `get()` per slug.
+
+    Resolved objects are kept in the serializer context, so a
+    `ListSerializer` can call `resolve()` once with the slugs of every item.
+    With `create_missing=True` unknown (valid) slugs become unsaved instances
+    built by `build_missing()`; `save_new()` inserts them with one
+    `bulk_create` when the parent serializer saves.
+    """
+
+    def __init__(self, create_missing=False, **kwargs):
+        self.create_missing = create_missing
+        super().__init__(**kwargs)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+    @property
+    def resolved(self):
+        queryset = self.get_queryset()
+        key = f"{queryset.model._meta.label_lower}:{self.slug_field}"
+        return self.context.setdefault("resolved_slugs", {}).setdefault(key, {})
+
+    def resolve(self, slugs):
+        resolved = self.resolved
+        missing = {slug for slug in slugs if isinstance(slug, str) and slug not in resolved}
+        if not missing:
+            return
+        # The slug columns aren't unique, the oldest row wins like `.first()` would.
+        queryset = self.get_queryset().filter(**{f"{self.slug_field}__in": missing}).order_by("-pk")
+        for obj in queryset:
+            resolved[getattr(obj, self.slug_field)] = obj
+        for slug in missing - resolved.keys():
+            # None marks a slug already looked up and not found.
+            resolved[slug] = self.build_missing(slug) if self.create_missing and self.can_create(slug) else None
+
+    def can_create(self, slug):
+        max_length = self.get_queryset().model._meta.get_field(self.slug_field).max_length
+        try:
+            validate_slug(slug)
+        except ValidationError:
+            return False
+        return len(slug) <= max_length
+
+    def build_missing(self, slug):
+        return self.get_queryset().model(**{self.slug_field: slug})
+
+    def to_internal_value(self, data):
+        try:
+            obj = self.resolved[data]
+        except KeyError:
+            return super().to_internal_value(data)
+        except TypeError:
+            self.fail('invalid')
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=smart_str(data))
+        return obj
+
+    @staticmethod
+    def save_new(objs):
+        """Insert the unsaved objects among `objs` (built by `resolve`) in one query."""
+        new = list({id(obj): obj for obj in objs if obj.pk is None}.values())
+        if new:
+            type(new[0]).objects.bulk_create(new)
+        return new
+
+
+# Lookup values that every route converter in the API accepts unchanged.
+SIMPLE_LOOKUP = re.compile(r"[-\w]+", re.ASCII)
+PLACEHOLDER = "urltemplateplaceholder"
+
+
+@lru_cache(maxsize=None)
+def url_template(view_name, lookup_url_kwarg, urlconf, script_prefix):
+    """
+    Reverse `view_name` once with a placeholder lookup value and return the
+    (prefix, suffix) around it. `script_prefix` is part of the cache key
+    because `reverse()` reads it from the current thread.
+    """
+    path = reverse(view_name, kwargs={lookup_url_kwarg: PLACEHOLDER}, urlconf=urlconf)
+    prefix, suffix = path.split(PLACEHOLDER)
+    return prefix, suffix
+
+
+class DetailURLBuilder:
+    """
+    Absolute detail URLs of one route for one request: the route template
+    (see `url_template`) and the request's scheme and host are looked up
+    once, then each call is a string concatenation. Versioned requests and
+    lookup values that aren't plain slugs go through `reverse()`.
+    """
+
+    def __init__(self, view_name, lookup_url_kwarg, request):
+        self.view_name = view_name
+        self.lookup_url_kwarg = lookup_url_kwarg
+        self.request = request
+        self.templated = not getattr(request, 'versioning_scheme', None)
+        prefix, self.suffix = url_template(
+            view_name, lookup_url_kwarg, getattr(request, 'urlconf', None), get_script_prefix()
+        )
+        origin = request.build_absolute_uri('/')[:-1] if request is not None else ''
+        self.prefix = origin + prefix
+
+    def __call__(self, lookup_value):
+        lookup_value = str(lookup_value)
+        if self.templated and SIMPLE_LOOKUP.fullmatch(lookup_value):
+            return f"{self.prefix}{lookup_value}{self.suffix}"
+        return drf_reverse(self.view_name, kwargs={self.lookup_url_kwarg: lookup_value}, request=self.request)
+
+
+class TemplatedURLMixin:
+    """Hyperlinked field that builds its URLs with a `DetailURLBuilder`."""
+
+    def get_url(self, obj, view_name, request, format):
+        if format:
+            return super().get_url(obj, view_name, request, format)
+        if hasattr(obj, 'pk') and obj.pk in (None, ''):
+            return None
+        # Fields are bound per serializer, so per request: build once for all rows.
+        builder = getattr(self, '_url_builder', None)
+        if builder is None or builder.request is not request or builder.view_name != view_name:
+            builder = self._url_builder = DetailURLBuilder(view_name, self.lookup_url_kwarg, request)
+        return builder(getattr(obj, self.lookup_field))
+
+
+class TemplatedHyperlinkedRelatedField(TemplatedURLMixin, serializers.HyperlinkedRelatedField):
+    pass
+
+
+class TemplatedHyperlinkedIdentityField(TemplatedURLMixin, serializers.HyperlinkedIdentityField):
+    pass
@@ -0,0 +1,30 @@
+from django.db.models import Case, FloatField, Q, Value, When
+from rest_framework.filters import SearchFilter
+from ...search import get_search_backend
+
+
+class PostSearchFilter(SearchFilter):
+    """
+    Drop-in replacement for `SearchFilter` on posts.
+
+    `?search=` is matched against the full-text index of titles and content
+    (see `blog.search`) and results come back ranked, best match first.
+    A search containing "@" also matches the author's email, partially and
+    case-insensitively like `SearchFilter` did; text matches come first.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = request.query_params.get(self.search_param, "").replace("\x00", "").strip()
+        if not terms:
+            return queryset
+        backend = get_search_backend(queryset.db)
+        if "@" not in terms:
+            return backend.search(queryset, terms)
+        text_match = backend.matches(terms)
+        return (
+            queryset.filter(text_match | Q(author__user__email__icontains=terms))
+            .annotate(search_rank=Case(
+                When(text_match, then=Value(1.0)), default=Value(0.0), output_field=FloatField(),
+            ))
+            .order_by("-search_rank", "-created_date")
+        )
@@ -0,0 +1,154 @@
+import hashlib
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from config.db.replicas import reads_from_replica, use_primary
+
+from ...models import Post
+from . import cache as detail_cache
+from .renderers import StreamingJSONRenderer
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified validators for `list` and `retrieve`.
+
+    Validators come from a single aggregate over the filtered queryset: the
+    newest of the `conditional_fields` timestamps (or of the model's last
+    deletion) and the row count. A request
+    whose `If-None-Match` / `If-Modified-Since` still matches gets a 304
+    without running the serializer.
+    """
+    # Timestamps that change whenever something in the representation changes.
+    conditional_fields = ("updated_date",)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.conditional_response(request, queryset, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self.conditional_response(request, queryset, super().retrieve, *args, **kwargs)
+
+    def get_validators(self, request, queryset):
+        aggregates = {f"last_{i}": Max(field) for i, field in enumerate(self.conditional_fields)}
+        stats = queryset.order_by().aggregate(total=Count("pk", distinct=True), **aggregates)
+        total = stats.pop("total")
+        dates = [value for value in stats.values() if value is not None]
+        deleted = detail_cache.last_deletion(queryset.model)
+        if deleted is not None and dates:
+            dates.append(deleted)
+        last_modified = max(dates) if dates else None
+
+        user = request.user
+        viewer = f"{user.pk}:{int(user.is_staff)}" if user.is_authenticated else "anonymous"
+        raw = "|".join([
+            self.__class__.__name__,
+            request.build_absolute_uri(),
+            viewer,
+            last_modified.isoformat() if last_modified else "",
+            str(total),
+        ])
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        return etag, last_modified, total
+
+    def conditional_response(self, request, queryset, handler, *args, **kwargs):
+        etag, last_modified, total = self.get_validators(request, queryset)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = None
+        if total:
+            response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class CachedPostDetailMixin:
+    """
+    Serves published post payloads from `blog.api.v1.cache`.
+
+    Published posts look the same to everyone, so their payload is shared.
+    Drafts, and requests with filters, take the regular path.
+
+    Hits are looked up by the `updated_date` wherever the request reads from,
+    a replica included. Misses are read and stored from the primary, a
+    lagging replica's payload would be served to everyone until it expires.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs[self.lookup_field]
+        updated_date = None if request.query_params else self.published_updated_date(slug)
+        if updated_date is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        data = detail_cache.get_post_detail(request, slug, updated_date)
+        if data is not None:
+            return Response(data)
+        with use_primary():
+            if reads_from_replica():
+                updated_date = self.published_updated_date(slug)
+            response = super().retrieve(request, *args, **kwargs)
+            if updated_date is not None and response.status_code == 200:
+                detail_cache.set_post_detail(request, slug, updated_date, response.data)
+        return response
+
+    def published_updated_date(self, slug):
+        return Post.objects.filter(slug=slug, status="published").values_list("updated_date", flat=True).first()
+
+
+class FastListMixin:
+    """
+    Serve `list` through `fast_list_serializer` (see `blog.api.v1.fast`)
+    instead of the DRF serializer when `BLOG_FAST_LIST_SERIALIZATION` is on.
+    """
+    fast_list_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_list_serializer is None or not getattr(settings, "BLOG_FAST_LIST_SERIALIZATION", False):
+            return super().list(request, *args, **kwargs)
+        serializer = self.fast_list_serializer(self.get_serializer_context())
+        rows = serializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class StreamingResponseMixin:
+    """
+    Send successful responses rendered by `StreamingJSONRenderer` as a
+    `StreamingHttpResponse`, so large lists go out in chunks.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        renderer = getattr(response, "accepted_renderer", None)
+        if (
+            not isinstance(renderer, StreamingJSONRenderer)
+            or not isinstance(response, Response)
+            or response.status_code != 200
+        ):
+            return response
+        context = self.get_renderer_context()
+        context["response"] = response
+        streaming = StreamingHttpResponse(
+            renderer.stream(response.data, response.accepted_media_type, context),
+            status=response.status_code,
+            content_type=renderer.media_type,
+        )
+        for header, value in response.items():
+            if header.lower() != "content-type":
+                streaming[header] = value
+        return streaming
@@ -1,19 +1,184 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from urllib import parse
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from .counting import AutoCount, CountingPaginator
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on `(created_date, id)`.
+
+    Each page is fetched with a `WHERE (created_date, id) < cursor` condition
+    instead of an OFFSET and no COUNT(*) is issued, so the cost of a page does
+    not depend on how deep into the list it is.
+    """
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = remove_query_param(request.build_absolute_uri(), "page")
+        position, self.reverse = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by("created_date", "id")
+            if position is not None:
+                created_date, pk = position
+                queryset = queryset.filter(
+                    Q(created_date__gt=created_date) | Q(created_date=created_date, id__gt=pk)
+                )
+        else:
+            queryset = queryset.order_by("-created_date", "-id")
+            if position is not None:
+                created_date, pk = position
+                queryset = queryset.filter(
+                    Q(created_date__lt=created_date) | Q(created_date=created_date, id__lt=pk)
+                )
+
+        # Fetch one extra row to find out whether there is another page.
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'pagination': {
+                'page_size': self.page_size,
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+            },
+            'results': data
+        })
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            tokens = parse.parse_qs(urlsafe_b64decode(padded.encode("ascii")).decode("ascii"))
+            created_date = parse_datetime(tokens["d"][0])
+            pk = int(tokens["i"][0])
+            reverse = tokens.get("r", ["0"])[0] == "1"
+        except (KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return (created_date, pk), reverse
+
+    def encode_cursor(self, item, reverse):
+        tokens = {
+            "d": self._get_value(item, "created_date").isoformat(),
+            "i": self._get_value(item, "id"),
+        }
+        if reverse:
+            tokens["r"] = "1"
+        encoded = urlsafe_b64encode(parse.urlencode(tokens).encode("ascii")).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _get_value(item, name):
+        if isinstance(item, dict):
+            return item[name]
+        return getattr(item, name)
+
 
 class CustomPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
-    
+    django_paginator_class = CountingPaginator
+    # No browsable API controls, which would otherwise force a count.
+    template = None
+    # How `total_items` is computed, see `blog.api.v1.counting`.
+    count_strategy = AutoCount()
+    # `?count=false` skips counting, `total_items`/`total_pages` are then null.
+    count_query_param = "count"
+    # `?pagination=cursor` (or any request carrying a cursor) switches to keyset mode.
+    mode_query_param = "pagination"
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (request.query_params.get(self.mode_query_param) == "cursor"
+                or self.keyset_pagination_class.cursor_query_param in request.query_params):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size, strategy=self.count_strategy)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(page_number=page_number, message=str(exc))
+            raise NotFound(msg)
+        return list(self.page)
+
+    def should_count(self):
+        value = self.request.query_params.get(self.count_query_param, "")
+        return value.lower() not in ("false", "0", "no")
+
     def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
+        paginator = self.page.paginator
+        total_pages = total_items = None
+        if self.should_count():
+            total_items = paginator.count
+            total_pages = paginator.num_pages
         return Response({
             'pagination': {
                 'current_page': self.page.number,
-                'total_pages': self.page.paginator.num_pages,
-                'total_items': self.page.paginator.count,
+                'total_pages': total_pages,
+                'total_items': total_items,
+                'approximate': paginator.approximate,
                 'next': self.get_next_link(),
                 'previous': self.get_previous_link(),
             },
             'results':data
-        })
\ No newline at end of file
+        })
@@ -4,4 +4,5 @@ class IsAuthorOrAdminOrReadOnly(BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in SAFE_METHODS:
             return True
-        return obj.author == request.user.profile or request.user.is_staff
\ No newline at end of file
+        # `profile_id` is a token claim, comparing ids needs no query.
+        return request.user.is_staff or obj.author_id == request.user.profile_id
\ No newline at end of file
@@ -0,0 +1,132 @@
+import json
+from itertools import islice
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.compat import SHORT_SEPARATORS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` that encodes with orjson when it is installed.
+
+    The output matches `JSONRenderer`'s compact, unicode JSON: types orjson
+    doesn't handle the same way (datetimes, lazy strings, querysets, ...) go
+    through DRF's encoder, and \\u2028 / \\u2029 are escaped the same way.
+    Only very large or small floats are spelled differently (`1e16` vs
+    `1e+16`).
+    Indented and ASCII-only output use `JSONRenderer`, and so does anything
+    orjson refuses, e.g. integers wider than 64 bits.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if not self.is_compact(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+        return self.dumps(data)
+
+    def is_compact(self, accepted_media_type, renderer_context):
+        return (
+            self.compact
+            and not self.ensure_ascii
+            and self.get_indent(accepted_media_type, renderer_context) is None
+        )
+
+    def dumps(self, data):
+        """Compact JSON for `data`, as bytes."""
+        ret = None
+        if orjson is not None:
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=self.encoder_class().default,
+                    option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+                )
+            except TypeError:
+                pass
+        if ret is None:
+            ret = json.dumps(
+                data, cls=self.encoder_class, ensure_ascii=False,
+                allow_nan=not self.strict, separators=SHORT_SEPARATORS,
+            ).encode()
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """
+    Renders a list, or an envelope dict holding one under `results_field`,
+    piece by piece: `stream()` yields the envelope around the results and the
+    results themselves in chunks of roughly `chunk_size` bytes, so the whole
+    payload never has to sit in memory at once. The results may be any
+    iterable, a generator is consumed lazily. Joined, the chunks equal what
+    `FastJSONRenderer` renders.
+
+    Selected with `?format=json-stream`; `StreamingResponseMixin` turns the
+    response into a `StreamingHttpResponse`.
+    """
+    format = 'json-stream'
+    results_field = 'results'
+    chunk_size = 64 * 1024
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b''.join(self.stream(data, accepted_media_type, renderer_context))
+
+    def stream(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return
+        renderer_context = renderer_context or {}
+        if not self.is_compact(accepted_media_type, renderer_context):
+            yield JSONRenderer.render(self, data, accepted_media_type, renderer_context)
+        elif isinstance(data, dict) and self.results_field in data:
+            head, tail = [], []
+            target = head
+            for key, value in data.items():
+                if key == self.results_field:
+                    target = tail
+                else:
+                    target.append(self.dumps(key) + b':' + self.dumps(value))
+            yield b'{' + b''.join(part + b',' for part in head) + self.dumps(self.results_field) + b':'
+            yield from self.stream_list(data[self.results_field])
+            yield b''.join(b',' + part for part in tail) + b'}'
+        elif isinstance(data, (dict, str, bytes)) or not hasattr(data, '__iter__'):
+            yield self.dumps(data)
+        else:
+            yield from self.stream_list(data)
+
+    def stream_list(self, items):
+        # Items are encoded in batches sized from what the previous batch
+        # took, starting with one item, so each chunk lands near `chunk_size`.
+        items = iter(items)
+        first, batch_size = True, 1
+        while True:
+            batch = list(islice(items, batch_size))
+            if not batch:
+                break
+            body = self.dumps(batch)
+            yield (b'[' if first else b',') + body[1:-1]
+            first = False
+            batch_size = max(1, self.chunk_size * len(batch) // len(body))
+        yield b'[]' if first else b']'
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Newline-delimited JSON. Exports stream their lines themselves (see
+    `blog.api.v1.export`); this renders the odd single payload, e.g. an error,
+    as one line so the content type stays what the client asked for.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return self.dumps(data) + b'\n'
@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from accounts.models import Profile
 from ...models import (Category, Post, Tag, Comment)
+from ...search import get_search_backend
+from ...slugs import allocate_slugs
+from .fields import (BatchedSlugRelatedField, TemplatedHyperlinkedIdentityField,
+                     TemplatedHyperlinkedRelatedField)
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 
 User = get_user_model()
 
@@ -14,6 +20,8 @@ class ProfileSerializer(serializers.ModelSerializer):
         
 
 class CategorySerialzer(serializers.ModelSerializer):
+    serializer_url_field = TemplatedHyperlinkedIdentityField
+
     class Meta:
         model = Category 
         fields = ["id","title", "slug", "url"]
@@ -26,6 +34,9 @@ class CategorySerialzer(serializers.ModelSerializer):
         }
 
 class TagSerializer(serializers.HyperlinkedModelSerializer):
+    serializer_url_field = TemplatedHyperlinkedIdentityField
+    serializer_related_field = TemplatedHyperlinkedRelatedField
+
     class Meta:
         model = Tag
         fields = ["name", "slug", "url"]
@@ -37,19 +48,79 @@ class TagSerializer(serializers.HyperlinkedModelSerializer):
         }
 
 
+class PostTagsField(BatchedSlugRelatedField):
+    """
+    Tag slugs. Unknown slugs are rejected unless `BLOG_CREATE_MISSING_TAGS`
+    is on, then they become new tags named after the slug.
+    """
+
+    def can_create(self, slug):
+        return getattr(settings, "BLOG_CREATE_MISSING_TAGS", False) and super().can_create(slug)
+
+    def build_missing(self, slug):
+        return Tag(name=slug, slug=slug)
+
+
+class PostListSerializer(serializers.ListSerializer):
+    """
+    Bulk post creation: tags are resolved in one query, categories are fetched
+    or created in bulk, slugs are allocated in one pass and posts plus their
+    tag links are written with `bulk_create` inside a single transaction.
+    """
+    batch_size = 500
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            slugs = [
+                slug
+                for item in data if isinstance(item, dict)
+                for slug in (item.get("tags") or [])
+            ]
+            self.child.fields["tags"].child_relation.resolve(slugs)
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            categories = Category.objects.resolve(
+                [item.get("category") for item in validated_data], batch_size=self.batch_size
+            )
+            PostTagsField.save_new(tag for item in validated_data for tag in item.get("tags", []))
+            slugs = allocate_slugs(Post.objects.all(), [item["title"] for item in validated_data])
+            posts, tags = [], []
+            for item, category, slug in zip(validated_data, categories, slugs):
+                tags.append(item.pop("tags", []))
+                item.pop("category", None)
+                posts.append(Post(**item, category=category, slug=slug))
+            Post.objects.bulk_create(posts, batch_size=self.batch_size)
+
+            Through = Post.tags.through
+            Through.objects.bulk_create(
+                [
+                    Through(post_id=post.pk, tag_id=tag.pk)
+                    for post, post_tags in zip(posts, tags)
+                    for tag in {tag.pk: tag for tag in post_tags}.values()
+                ],
+                batch_size=self.batch_size,
+            )
+            # bulk_create skips Post.save(), index the new rows here.
+            get_search_backend(Post.objects.db).update([post.pk for post in posts])
+        return posts
+
+
 class PostSerializer(serializers.ModelSerializer):
     author = serializers.EmailField(source='author.user.email', read_only=True)
     category = CategorySerialzer() 
-    category_link = serializers.HyperlinkedRelatedField(
+    category_link = TemplatedHyperlinkedRelatedField(
         source="category",
         view_name="blog:api-v1:category-detail",
         lookup_field="slug",
         read_only=True
     )
-    tags = serializers.SlugRelatedField(
+    tags = PostTagsField(
         many=True,
         queryset=Tag.objects.all(),
-        slug_field="slug"
+        slug_field="slug",
+        create_missing=True,
     )
     
     class Meta:
@@ -57,9 +128,14 @@ class PostSerializer(serializers.ModelSerializer):
         fields = [
             "id", "title",  "author", "slug",
             "category", "category_link", "content",
-            "status", "image", "tags", "created_date"
+            "status", "image", "tags", "created_date",
+            "comment_count", "approved_comment_count",
         ]
-        read_only_fields = ["id", "author", "slug", "created_date", "updated_date"]
+        read_only_fields = [
+            "id", "author", "slug", "created_date", "updated_date",
+            "comment_count", "approved_comment_count",
+        ]
+        list_serializer_class = PostListSerializer
         
     def create(self, validated_data):
         user = self.context['request'].user
@@ -70,17 +146,32 @@ class PostSerializer(serializers.ModelSerializer):
         
         validated_data['author'] = profile
         
-        category_data = validated_data.pop('category', None)
-        if category_data and isinstance(category_data, dict):
-            category, _ = Category.objects.get_or_create(**category_data)
-            validated_data['category'] = category
-        
+        self.resolve_relations(validated_data)
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        self.resolve_relations(validated_data)
+        return super().update(instance, validated_data)
+
+    def resolve_relations(self, validated_data):
+        """Swap the nested category for a model instance and insert new tags."""
+        if 'category' in validated_data:
+            validated_data['category'] = Category.objects.resolve([validated_data['category']])[0]
+        PostTagsField.save_new(validated_data.get('tags', []))
+
 class CommentSerializer(serializers.ModelSerializer):
     author_email = serializers.CharField(source= 'author.user.email', read_only = True)
     post_title = serializers.CharField(source='post.title', read_only = True)
     class Meta:
         model = Comment
         fields = ["id", "post", "post_title" , "content", "author_email","created_date", "is_approved"]
-        read_only_fields = ["id", "created_date", "is_approved", "author_email", "post_title"]
\ No newline at end of file
+        read_only_fields = ["id", "created_date", "is_approved", "author_email", "post_title"]
+
+    def create(self, validated_data):
+        # `approval_decided` tells the pre_save hook `is_approved` was already
+        # decided, so it doesn't load the author's user to check is_staff.
+        approval_decided = validated_data.pop("approval_decided", False)
+        comment = Comment(**validated_data)
+        comment._approval_decided = approval_decided
+        comment.save()
+        return comment
@@ -1,10 +1,17 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from accounts.models import Profile
 from blog.models import (Category, Post, Tag, Comment)
 from rest_framework.test import APIClient , APIRequestFactory
 from ..permissions import IsAuthorOrAdminOrReadOnly
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
 @pytest.fixture
 def user_factory(db):
     def create_user(email="parsajavidi@gmail.com"):
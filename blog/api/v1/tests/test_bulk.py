@@ -0,0 +1,102 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from blog.models import Category, Post, Tag
+from blog.slugs import allocate_slugs
+
+BULK_URL = reverse("blog:api-v1:post-bulk")
+
+
+def _payload(n, title="Bulk post", tags=("python",), category=None):
+    return [
+        {
+            "title": f"{title} {i}",
+            "content": f"Content {i}",
+            "status": "published",
+            "category": category or {"title": "Ingest", "slug": "ingest"},
+            "tags": list(tags),
+        }
+        for i in range(n)
+    ]
+
+
+def test_bulk_create_posts(authenticated_client, tag):
+    response = authenticated_client.post(BULK_URL, _payload(3), format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [post["slug"] for post in response.data] == ["bulk-post-0", "bulk-post-1", "bulk-post-2"]
+    assert all(post["tags"] == ["python"] for post in response.data)
+    assert all(post["author"] == "auth@example.com" for post in response.data)
+
+    assert Category.objects.filter(slug="ingest").count() == 1
+    assert Post.objects.filter(category__slug="ingest", tags=tag).count() == 3
+
+
+def test_bulk_create_reuses_existing_category(authenticated_client, category, tag):
+    payload = _payload(2, category={"title": "Django", "slug": "django"})
+    authenticated_client.post(BULK_URL, payload, format="json")
+    assert Category.objects.count() == 1
+    assert Post.objects.filter(category=category).count() == 2
+
+
+def test_bulk_create_allocates_unique_slugs(authenticated_client, published_post, tag):
+    payload = _payload(3, tags=())
+    for item in payload:
+        item["title"] = "Published Post"
+    response = authenticated_client.post(BULK_URL, payload, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert [post["slug"] for post in response.data] == [
+        "published-post-2", "published-post-3", "published-post-4",
+    ]
+
+
+def test_bulk_create_query_count_is_fixed(authenticated_client, tag):
+    Tag.objects.create(name="Django", slug="django")
+    Category.objects.create(title="Ingest", slug="ingest")
+
+    def queries(n, title):
+        with CaptureQueriesContext(connection) as captured:
+            response = authenticated_client.post(
+                BULK_URL, _payload(n, title=title, tags=("python", "django")), format="json"
+            )
+        assert response.status_code == status.HTTP_201_CREATED
+        return len(captured)
+
+    # SQLite caps parameters per statement, so stay within one INSERT batch.
+    assert queries(5, "Few") == queries(80, "Many")
+    assert Post.tags.through.objects.count() == 170
+
+
+def test_bulk_create_is_all_or_nothing(authenticated_client, tag):
+    payload = _payload(3)
+    payload[1]["tags"] = ["missing"]
+    response = authenticated_client.post(BULK_URL, payload, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "tags" in response.data[1]
+    assert Post.objects.count() == 0
+
+
+def test_bulk_create_expects_a_list(authenticated_client):
+    response = authenticated_client.post(BULK_URL, _payload(1)[0], format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_bulk_create_requires_authentication(api_client, db):
+    response = api_client.post(BULK_URL, _payload(1), format="json")
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+
+def test_bulk_created_posts_are_searchable(authenticated_client, api_client, tag):
+    authenticated_client.post(BULK_URL, _payload(2, title="Searchable ingest"), format="json")
+    response = api_client.get(reverse("blog:api-v1:post-list"), {"search": "searchable"})
+    assert len(response.data["results"]) == 2
+
+
+def test_allocate_slugs(published_post):
+    Post.objects.filter(pk=published_post.pk).update(slug="hello")
+    published_post.slug = "hello-7"
+    published_post.pk = None
+    published_post.save()
+    assert allocate_slugs(Post.objects.all(), ["Hello", "Hello", "New one", "New one", "!!!"]) == [
+        "hello-8", "hello-9", "new-one", "new-one-2", "post",
+    ]
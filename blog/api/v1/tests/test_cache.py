@@ -0,0 +1,120 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from blog import signals
+from blog.models import Category, Post, Tag
+
+
+@pytest.fixture
+def detail_url(published_post):
+    return reverse("blog:api-v1:post-detail", kwargs={"slug": published_post.slug})
+
+
+@pytest.fixture
+def warm(api_client, detail_url):
+    def get():
+        response = api_client.get(detail_url)
+        assert response.status_code == status.HTTP_200_OK
+        return response.data
+    get()
+    return get
+
+
+def test_cached_payload_matches_fresh_payload(api_client, published_post, detail_url, warm, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        cached = api_client.get(detail_url).data
+    assert cached == warm()
+    assert cached["slug"] == published_post.slug
+
+
+def test_post_save_refreshes_payload(published_post, warm):
+    published_post.title = "Renamed"
+    published_post.save()
+    assert warm()["title"] == "Renamed"
+
+
+def test_category_change_invalidates(published_post, warm, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        category = Category.objects.get(pk=published_post.category_id)
+        category.title = "Renamed category"
+        category.save()
+    assert warm()["category"]["title"] == "Renamed category"
+
+
+def test_category_and_tag_saves_change_the_cache_key(published_post, tag, warm, monkeypatch):
+    # Another process's cache never sees this one's version bumps, the new
+    # updated_date has to change the key on its own.
+    published_post.tags.add(tag)
+    warm()
+    monkeypatch.setattr(signals, "invalidate_post_details", lambda slugs: None)
+    category = Category.objects.get(pk=published_post.category_id)
+    category.title = "Renamed category"
+    category.save()
+    assert warm()["category"]["title"] == "Renamed category"
+    tag.slug = "python3"
+    tag.save()
+    assert warm()["tags"] == ["python3"]
+
+
+def test_category_delete_invalidates(published_post, warm, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Category.objects.filter(pk=published_post.category_id).delete()
+    assert warm()["category"] is None
+
+
+def test_tag_changes_invalidate(published_post, tag, warm, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        published_post.tags.add(tag)
+    assert warm()["tags"] == ["python"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.slug = "python3"
+        tag.save()
+    assert warm()["tags"] == ["python3"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tag.posts.clear()
+    assert warm()["tags"] == []
+
+
+def test_reverse_tag_add_invalidates(published_post, warm, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        Tag.objects.create(name="Rust", slug="rust").posts.add(published_post)
+    assert warm()["tags"] == ["rust"]
+
+
+def test_author_email_change_invalidates(published_post, warm, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        user = published_post.author.user
+        user.email = "renamed@example.com"
+        user.save()
+    assert warm()["author"] == "renamed@example.com"
+
+
+def test_user_saves_keeping_the_email_leave_posts_alone(published_post, approved_comment):
+    user = get_user_model().objects.get(pk=published_post.author.user_id)
+    with CaptureQueriesContext(connection) as captured:
+        user.last_login = timezone.now()
+        user.save(update_fields=["last_login"])
+        user.set_password("changed1234")
+        user.save()
+    assert not any("blog_" in query["sql"] for query in captured)
+
+
+def test_unpublished_post_is_not_served_from_cache(api_client, published_post, detail_url, warm):
+    Post.objects.filter(pk=published_post.pk).update(status="draft")
+    response = api_client.get(detail_url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_drafts_are_not_cached(api_client, draft_post, django_assert_num_queries):
+    api_client.force_authenticate(user=draft_post.author.user)
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": draft_post.slug})
+    api_client.get(url)
+    with django_assert_num_queries(4):
+        response = api_client.get(url)
+    assert response.data["status"] == "draft"
@@ -0,0 +1,128 @@
+from io import StringIO
+
+from django.contrib.admin.sites import AdminSite
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from blog.admin import CommentAdmin
+from blog.models import Comment, Post
+
+
+def _counts(post):
+    post.refresh_from_db()
+    return post.comment_count, post.approved_comment_count
+
+
+def test_new_comments_are_counted(post, approved_comment, unapproved_comment):
+    assert _counts(post) == (2, 1)
+
+
+def test_staff_comment_is_counted_as_approved(post, admin_user):
+    Comment.objects.create(post=post, author=admin_user.profile, content="Staff")
+    assert _counts(post) == (1, 1)
+
+
+def test_deleted_comments_are_uncounted(post, approved_comment, unapproved_comment):
+    approved_comment.delete()
+    assert _counts(post) == (1, 0)
+    unapproved_comment.delete()
+    assert _counts(post) == (0, 0)
+
+
+def test_approve_action_updates_counter(api_client, admin_user, post, unapproved_comment):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("blog:api-v1:comment-approve", kwargs={"pk": unapproved_comment.pk})
+    assert api_client.post(url).status_code == status.HTTP_200_OK
+    assert _counts(post) == (1, 1)
+
+    # Approving twice doesn't count twice.
+    api_client.post(url)
+    assert _counts(post) == (1, 1)
+
+
+def test_queryset_approve_groups_posts(post, published_post, profile_factory):
+    author = profile_factory(email="bulk@example.com")
+    for target, n in ((post, 3), (published_post, 1)):
+        for i in range(n):
+            Comment.objects.create(post=target, author=author, content=f"{i}")
+    assert Comment.objects.all().approve() == 4
+    assert _counts(post) == (3, 3)
+    assert _counts(published_post) == (1, 1)
+    assert Comment.objects.all().approve() == 0
+
+
+def test_admin_bulk_approve(rf, admin_user, post, unapproved_comment, approved_comment):
+    admin = CommentAdmin(Comment, AdminSite())
+    admin.approve_comments(rf.post("/"), Comment.objects.all())
+    assert _counts(post) == (2, 2)
+
+
+def _admin_change(rf, admin_user, comment, **changes):
+    admin = CommentAdmin(Comment, AdminSite())
+    request = rf.post("/")
+    request.user = admin_user
+    data = {
+        "post": comment.post_id,
+        "author": comment.author_id,
+        "content": comment.content,
+        "is_approved": comment.is_approved,
+        **changes,
+    }
+    if not data["is_approved"]:
+        del data["is_approved"]
+    form = admin.get_form(request, comment, change=True)(data, instance=comment)
+    assert form.is_valid(), form.errors
+    admin.save_model(request, form.save(commit=False), form, change=True)
+
+
+def test_admin_edits_keep_counts(rf, admin_user, post, published_post, unapproved_comment):
+    _admin_change(rf, admin_user, unapproved_comment, is_approved=True)
+    assert _counts(post) == (1, 1)
+
+    # Moved and unapproved at once.
+    _admin_change(rf, admin_user, unapproved_comment, post=published_post.pk, is_approved=False)
+    assert (_counts(post), _counts(published_post)) == ((0, 0), (1, 0))
+
+    _admin_change(rf, admin_user, unapproved_comment, post=post.pk, is_approved=True)
+    assert (_counts(post), _counts(published_post)) == ((1, 1), (0, 0))
+
+
+def test_comments_moved_through_the_api_move_their_counts(api_client, admin_user, post, published_post, approved_comment):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("blog:api-v1:comment-detail", kwargs={"pk": approved_comment.pk})
+    response = api_client.patch(url, {"post": published_post.pk, "content": "Edited"}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["post"] == published_post.pk
+    approved_comment.refresh_from_db()
+    assert (approved_comment.post_id, approved_comment.content) == (published_post.pk, "Edited")
+    assert (_counts(post), _counts(published_post)) == ((0, 0), (1, 1))
+
+    response = api_client.patch(url, {"content": "Edited again"}, format="json")
+    assert (_counts(post), _counts(published_post)) == ((0, 0), (1, 1))
+
+
+def test_counts_are_exposed_on_posts(api_client, post, approved_comment, unapproved_comment):
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+    response = api_client.get(url)
+    assert response.data["comment_count"] == 2
+    assert response.data["approved_comment_count"] == 1
+
+
+def test_counts_are_read_only(api_client, post):
+    api_client.force_authenticate(user=post.author.user)
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+    api_client.patch(url, {"comment_count": 100}, format="json")
+    assert _counts(post) == (0, 0)
+
+
+def test_recompute_command_repairs_drift(post, published_post, approved_comment, unapproved_comment):
+    Post.objects.update(comment_count=42, approved_comment_count=7)
+    out = StringIO()
+    call_command("recompute_comment_counts", "--batch-size", "1", stdout=out)
+    assert _counts(post) == (2, 1)
+    assert _counts(published_post) == (0, 0)
+    assert "fixed 2" in out.getvalue()
+
+    out = StringIO()
+    call_command("recompute_comment_counts", stdout=out)
+    assert "fixed 0" in out.getvalue()
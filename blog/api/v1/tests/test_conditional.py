@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from blog.models import Category, Post
+from ..serializers import CommentSerializer, PostSerializer
+
+
+@pytest.fixture
+def no_serialization(monkeypatch):
+    def fail(self, instance):
+        raise AssertionError("serializer should not run for a 304")
+
+    def disable():
+        monkeypatch.setattr(PostSerializer, "to_representation", fail)
+        monkeypatch.setattr(CommentSerializer, "to_representation", fail)
+    return disable
+
+
+def test_list_emits_validators(api_client, published_post):
+    response = api_client.get(reverse("blog:api-v1:post-list"))
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"].startswith('"')
+    assert "Last-Modified" in response
+
+
+def test_list_not_modified(api_client, bulk_posts, django_assert_num_queries, no_serialization):
+    url = reverse("blog:api-v1:post-list")
+    etag = api_client.get(url)["ETag"]
+    no_serialization()
+    with django_assert_num_queries(1):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response["ETag"] == etag
+
+
+def test_detail_not_modified(api_client, published_post, django_assert_num_queries, no_serialization):
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": published_post.slug})
+    last_modified = api_client.get(url)["Last-Modified"]
+    no_serialization()
+    with django_assert_num_queries(1):
+        response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_post_update_changes_etag(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list")
+    etag = api_client.get(url)["ETag"]
+    post = bulk_posts[3]
+    post.content = "Edited"
+    post.save()
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+
+def test_post_delete_changes_etag(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list")
+    etag = api_client.get(url)["ETag"]
+    Post.objects.filter(pk=bulk_posts[0].pk).delete()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+def test_deleting_an_older_post_changes_last_modified(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list")
+    an_hour_ago = timezone.now() - timedelta(hours=1)
+    Post.objects.update(updated_date=an_hour_ago)
+    Category.objects.update(updated_date=an_hour_ago)
+    last_modified = api_client.get(url)["Last-Modified"]
+    Post.objects.filter(pk=bulk_posts[0].pk).delete()
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["Last-Modified"] != last_modified
+
+
+def test_author_email_change_changes_validators(api_client, published_post, approved_comment):
+    for url in (reverse("blog:api-v1:post-list"), reverse("blog:api-v1:comment-list")):
+        etag = api_client.get(url)["ETag"]
+        user = approved_comment.author.user if "comment" in url else published_post.author.user
+        user.email = f"renamed-{user.pk}@example.com"
+        user.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert user.email in response.content.decode()
+
+
+def test_tag_change_changes_etag(api_client, published_post, tag):
+    url = reverse("blog:api-v1:post-list")
+    etag = api_client.get(url)["ETag"]
+    published_post.tags.add(tag)
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+def test_etag_depends_on_viewer(api_client, published_post, draft_post):
+    url = reverse("blog:api-v1:post-list")
+    anonymous = api_client.get(url)["ETag"]
+    api_client.force_authenticate(user=draft_post.author.user)
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=anonymous)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data["results"]) == 2
+
+
+def test_missing_detail_is_still_404(api_client, draft_post):
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": draft_post.slug})
+    response = api_client.get(url, HTTP_IF_NONE_MATCH="*")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_comment_approval_changes_etag(api_client, admin_user, unapproved_comment):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("blog:api-v1:comment-list")
+    etag = api_client.get(url)["ETag"]
+    api_client.post(reverse("blog:api-v1:comment-approve", kwargs={"pk": unapproved_comment.pk}))
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_200_OK
+
+
+def test_comment_list_not_modified(api_client, approved_comment, no_serialization):
+    url = reverse("blog:api-v1:comment-list")
+    etag = api_client.get(url)["ETag"]
+    no_serialization()
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_category_and_tag_lists_not_modified(api_client, category, tag):
+    for name in ("category", "tag"):
+        url = reverse(f"blog:api-v1:{name}-list")
+        etag = api_client.get(url)["ETag"]
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,182 @@
+import os
+import threading
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.db.utils import ConnectionHandler
+
+from config.db import database
+from config.db.pool import ConnectionPool, PoolTimeout, close_pools, pool_metrics
+
+
+class FakeConnection:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        if not self.alive:
+            raise OSError("server closed the connection")
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool:
+    def test_connections_are_reused(self):
+        pool = ConnectionPool()
+        first = pool.checkout(FakeConnection)
+        pool.checkin(first)
+        assert pool.checkout(FakeConnection) is first
+        metrics = pool.metrics()
+        assert (metrics["checkouts"], metrics["connects"], metrics["in_use"]) == (2, 1, 1)
+
+    def test_size_is_bounded(self):
+        pool = ConnectionPool(max_size=2, timeout=0.05)
+        pool.checkout(FakeConnection), pool.checkout(FakeConnection)
+        with pytest.raises(PoolTimeout):
+            pool.checkout(FakeConnection)
+        assert pool.metrics()["timeouts"] == 1
+        assert pool.metrics()["size"] == 2
+
+    def test_checkout_waits_for_a_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        held = pool.checkout(FakeConnection)
+        timer = threading.Timer(0.05, pool.checkin, [held])
+        timer.start()
+        assert pool.checkout(FakeConnection) is held
+        timer.join()
+        metrics = pool.metrics()
+        assert metrics["waits"] == 1
+        assert metrics["wait_max"] >= 0.04
+
+    def test_unusable_connections_are_closed(self):
+        pool = ConnectionPool(max_size=1)
+        connection = pool.checkout(FakeConnection)
+        pool.checkin(connection, reusable=False)
+        assert connection.closed
+        assert pool.checkout(FakeConnection) is not connection
+        assert pool.metrics()["closes"] == 1
+
+    def test_dead_idle_connections_are_replaced(self):
+        pool = ConnectionPool(max_size=1, check_idle=0)
+        connection = pool.checkout(FakeConnection)
+        pool.checkin(connection)
+        connection.alive = False
+        replacement = pool.checkout(FakeConnection)
+        assert replacement is not connection and connection.closed
+        assert pool.metrics()["failed_checks"] == 1
+
+    def test_idle_connections_expire(self):
+        pool = ConnectionPool(max_idle=0)
+        connection = pool.checkout(FakeConnection)
+        pool.checkin(connection)
+        assert pool.checkout(FakeConnection) is not connection
+        assert connection.closed
+
+    def test_connections_from_before_a_fork_are_dropped(self):
+        pool = ConnectionPool(max_size=1)
+        idle = pool.checkout(FakeConnection)
+        pool.checkin(idle)
+        held = pool.checkout(FakeConnection)
+        pool._pid = -1  # as seen from a forked child
+        assert pool.checkout(FakeConnection) not in (idle, held)
+        pool.checkin(held)
+        assert not idle.closed and not held.closed
+        assert pool.metrics()["size"] == 1
+
+
+class TestDatabaseSettings:
+    def test_modes(self):
+        assert database("none", ENGINE="django.db.backends.sqlite3")["CONN_MAX_AGE"] == 0
+        persistent = database("persistent", conn_max_age=60, ENGINE="django.db.backends.postgresql")
+        assert (persistent["CONN_MAX_AGE"], persistent["CONN_HEALTH_CHECKS"]) == (60, True)
+        pgbouncer = database("pgbouncer", ENGINE="django.db.backends.postgresql")
+        assert pgbouncer["DISABLE_SERVER_SIDE_CURSORS"] is True
+        pooled = database("pool", pool={"max_size": 3}, ENGINE="django.db.backends.postgresql")
+        assert pooled["ENGINE"] == "config.db.backends.postgresql"
+        assert (pooled["CONN_MAX_AGE"], pooled["POOL"]) == (0, {"max_size": 3})
+
+    def test_unknown_mode_or_engine(self):
+        with pytest.raises(ImproperlyConfigured):
+            database("bouncy", ENGINE="django.db.backends.sqlite3")
+        with pytest.raises(ImproperlyConfigured):
+            database("pool", ENGINE="django.db.backends.mysql")
+
+
+def _postgres_settings():
+    # A local server (or PgBouncer) to run the pooled backend against.
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("POSTGRES_TEST_NAME", "postgres"),
+        "USER": os.environ.get("POSTGRES_TEST_USER", "postgres"),
+        "PASSWORD": os.environ.get("POSTGRES_TEST_PASSWORD", ""),
+        "HOST": os.environ.get("POSTGRES_TEST_HOST"),
+        "PORT": os.environ.get("POSTGRES_TEST_PORT", 5432),
+    }
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def pooled(request, tmp_path, django_db_blocker):
+    if request.param == "sqlite":
+        settings = {"ENGINE": "django.db.backends.sqlite3", "NAME": tmp_path / "pooled.sqlite3"}
+    elif os.environ.get("POSTGRES_TEST_HOST"):
+        settings = _postgres_settings()
+    else:
+        pytest.skip("Set POSTGRES_TEST_HOST to run against PostgreSQL.")
+    handler = ConnectionHandler({"default": database("pool", pool={"max_size": 2, "timeout": 5}, **settings)})
+    with django_db_blocker.unblock():
+        yield handler
+        handler.close_all()
+        close_pools()
+
+
+def _select_one(handler):
+    connection = handler["default"]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        assert cursor.fetchone() == (1,)
+    connection.close()
+
+
+def test_backend_returns_connections_to_the_pool(pooled):
+    for _ in range(3):
+        _select_one(pooled)
+    metrics = pool_metrics()["default"]
+    assert (metrics["checkouts"], metrics["connects"], metrics["idle"]) == (3, 1, 1)
+
+
+def test_threads_share_a_bounded_pool(pooled):
+    errors = []
+
+    def work():
+        try:
+            for _ in range(5):
+                _select_one(pooled)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    metrics = pool_metrics()["default"]
+    assert metrics["checkouts"] == 30
+    assert metrics["connects"] <= 2
+
+
+def test_connections_that_errored_are_discarded(pooled):
+    connection = pooled["default"]
+    with pytest.raises(DatabaseError):
+        with connection.cursor() as cursor:
+            cursor.execute("SELEC 1")
+    connection.close()
+    _select_one(pooled)
+    metrics = pool_metrics()["default"]
+    assert (metrics["connects"], metrics["closes"], metrics["idle"]) == (2, 1, 1)
@@ -0,0 +1,88 @@
+from django.urls import reverse
+from rest_framework import status
+from blog.models import Post
+from ..counting import AutoCount, CachedCount, EstimatedCount, ExactCount
+from ..pagination import CustomPagination
+
+
+def test_exact_count(bulk_posts):
+    assert ExactCount().count(Post.objects.all()) == (15, False)
+
+
+def test_cached_count_is_reused_until_timeout(bulk_posts, django_assert_num_queries):
+    queryset = Post.objects.filter(status="published")
+    counter = CachedCount(timeout=60)
+    assert counter.count(queryset) == (15, False)
+
+    Post.objects.filter(pk=bulk_posts[0].pk).delete()
+    with django_assert_num_queries(0):
+        assert counter.count(queryset) == (15, True)
+
+
+def test_cached_count_is_keyed_by_filters(bulk_posts, draft_post):
+    counter = CachedCount()
+    assert counter.count(Post.objects.filter(status="published")) == (15, False)
+    assert counter.count(Post.objects.filter(status="draft")) == (1, False)
+
+
+def test_estimated_count_for_unfiltered_table(bulk_posts):
+    total, approximate = EstimatedCount().count(Post.objects.all())
+    assert approximate is True
+    assert total >= 15
+
+
+def test_estimated_count_falls_back_to_exact_when_filtered(bulk_posts, draft_post):
+    assert EstimatedCount().count(Post.objects.filter(status="draft")) == (1, False)
+
+
+def test_auto_count_is_exact_below_threshold(bulk_posts):
+    assert AutoCount(exact_threshold=100).count(Post.objects.filter(status="published")) == (15, False)
+
+
+def test_auto_count_estimates_large_unfiltered_tables(bulk_posts):
+    total, approximate = AutoCount(exact_threshold=5).count(Post.objects.all())
+    assert approximate is True
+    assert total >= 15
+
+
+def test_auto_count_caches_large_filtered_results(bulk_posts):
+    counter = AutoCount(exact_threshold=5)
+    queryset = Post.objects.filter(status="published")
+    assert counter.count(queryset) == (15, False)
+    assert counter.count(queryset) == (15, True)
+
+
+def test_count_opt_out(api_client, bulk_posts, django_assert_num_queries):
+    url = reverse("blog:api-v1:post-list") + "?count=false&page_size=10"
+    # ETag aggregate, the page plus its lookahead row and the tag prefetch, no COUNT(*).
+    with django_assert_num_queries(3):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    pagination = response.data["pagination"]
+    assert pagination["total_items"] is None
+    assert pagination["total_pages"] is None
+    assert pagination["next"] is not None
+    assert len(response.data["results"]) == 10
+
+
+def test_last_page_without_count_has_no_next_link(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list") + "?count=false&page_size=10&page=2"
+    response = api_client.get(url)
+    assert response.data["pagination"]["next"] is None
+    assert len(response.data["results"]) == 5
+
+
+def test_approximate_total_is_flagged(api_client, bulk_posts, monkeypatch):
+    monkeypatch.setattr(CustomPagination, "count_strategy", AutoCount(exact_threshold=5))
+    url = reverse("blog:api-v1:post-list")
+    api_client.get(url)
+    response = api_client.get(url)
+    pagination = response.data["pagination"]
+    assert pagination["total_items"] == 15
+    assert pagination["approximate"] is True
+
+
+def test_page_out_of_range(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list") + "?page=5"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,124 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from blog.models import Comment, Post
+from ..export import NDJSONExporter, parse_since
+
+EXPORT_URL = reverse("blog:api-v1:post-export")
+
+
+def _lines(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+def _export(client, **params):
+    response = client.get(EXPORT_URL, params)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    assert response["Content-Type"] == "application/x-ndjson"
+    return _lines(b"".join(response.streaming_content))
+
+
+@pytest.fixture
+def comments(published_post, draft_post, profile_factory):
+    author = profile_factory(email="commenter@example.com")
+    return {
+        "approved": Comment.objects.create(post=published_post, author=author, content="Yes", is_approved=True),
+        "pending": Comment.objects.create(post=published_post, author=author, content="Maybe"),
+        "on_draft": Comment.objects.create(post=draft_post, author=author, content="Hidden", is_approved=True),
+    }
+
+
+def test_export_matches_list_items(api_client, bulk_posts):
+    lines = _export(api_client)
+    listed = api_client.get(reverse("blog:api-v1:post-list"), {"page_size": 100}).json()["results"]
+    assert [line.pop("type") for line in lines] == ["post"] * 15
+    assert lines == sorted(listed, key=lambda post: post["id"])
+
+
+def test_export_respects_post_visibility(api_client, admin_user, published_post, draft_post):
+    assert [line["slug"] for line in _export(api_client)] == ["published-post"]
+
+    api_client.force_authenticate(user=draft_post.author.user)
+    assert [line["slug"] for line in _export(api_client)] == ["published-post", "draft-post"]
+
+    api_client.force_authenticate(user=admin_user)
+    assert len(_export(api_client)) == 2
+
+
+def test_export_comments(api_client, admin_user, comments):
+    lines = _export(api_client, comments="1")
+    assert [(line["type"], line.get("content")) for line in lines] == [
+        ("post", "Content"), ("comment", "Yes"),
+    ]
+
+    api_client.force_authenticate(user=admin_user)
+    lines = _export(api_client, comments="1")
+    assert [line["content"] for line in lines if line["type"] == "comment"] == ["Yes", "Maybe", "Hidden"]
+
+
+def test_export_since(api_client, bulk_posts):
+    old = timezone.now() - timedelta(days=3)
+    Post.objects.exclude(pk=bulk_posts[4].pk).update(updated_date=old)
+    since = (old + timedelta(days=1)).isoformat()
+    assert [line["id"] for line in _export(api_client, since=since)] == [bulk_posts[4].pk]
+    assert len(_export(api_client, since=old.date().isoformat())) == 15
+
+
+def test_export_rejects_bad_since(api_client, db):
+    response = api_client.get(EXPORT_URL, {"since": "yesterday"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "since" in _lines(response.content)[0]
+
+
+def test_export_gzip(api_client, bulk_posts):
+    plain = b"".join(api_client.get(EXPORT_URL).streaming_content)
+    response = api_client.get(EXPORT_URL, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response["Vary"]
+    assert gzip.decompress(b"".join(response.streaming_content)) == plain
+
+
+def test_exporter_chunks(bulk_posts):
+    chunks = list(NDJSONExporter(AnonymousUser(), chunk_size=4).chunks())
+    assert [chunk.count(b"\n") for chunk in chunks] == [4, 4, 4, 3]
+    assert [line["id"] for line in _lines(b"".join(chunks))] == sorted(post.pk for post in bulk_posts)
+
+
+def test_parse_since():
+    assert parse_since("2024-01-02T03:04:05Z") == datetime(2024, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc)
+    assert timezone.is_aware(parse_since("2024-01-02"))
+    with pytest.raises(ValueError):
+        parse_since("soon")
+
+
+class TestExportCommand:
+    def test_stdout(self, published_post, draft_post):
+        out = StringIO()
+        call_command("export_posts", stdout=out)
+        assert [line["slug"] for line in _lines(out.getvalue().encode())] == ["published-post"]
+
+    def test_as_user_and_comments(self, comments, draft_post):
+        out = StringIO()
+        call_command("export_posts", "--comments", "--as-user", "draft_user@example.com", stdout=out)
+        lines = _lines(out.getvalue().encode())
+        assert [line["type"] for line in lines] == ["post", "post", "comment", "comment"]
+
+    def test_gzip_file(self, tmp_path, bulk_posts):
+        path = tmp_path / "posts.ndjson.gz"
+        call_command("export_posts", "--output", str(path), "--chunk-size", "4")
+        assert len(_lines(gzip.decompress(path.read_bytes()))) == 15
+
+    def test_errors(self, db):
+        with pytest.raises(CommandError):
+            call_command("export_posts", "--since", "soon")
+        with pytest.raises(CommandError):
+            call_command("export_posts", "--as-user", "nobody@example.com")
@@ -0,0 +1,82 @@
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from blog.models import Comment, Post, Tag
+from ..fast import FastCommentSerializer, FastPostSerializer
+from ..serializers import CommentSerializer, PostSerializer
+
+
+@pytest.fixture
+def varied_posts(bulk_posts, draft_post, tag):
+    other = Tag.objects.create(name="Rust", slug="rust")
+    bulk_posts[0].tags.set([other, tag])
+    bulk_posts[1].tags.set([tag])
+    Post.objects.filter(pk=bulk_posts[2].pk).update(category=None, title="Ünïcode “quotes” \\ </script>")
+    Post.objects.filter(pk=bulk_posts[3].pk).update(image="posts/cover image.jpg")
+    return bulk_posts
+
+
+@pytest.fixture
+def comments(varied_posts, profile_factory):
+    author = profile_factory(email="commenter@example.com")
+    return [
+        Comment.objects.create(post=varied_posts[i % 3], author=author, content=f"Comment {i}", is_approved=i % 2)
+        for i in range(6)
+    ]
+
+
+def _render(data):
+    return JSONRenderer().render(data)
+
+
+def _context():
+    return {"request": Request(APIRequestFactory().get("/"))}
+
+
+def test_post_parity(varied_posts):
+    context = _context()
+    expected = PostSerializer(Post.objects.with_related(), many=True, context=context).data
+    fast = FastPostSerializer(context)
+    assert _render(fast.serialize(fast.rows(Post.objects.with_related()))) == _render(expected)
+
+
+def test_comment_parity(comments):
+    context = _context()
+    expected = CommentSerializer(Comment.objects.all(), many=True, context=context).data
+    fast = FastCommentSerializer(context)
+    assert _render(fast.serialize(fast.rows(Comment.objects.all()))) == _render(expected)
+
+
+def test_empty_page():
+    fast = FastPostSerializer(_context())
+    assert fast.serialize([]) == []
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"page_size": 4, "page": 2},
+    {"search": "post"},
+    {"status": "published"},
+    {"pagination": "cursor", "page_size": 3},
+])
+def test_post_list_responses_match(api_client, admin_user, varied_posts, settings, params):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("blog:api-v1:post-list")
+    settings.BLOG_FAST_LIST_SERIALIZATION = False
+    expected = api_client.get(url, params)
+    settings.BLOG_FAST_LIST_SERIALIZATION = True
+    response = api_client.get(url, params)
+    assert response.status_code == expected.status_code == 200
+    assert response.content == expected.content
+
+
+def test_comment_list_responses_match(api_client, admin_user, comments, settings):
+    api_client.force_authenticate(user=admin_user)
+    url = reverse("blog:api-v1:comment-list")
+    settings.BLOG_FAST_LIST_SERIALIZATION = False
+    expected = api_client.get(url, {"page_size": 4})
+    settings.BLOG_FAST_LIST_SERIALIZATION = True
+    response = api_client.get(url, {"page_size": 4})
+    assert response.content == expected.content
@@ -0,0 +1,118 @@
+from django.urls import reverse, set_script_prefix
+from rest_framework import status
+from rest_framework.relations import HyperlinkedIdentityField, HyperlinkedRelatedField
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from blog.models import Category, Post, Tag
+from ..serializers import CategorySerialzer, PostSerializer, TagSerializer
+
+POSTS_URL = reverse("blog:api-v1:post-list")
+
+
+def _payload(tags, category=None):
+    return {
+        "title": "Fields",
+        "content": "Content",
+        "category": category or {"title": "Django", "slug": "django"},
+        "tags": tags,
+    }
+
+
+def test_unknown_tag_is_rejected(authenticated_client, tag):
+    response = authenticated_client.post(POSTS_URL, _payload(["python", "missing"]), format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "missing" in str(response.data["tags"])
+    assert not Tag.objects.filter(slug="missing").exists()
+
+
+def test_tags_must_be_a_list(authenticated_client, tag):
+    response = authenticated_client.post(POSTS_URL, _payload("python"), format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_missing_tags_are_created_when_enabled(authenticated_client, tag, settings):
+    settings.BLOG_CREATE_MISSING_TAGS = True
+    response = authenticated_client.post(POSTS_URL, _payload(["python", "rust", "rust"]), format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    assert Tag.objects.get(slug="rust").name == "rust"
+    assert Tag.objects.filter(slug="python").count() == 1
+    assert sorted(response.data["tags"]) == ["python", "rust"]
+
+
+def test_invalid_slugs_are_not_created(authenticated_client, settings):
+    settings.BLOG_CREATE_MISSING_TAGS = True
+    response = authenticated_client.post(POSTS_URL, _payload(["not a slug"]), format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Tag.objects.count() == 0
+
+
+def test_bulk_creates_missing_tags_once(authenticated_client, settings):
+    settings.BLOG_CREATE_MISSING_TAGS = True
+    payload = [dict(_payload(["new-tag"]), title=f"Bulk {i}") for i in range(3)]
+    response = authenticated_client.post(reverse("blog:api-v1:post-bulk"), payload, format="json")
+    assert response.status_code == status.HTTP_201_CREATED
+    tag = Tag.objects.get(slug="new-tag")
+    assert tag.posts.count() == 3
+
+
+def test_update_resolves_category(authenticated_client, category, tag):
+    slug = authenticated_client.post(POSTS_URL, _payload(["python"]), format="json").data["slug"]
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": slug})
+    response = authenticated_client.patch(url, {"category": {"title": "Rust", "slug": "rust"}}, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["category"]["slug"] == "rust"
+    assert Post.objects.get(slug=slug).category == Category.objects.get(slug="rust")
+
+
+def test_category_resolve_matches_and_creates(category):
+    resolved = Category.objects.resolve([
+        {"title": "Django", "slug": "django"},
+        None,
+        {"title": "New"},
+        {"title": "New"},
+    ])
+    assert resolved[0] == category
+    assert resolved[1] is None
+    assert resolved[2] is resolved[3]
+    assert resolved[2].slug == "new"
+    assert Category.objects.count() == 2
+
+
+class StockCategorySerializer(CategorySerialzer):
+    serializer_url_field = HyperlinkedIdentityField
+
+
+class StockPostSerializer(PostSerializer):
+    category = StockCategorySerializer()
+    category_link = HyperlinkedRelatedField(
+        source="category", view_name="blog:api-v1:category-detail", lookup_field="slug", read_only=True
+    )
+
+
+def _context(path="/"):
+    return {"request": Request(APIRequestFactory().get(path))}
+
+
+def test_templated_urls_match_reverse(bulk_posts, tag):
+    posts = Post.objects.with_related()
+    context = _context()
+    assert PostSerializer(posts, many=True, context=context).data == \
+        StockPostSerializer(posts, many=True, context=context).data
+    assert TagSerializer(tag, context=context).data["url"] == "http://testserver/blog/api/v1/tags/python/"
+
+
+def test_templated_urls_follow_script_prefix(category):
+    set_script_prefix("/mounted/")
+    try:
+        data = CategorySerialzer(category, context=_context()).data
+    finally:
+        set_script_prefix("/")
+    assert data["url"] == "http://testserver/mounted/blog/api/v1/category/django/"
+    assert CategorySerialzer(category, context=_context()).data["url"] == \
+        "http://testserver/blog/api/v1/category/django/"
+
+
+def test_unusual_lookup_values_use_reverse(category):
+    category.slug = "with space"
+    expected = StockCategorySerializer(category, context=_context()).data["url"]
+    assert CategorySerialzer(category, context=_context()).data["url"] == expected
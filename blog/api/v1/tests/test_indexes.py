@@ -0,0 +1,47 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from blog.models import Comment, Post
+
+# Each hot query, with the indexes the planner may pick for it.
+HOT_QUERIES = {
+    "anonymous post list": (
+        lambda profile: Post.objects.visible_to(AnonymousUser()),
+        {"blog_post_published_idx", "blog_post_status_created_idx"},
+    ),
+    "anonymous post list, keyset": (
+        lambda profile: Post.objects.visible_to(AnonymousUser()).order_by("-created_date", "-id"),
+        {"blog_post_published_idx", "blog_post_status_created_idx"},
+    ),
+    "post list filtered by status": (
+        lambda profile: Post.objects.filter(status="draft"),
+        {"blog_post_status_created_idx"},
+    ),
+    "author's posts by status": (
+        lambda profile: Post.objects.filter(author=profile, status="draft"),
+        {"blog_post_author_status_idx"},
+    ),
+    "approved comment list": (
+        lambda profile: Comment.objects.visible_to(AnonymousUser()).order_by("-created_date", "-id"),
+        {"blog_comment_approved_idx"},
+    ),
+    "comments of a post": (
+        lambda profile: Comment.objects.visible_to(AnonymousUser()).filter(post_id=1),
+        {"blog_comment_post_approved_idx"},
+    ),
+}
+
+
+def plan(queryset):
+    if connection.vendor == "postgresql":
+        # The test tables are tiny, make sure the planner still considers indexes.
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+    return queryset.explain()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_use_indexes(name, profile_factory):
+    build, indexes = HOT_QUERIES[name]
+    query_plan = plan(build(profile_factory())[:10])
+    assert any(index in query_plan for index in indexes), query_plan
@@ -1,4 +1,5 @@
 from django.urls import reverse
+from blog.models import Post
 from rest_framework import status
 
 def test_pagination_structure(api_client, bulk_posts):
@@ -28,3 +29,53 @@ def test_second_page(api_client, bulk_posts):
     assert response.status_code == status.HTTP_200_OK
     pagination = response.data["pagination"]
     assert pagination["current_page"] == 2
+
+def test_cursor_pagination_structure(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list") + "?pagination=cursor&page_size=10"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    pagination = response.data["pagination"]
+    assert pagination["page_size"] == 10
+    assert pagination["next"] is not None
+    assert pagination["previous"] is None
+    assert "total_items" not in pagination
+    assert [post["slug"] for post in response.data["results"]] == [f"post-{i}" for i in range(14, 4, -1)]
+
+def test_cursor_pagination_walks_forward_and_back(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list") + "?pagination=cursor&page_size=6"
+    seen = []
+    pages = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        pages.append(response.data)
+        seen.extend(post["slug"] for post in response.data["results"])
+        url = response.data["pagination"]["next"]
+    assert seen == [f"post-{i}" for i in range(14, -1, -1)]
+    assert len(pages) == 3
+
+    response = api_client.get(pages[-1]["pagination"]["previous"])
+    assert response.data["results"] == pages[1]["results"]
+    assert response.data["pagination"]["next"] is not None
+
+def test_cursor_pagination_breaks_created_date_ties_by_id(api_client, bulk_posts):
+    Post.objects.update(created_date=bulk_posts[0].created_date)
+    url = reverse("blog:api-v1:post-list") + "?pagination=cursor&page_size=4"
+    ids = []
+    while url:
+        response = api_client.get(url)
+        ids.extend(post["id"] for post in response.data["results"])
+        url = response.data["pagination"]["next"]
+    assert ids == sorted((post.id for post in bulk_posts), reverse=True)
+
+def test_invalid_cursor(api_client, bulk_posts):
+    url = reverse("blog:api-v1:post-list") + "?cursor=not-a-cursor"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+def test_cursor_pagination_for_comments(api_client, approved_comment):
+    url = reverse("blog:api-v1:comment-list") + "?pagination=cursor"
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert [comment["id"] for comment in response.data["results"]] == [approved_comment.id]
+    assert response.data["pagination"]["next"] is None
@@ -0,0 +1,195 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from accounts.models import Profile
+from blog.models import Comment, Post, Tag
+
+
+@pytest.fixture
+def tagged_posts(profile_factory, category):
+    author = profile_factory(email="queries@example.com")
+    tags = [Tag.objects.create(name=f"Tag {i}", slug=f"tag-{i}") for i in range(3)]
+    posts = []
+    for i in range(60):
+        post = Post.objects.create(
+            title=f"Query post {i}",
+            slug=f"query-post-{i}",
+            content="Test content",
+            status="published" if i % 2 else "draft",
+            category=category,
+            author=author,
+        )
+        post.tags.set(tags)
+        posts.append(post)
+    return posts
+
+
+def _list(client, page_size):
+    url = reverse("blog:api-v1:post-list") + f"?page_size={page_size}"
+    return client.get(url)
+
+
+class TestPostListQueryCount:
+    # ETag aggregate, COUNT(*) for pagination, the page itself, one prefetch for tags.
+    expected_queries = 4
+
+    @pytest.mark.parametrize("page_size", [5, 30])
+    def test_anonymous(self, api_client, tagged_posts, django_assert_num_queries, page_size):
+        with django_assert_num_queries(self.expected_queries):
+            response = _list(api_client, page_size)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == page_size
+
+    @pytest.mark.parametrize("page_size", [5, 50])
+    def test_authenticated(self, api_client, tagged_posts, django_assert_num_queries, page_size):
+        api_client.force_authenticate(user=tagged_posts[0].author.user)
+        with django_assert_num_queries(self.expected_queries):
+            response = _list(api_client, page_size)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == page_size
+
+    @pytest.mark.parametrize("page_size", [5, 50])
+    def test_staff(self, api_client, admin_user, tagged_posts, django_assert_num_queries, page_size):
+        api_client.force_authenticate(user=admin_user)
+        with django_assert_num_queries(self.expected_queries):
+            response = _list(api_client, page_size)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.data["results"]) == page_size
+
+    def test_results_include_related_fields(self, api_client, tagged_posts):
+        response = _list(api_client, 5)
+        post = response.data["results"][0]
+        assert post["author"] == "queries@example.com"
+        assert post["category"]["slug"] == "django"
+        assert post["tags"] == ["tag-0", "tag-1", "tag-2"]
+
+
+class TestPostRetrieveQueryCount:
+    # ETag aggregate, the cache lookup of `updated_date`, the post with its joins,
+    # one prefetch for tags.
+    expected_queries = 4
+
+    def test_anonymous(self, api_client, tagged_posts, django_assert_num_queries):
+        post = tagged_posts[1]
+        url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+        with django_assert_num_queries(self.expected_queries):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_cached(self, api_client, tagged_posts, django_assert_num_queries):
+        post = tagged_posts[1]
+        url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+        api_client.get(url)
+        with django_assert_num_queries(2):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_author_sees_own_draft(self, api_client, tagged_posts, django_assert_num_queries):
+        post = tagged_posts[0]
+        api_client.force_authenticate(user=post.author.user)
+        url = reverse("blog:api-v1:post-detail", kwargs={"slug": post.slug})
+        with django_assert_num_queries(self.expected_queries):
+            response = api_client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["status"] == "draft"
+
+    def test_anonymous_cannot_see_draft(self, api_client, tagged_posts):
+        url = reverse("blog:api-v1:post-detail", kwargs={"slug": tagged_posts[0].slug})
+        response = api_client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+class TestPostWriteQueryCount:
+    @pytest.fixture
+    def tags(self, db):
+        return [Tag.objects.create(name=f"Tag {i}", slug=f"tag-{i}") for i in range(20)]
+
+    def _payload(self, slugs):
+        return {
+            "title": "Tagged",
+            "content": "Content",
+            "category": {"title": "Django", "slug": "django"},
+            "tags": slugs,
+        }
+
+    def test_tags_resolve_in_one_query(self, authenticated_client, category, tags):
+        url = reverse("blog:api-v1:post-list")
+        slugs = [tag.slug for tag in tags]
+        with CaptureQueriesContext(connection) as captured:
+            response = authenticated_client.post(url, self._payload(slugs), format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["tags"] == slugs
+        tag_selects = [q for q in captured if q["sql"].startswith('SELECT "blog_tag"') and "INNER JOIN" not in q["sql"]]
+        assert len(tag_selects) == 1
+
+    def test_query_count_does_not_grow_with_tags(self, authenticated_client, category, tags):
+        url = reverse("blog:api-v1:post-list")
+
+        def queries(slugs):
+            with CaptureQueriesContext(connection) as captured:
+                payload = self._payload(slugs)
+                payload["title"] = f"Tagged {len(slugs)}"
+                assert authenticated_client.post(url, payload, format="json").status_code == status.HTTP_201_CREATED
+            return len(captured)
+
+        assert queries(["tag-0"]) == queries([tag.slug for tag in tags])
+
+
+
+class TestCommentCreateQueryCount:
+    url = reverse("blog:api-v1:comment-list")
+
+    def _create(self, client, user, post):
+        # A freshly loaded user, as token authentication would provide.
+        client.force_authenticate(user=get_user_model().objects.get(pk=user.pk))
+        with CaptureQueriesContext(connection) as captured:
+            response = client.post(self.url, {"post": post.pk, "content": "Hi"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        return response, [query["sql"] for query in captured]
+
+    def _assert_single_write(self, queries):
+        # Post lookup, author's profile, the INSERT and the post counters.
+        assert len(queries) == 4
+        assert [sql.split()[0] for sql in queries if '"blog_comment"' in sql.split("(")[0]] == ["INSERT"]
+        assert not any('FROM "accounts_customuser"' in sql for sql in queries)
+
+    def test_staff(self, api_client, admin_user, post):
+        response, queries = self._create(api_client, admin_user, post)
+        assert response.data["is_approved"] is True
+        self._assert_single_write(queries)
+        assert Comment.objects.get().is_approved
+
+    def test_non_staff(self, api_client, profile_factory, post):
+        user = profile_factory(email="commenter@example.com").user
+        response, queries = self._create(api_client, user, post)
+        assert response.data["is_approved"] is False
+        self._assert_single_write(queries)
+        assert not Comment.objects.get().is_approved
+
+    def test_non_staff_with_a_login_token(self, api_client, post):
+        # Token authentication builds the user from its claims, is_staff
+        # included, so nothing reads the user back from the database.
+        user = get_user_model().objects.create_user(email="token@example.com", password="test1234", is_verified=True)
+        Profile.objects.get_or_create(user=user)
+        login = api_client.post(
+            reverse("accounts:api-v1:jwt-create"), {"email": user.email, "password": "test1234"}, format="json"
+        )
+        assert login.status_code == status.HTTP_200_OK
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {login.data['access']}")
+        with CaptureQueriesContext(connection) as captured:
+            response = api_client.post(self.url, {"post": post.pk, "content": "Hi"}, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data["is_approved"] is False
+        assert not any('FROM "accounts_customuser"' in query["sql"] for query in captured)
+        assert not Comment.objects.get().is_approved
+
+    def test_outside_the_api(self, admin_user, post, django_assert_num_queries):
+        # Admin and shell: the author's user is read, the comment written once.
+        author = Profile.objects.get(user=admin_user)
+        with django_assert_num_queries(3):
+            comment = Comment.objects.create(post=post, author=author, content="Staff")
+        assert comment.is_approved
+        assert Comment.objects.get(pk=comment.pk).is_approved
@@ -0,0 +1,115 @@
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+
+import pytest
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.relations import Hyperlink
+from rest_framework.renderers import JSONRenderer
+from blog.models import Comment
+from .. import renderers
+from ..renderers import FastJSONRenderer, StreamingJSONRenderer
+
+SAMPLE = OrderedDict([
+    ("id", 1),
+    ("title", "Ünïcode “quotes” \\ </script>   "),
+    ("created", datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc)),
+    ("day", datetime.date(2024, 1, 2)),
+    ("price", decimal.Decimal("1.50")),
+    ("uuid", uuid.UUID("12345678-1234-5678-1234-567812345678")),
+    ("lazy", gettext_lazy("Password Reset")),
+    ("link", Hyperlink("http://testserver/x/", None)),
+    ("nested", {"tags": ["a", "b"], 1: None, "ok": True}),
+    ("huge", 2 ** 70),
+    ("empty", []),
+])
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(renderers, "orjson", None)
+    elif renderers.orjson is None:
+        pytest.skip("orjson is not installed")
+
+
+def test_fast_renderer_matches_json_renderer(encoder):
+    assert FastJSONRenderer().render(SAMPLE) == JSONRenderer().render(SAMPLE)
+    assert FastJSONRenderer().render(None) == b""
+
+
+def test_indent_uses_json_renderer(encoder):
+    media_type = "application/json; indent=2"
+    assert FastJSONRenderer().render(SAMPLE, media_type) == JSONRenderer().render(SAMPLE, media_type)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 64, 64 * 1024])
+def test_streamed_chunks_join_to_rendered_output(encoder, chunk_size):
+    renderer = StreamingJSONRenderer()
+    renderer.chunk_size = chunk_size
+    items = [dict(SAMPLE, id=i) for i in range(20)]
+    envelopes = [
+        {"pagination": {"next": None}, "results": items},
+        {"results": items, "count": 20},
+        {"before": 1, "results": [], "after": 2},
+        items,
+        [],
+    ]
+    for data in envelopes:
+        expected = JSONRenderer().render(data)
+        assert b"".join(renderer.stream(data)) == expected
+        assert renderer.render(data) == expected
+
+    chunks = list(renderer.stream({"results": items}))
+    if chunk_size < 1024:
+        assert len(chunks) > 5
+    else:
+        assert len(chunks) <= 5
+
+
+def test_stream_consumes_generators_lazily():
+    consumed = []
+
+    def results():
+        for i in range(3):
+            consumed.append(i)
+            yield {"id": i}
+
+    renderer = StreamingJSONRenderer()
+    renderer.chunk_size = 1
+    stream = renderer.stream({"results": results()})
+    assert next(stream) == b'{"results":'
+    assert consumed == []
+    assert next(stream) == b'[{"id":0}'
+    assert consumed == [0]
+    assert b"".join(stream) == b',{"id":1},{"id":2}]}'
+
+
+@pytest.mark.parametrize("name", ["post", "comment"])
+def test_streaming_list_response(api_client, admin_user, bulk_posts, name):
+    author = bulk_posts[0].author
+    Comment.objects.bulk_create(
+        Comment(post=post, author=author, content="Nice", is_approved=True) for post in bulk_posts
+    )
+    api_client.force_authenticate(user=admin_user)
+    url = reverse(f"blog:api-v1:{name}-list")
+    expected = api_client.get(url, {"page_size": 7})
+    response = api_client.get(url, {"page_size": 7, "format": "json-stream"})
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Type"] == "application/json"
+    assert "ETag" in response
+    streamed = json.loads(b"".join(response.streaming_content))
+    # Pagination links differ only by the format parameter.
+    assert streamed["results"] == json.loads(expected.content)["results"]
+    assert len(streamed["results"]) == 7
+
+
+def test_errors_are_not_streamed(api_client, db):
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": "missing"})
+    response = api_client.get(url, {"format": "json-stream"})
+    assert response.status_code == 404
+    assert not response.streaming
@@ -0,0 +1,177 @@
+import pytest
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, connections, router, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from blog.models import Category, Post
+from config.db import replicas
+from config.db.replicas import PIN_COOKIE, ReplicaSet
+
+CATEGORIES = reverse("blog:api-v1:category-list")
+
+
+def _create_schema(alias):
+    with connections[alias].schema_editor() as editor:
+        for model in apps.get_models():
+            if model._meta.managed and not model._meta.proxy:
+                editor.create_model(model)
+
+
+def replicate(alias):
+    """Bring SQLite replica `alias` up to date with the primary."""
+    connection = connections[alias]
+    connection.close()
+    connection.settings_dict["NAME"].unlink(missing_ok=True)
+    _create_schema(alias)
+    with transaction.atomic(using=alias):
+        for model in apps.get_models(include_auto_created=True):
+            if model._meta.managed and not model._meta.proxy:
+                manager = model._base_manager
+                manager.using(alias).bulk_create(manager.using(DEFAULT_DB_ALIAS).all())
+
+
+# Reads inside a transaction stay on the primary, so no wrapping test transaction.
+@pytest.fixture
+def add_database(transactional_db, tmp_path):
+    aliases = []
+
+    def add(alias, name=None):
+        connections.settings[alias] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            alias: {"ENGINE": "django.db.backends.sqlite3", "NAME": name or tmp_path / f"{alias}.sqlite3"},
+        })[alias]
+        aliases.append(alias)
+        return alias
+
+    yield add
+    for alias in aliases:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+
+@pytest.fixture
+def replica_set(add_database, monkeypatch):
+    """One replica, "replica", holding what the primary held when the test started."""
+    replicate(add_database("replica"))
+    replica_set = ReplicaSet(["replica"], pin_seconds=5, primary_models=["accounts.revokedtoken"])
+    monkeypatch.setattr(replicas, "_replica_set", replica_set)
+    return replica_set
+
+
+def _titles(client, **extra):
+    response = client.get(CATEGORIES, **extra)
+    assert response.status_code == 200
+    return [category["title"] for category in response.data["results"]]
+
+
+def test_safe_requests_read_from_the_replica(replica_set, category):
+    client = APIClient()
+    assert _titles(client) == []
+    replicate("replica")
+    assert _titles(client) == ["Django"]
+    assert replica_set.metrics()["reads"]["replica"] == 2
+
+
+def test_writers_read_their_writes(replica_set):
+    writer = APIClient()
+    response = writer.post(CATEGORIES, {"title": "Fresh", "slug": "fresh"})
+    assert response.status_code == 201
+    assert PIN_COOKIE in response.cookies
+    assert _titles(writer) == ["Fresh"]
+    # Not replicated yet.
+    assert _titles(APIClient()) == []
+
+
+def test_pinned_by_authorization_header_without_cookies(replica_set, user_factory):
+    user = user_factory()
+    replicate("replica")
+    authorization = f"Bearer {RefreshToken.for_user(user).access_token}"
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=authorization)
+    assert client.post(CATEGORIES, {"title": "Fresh", "slug": "fresh"}).status_code == 201
+    client.cookies.clear()
+    assert _titles(client) == ["Fresh"]
+
+    other = APIClient()
+    other.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    assert _titles(other) == []
+
+
+def test_expired_pin_reads_from_the_replica(replica_set):
+    client = APIClient()
+    client.post(CATEGORIES, {"title": "Fresh", "slug": "fresh"})
+    client.cookies[PIN_COOKIE] = "1"
+    assert _titles(client) == []
+
+
+def test_unreachable_replica_falls_back_to_the_primary(add_database, monkeypatch, tmp_path, category):
+    add_database("broken", name=tmp_path / "missing" / "broken.sqlite3")
+    replica_set = ReplicaSet(["broken"], retry_after=60)
+    monkeypatch.setattr(replicas, "_replica_set", replica_set)
+    client = APIClient()
+    assert _titles(client) == ["Django"]
+    assert _titles(client) == ["Django"]
+    metrics = replica_set.metrics()
+    assert (metrics["failures"], metrics["fallbacks"], metrics["down"]) == (1, 2, ["broken"])
+    assert metrics["reads"] == {DEFAULT_DB_ALIAS: 2, "broken": 0}
+
+
+def test_post_detail_cache_is_filled_from_the_primary(replica_set, published_post):
+    replicate("replica")
+    # Not replicated yet.
+    Post.objects.filter(pk=published_post.pk).update(title="Renamed", updated_date=timezone.now())
+    url = reverse("blog:api-v1:post-detail", kwargs={"slug": published_post.slug})
+    assert APIClient().get(url).data["title"] == "Renamed"
+
+    replicate("replica")
+    # bulk_create refreshes auto_now fields, put the primary's value back.
+    updated_date = Post.objects.get(pk=published_post.pk).updated_date
+    Post.objects.using("replica").filter(pk=published_post.pk).update(updated_date=updated_date)
+    with CaptureQueriesContext(connections[DEFAULT_DB_ALIAS]) as primary:
+        assert APIClient().get(url).data["title"] == "Renamed"
+    # Served from the cache, by the replica's updated_date.
+    assert len(primary) == 0
+
+
+def test_max_lag_is_bounded_by_pin_seconds():
+    assert ReplicaSet(pin_seconds=5).max_lag == 5
+    with pytest.raises(ImproperlyConfigured):
+        ReplicaSet(pin_seconds=5, max_lag=30)
+
+
+def test_requests_outside_the_middleware_use_the_primary(replica_set):
+    assert router.db_for_read(Category) == DEFAULT_DB_ALIAS
+    assert router.db_for_write(Category) == DEFAULT_DB_ALIAS
+    assert router.allow_migrate("replica", "blog") is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "blog") is True
+
+
+class TestSelection:
+    @pytest.fixture
+    def aliases(self, add_database):
+        return [add_database("replica_a"), add_database("replica_b")]
+
+    def test_round_robin(self, aliases):
+        replica_set = ReplicaSet(aliases)
+        assert [replica_set.choose() for _ in range(4)] == aliases * 2
+
+    def test_least_lag(self, aliases, monkeypatch):
+        lags = {"replica_a": 3.0, "replica_b": 0.5}
+        replica_set = ReplicaSet(aliases, selection="least_lag", max_lag=5, lag_interval=60)
+        monkeypatch.setattr(replica_set, "lag", lags.get)
+        assert replica_set.choose() == "replica_b"
+        # Measured once per `lag_interval`.
+        lags["replica_b"] = 20.0
+        assert replica_set.choose() == "replica_b"
+
+    def test_lagging_replicas_are_skipped(self, aliases, monkeypatch):
+        replica_set = ReplicaSet(aliases, max_lag=5)
+        monkeypatch.setattr(replica_set, "lag", {"replica_a": 30.0, "replica_b": 30.0}.get)
+        assert replica_set.choose() == DEFAULT_DB_ALIAS
+        assert replica_set.metrics()["lagging"] == 2
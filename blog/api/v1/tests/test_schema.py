@@ -0,0 +1,103 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.test import APIClient, APIRequestFactory
+
+from config import schema
+from config.schema import CachedSpectacularAPIView, SchemaCache
+
+SCHEMA_URL = reverse("schema")
+YAML = "application/vnd.oai.openapi"
+JSON = "application/vnd.oai.openapi+json"
+
+
+@pytest.fixture
+def schema_cache(monkeypatch):
+    cache = SchemaCache(version="test")
+    monkeypatch.setattr(schema, "_schema_cache", cache)
+    return cache
+
+
+@pytest.fixture
+def generations(monkeypatch):
+    calls = []
+    original = SpectacularAPIView._get_schema_response
+
+    def counting(self, request):
+        calls.append(request)
+        return original(self, request)
+    monkeypatch.setattr(SpectacularAPIView, "_get_schema_response", counting)
+    return calls
+
+
+@pytest.mark.django_db
+def test_schema_is_generated_once_per_format(schema_cache, generations):
+    client = APIClient()
+    first = client.get(SCHEMA_URL, HTTP_ACCEPT=YAML)
+    second = client.get(SCHEMA_URL, HTTP_ACCEPT=YAML)
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first["ETag"] == second["ETag"]
+    assert first["Content-Type"] == "application/vnd.oai.openapi; charset=utf-8"
+    assert len(generations) == 1
+
+    as_json = client.get(SCHEMA_URL, HTTP_ACCEPT=JSON)
+    assert as_json["Content-Type"] == JSON
+    assert as_json["ETag"] != first["ETag"]
+    assert len(generations) == 2
+
+
+@pytest.mark.django_db
+def test_cached_schema_matches_spectacular(schema_cache):
+    request = APIRequestFactory().get("/", HTTP_ACCEPT=JSON)
+    expected = SpectacularAPIView.as_view()(request)
+    expected.render()
+    response = APIClient().get(SCHEMA_URL, HTTP_ACCEPT=JSON)
+    assert response.content == expected.content
+    assert response["Content-Disposition"] == expected["Content-Disposition"]
+    assert b"jwtAuth" in response.content
+
+
+@pytest.mark.django_db
+def test_matching_etag_gets_not_modified(schema_cache):
+    client = APIClient()
+    etag = client.get(SCHEMA_URL)["ETag"]
+    response = client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert response.content == b""
+    assert client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+
+
+@pytest.mark.django_db
+def test_unknown_lang_and_version_share_the_default_entry(schema_cache, generations):
+    client = APIClient()
+    default = client.get(SCHEMA_URL, HTTP_ACCEPT=JSON)
+    for query in ["?lang=xx", "?lang=zz-top", "?version=9", "?version=1&lang=nope"]:
+        response = client.get(SCHEMA_URL + query, HTTP_ACCEPT=JSON)
+        assert response.status_code == 200
+        assert response["ETag"] == default["ETag"]
+    assert len(generations) == 1
+    assert len(schema_cache.entries) == 1
+
+    client.get(SCHEMA_URL + "?lang=en", HTTP_ACCEPT=JSON)
+    assert len(schema_cache.entries) == 2
+
+
+@pytest.mark.django_db
+def test_build_schema_is_loaded_without_generating(tmp_path, settings, monkeypatch, generations):
+    path = tmp_path / "schema.json"
+    settings.OPENAPI_SCHEMA_CACHE = {"path": path, "version": "1"}
+    call_command("build_schema")
+    assert len(generations) == len(CachedSpectacularAPIView.renderer_classes)
+
+    generations.clear()
+    monkeypatch.setattr(schema, "_schema_cache", None)
+    response = APIClient().get(SCHEMA_URL, HTTP_ACCEPT=JSON)
+    assert response.status_code == 200
+    assert generations == []
+
+    # Built for another version of the code: generated again.
+    assert SchemaCache(path, version="2").entries == {}
+
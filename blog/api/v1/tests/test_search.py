@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from blog.api.v1.filters import PostSearchFilter
+from blog.models import Post
+from blog.search import get_search_backend
+
+
+@pytest.fixture
+def search_posts(profile_factory, category):
+    author = profile_factory(email="writer@example.com")
+
+    def create(title, content, slug, status="published"):
+        return Post.objects.create(
+            title=title, content=content, slug=slug, status=status, category=category, author=author
+        )
+
+    return {
+        "title": create("Django signals explained", "A short note.", "title-match"),
+        "content": create("Weekly notes", "Some words about django and signals.", "content-match"),
+        "other": create("Cooking pasta", "Boil water first.", "no-match"),
+        "draft": create("Django drafts", "Unpublished django signals.", "draft-match", status="draft"),
+    }
+
+
+def _search(client, terms):
+    return client.get(reverse("blog:api-v1:post-list"), {"search": terms})
+
+
+def test_title_matches_rank_above_content_matches(api_client, search_posts):
+    response = _search(api_client, "django signals")
+    assert response.status_code == status.HTTP_200_OK
+    slugs = [post["slug"] for post in response.data["results"]]
+    assert slugs == ["title-match", "content-match"]
+
+
+def test_search_respects_visibility(api_client, search_posts):
+    slugs = [post["slug"] for post in _search(api_client, "drafts").data["results"]]
+    assert slugs == []
+
+    api_client.force_authenticate(user=search_posts["draft"].author.user)
+    slugs = [post["slug"] for post in _search(api_client, "drafts").data["results"]]
+    assert slugs == ["draft-match"]
+
+
+def test_index_follows_updates(api_client, search_posts):
+    post = search_posts["other"]
+    post.title = "Risotto"
+    post.save()
+    assert [p["slug"] for p in _search(api_client, "risotto").data["results"]] == ["no-match"]
+    assert _search(api_client, "pasta").data["results"] == []
+
+
+def test_deleted_posts_leave_the_index(search_posts):
+    search_posts["title"].delete()
+    assert not get_search_backend().search(Post.objects.all(), "explained").exists()
+
+
+def test_query_syntax_is_not_interpreted(api_client, search_posts):
+    response = _search(api_client, 'django" OR "pasta*')
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_search_by_author_email(api_client, search_posts):
+    response = _search(api_client, "writer@example.com")
+    assert {post["slug"] for post in response.data["results"]} == {"title-match", "content-match", "no-match"}
+
+
+def test_search_by_partial_author_email(api_client, search_posts):
+    response = _search(api_client, "WRITER@")
+    assert {post["slug"] for post in response.data["results"]} == {"title-match", "content-match", "no-match"}
+
+
+def test_terms_with_at_signs_still_match_text(api_client, search_posts):
+    response = _search(api_client, "@django")
+    assert {post["slug"] for post in response.data["results"]} == {"title-match", "content-match"}
+
+
+def test_email_search_runs_the_text_match_once(search_posts):
+    if connection.vendor != "sqlite":
+        pytest.skip("Checks SQLite's query plan.")
+    request = Request(APIRequestFactory().get("/", {"search": "writer@"}))
+    queryset = PostSearchFilter().filter_queryset(request, Post.objects.all(), None)
+    # A subquery referring to the outer row would be re-run per post.
+    plan = queryset.explain()
+    assert "LIST SUBQUERY" in plan
+    assert "CORRELATED" not in plan
+    assert {post.slug for post in queryset} == {"title-match", "content-match", "no-match", "draft-match"}
+
+
+def test_rebuild_indexes_bulk_created_posts(search_posts):
+    author = search_posts["title"].author
+    Post.objects.bulk_create([Post(title="Bulk quokka", content="...", slug="bulk", author=author)])
+    backend = get_search_backend()
+    assert not backend.search(Post.objects.all(), "quokka").exists()
+    backend.rebuild()
+    assert backend.search(Post.objects.all(), "quokka").exists()
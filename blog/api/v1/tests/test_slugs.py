@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+from django.db import connection, connections
+
+from blog import slugs
+from blog.models import Category, Post, Tag
+from blog.slugs import allocate_slug
+
+
+def _post(author, title="Hello", **kwargs):
+    return Post.objects.create(author=author, title=title, content="...", **kwargs)
+
+
+@pytest.fixture
+def author(profile_factory):
+    return profile_factory(email="slugs@example.com")
+
+
+def test_same_titles_get_numbered_slugs(author):
+    assert [_post(author).slug for _ in range(3)] == ["hello", "hello-2", "hello-3"]
+    assert [Category.objects.create(title="Django").slug for _ in range(2)] == ["django", "django-2"]
+    assert [Tag.objects.create(name="Python").slug for _ in range(2)] == ["python", "python-2"]
+    assert _post(author, slug="chosen").slug == "chosen"
+
+
+def test_allocate_slug_is_one_query(author, django_assert_num_queries):
+    for slug in ["hello", "hello-2", "hello-10", "hello-world-99", "hello-007"]:
+        _post(author, slug=slug)
+    with django_assert_num_queries(1):
+        assert allocate_slug(Post.objects.all(), "Hello") == "hello-11"
+    Post.objects.filter(slug="hello").delete()
+    with django_assert_num_queries(1):
+        assert allocate_slug(Post.objects.all(), "Hello") == "hello"
+    assert allocate_slug(Post.objects.all(), "Hello world") == "hello-world"
+
+
+def test_slug_taken_by_a_concurrent_writer_is_retried(author, monkeypatch):
+    allocate = slugs.allocate_slug
+    calls = []
+
+    def racing(queryset, text, field="slug"):
+        slug = allocate(queryset, text, field)
+        if not calls:
+            # Another writer inserts the same slug between allocation and insert.
+            Post.objects.bulk_create([Post(author=author, title=text, content="...", slug=slug)])
+        calls.append(slug)
+        return slug
+
+    monkeypatch.setattr(slugs, "allocate_slug", racing)
+    post = _post(author)
+    assert post.slug == "hello-2"
+    assert calls == ["hello", "hello-2"]
+    assert Post.objects.filter(slug__startswith="hello").count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_same_titled_posts(author):
+    if connection.vendor != "postgresql":
+        pytest.skip("SQLite serializes writers with table locks, run against PostgreSQL.")
+    threads, per_thread = 4, 10
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def work():
+        try:
+            barrier.wait()
+            for _ in range(per_thread):
+                _post(author)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert errors == []
+    created = set(Post.objects.values_list("slug", flat=True))
+    assert created == {"hello", *(f"hello-{n}" for n in range(2, threads * per_thread + 1))}
@@ -7,10 +7,18 @@ from rest_framework.response import  Response
 from rest_framework import status
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter
-from django.db.models import Q
-
-class PostViewSet(ModelViewSet):
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+import re
+from .filters import PostSearchFilter
+from .export import NDJSONExporter, gzip_chunks, parse_since
+from .fast import FastCommentSerializer, FastPostSerializer
+from .renderers import FastJSONRenderer, NDJSONRenderer
+from .mixins import CachedPostDetailMixin, ConditionalGetMixin, FastListMixin, StreamingResponseMixin
+
+GZIP_ACCEPTED = re.compile(r'\bgzip\b')
+
+class PostViewSet(ConditionalGetMixin, FastListMixin, StreamingResponseMixin, CachedPostDetailMixin, ModelViewSet):
     """
     ViewSet for managing blog posts.    
     Provides full CRUD functionality.
@@ -22,28 +30,18 @@ class PostViewSet(ModelViewSet):
 
     Supports filtering by status and includes custom logic for visibility of draft posts.
     """
-    queryset = Post.objects.all().select_related("category").prefetch_related("tags")
+    queryset = Post.objects.with_related()
     serializer_class = PostSerializer
+    fast_list_serializer = FastPostSerializer
     lookup_field = "slug"
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend , SearchFilter]
+    filter_backends = [DjangoFilterBackend , PostSearchFilter]
     filterset_fields = ['status']
-    search_fields = ['title', 'content', 'author__user__email']
+    conditional_fields = ("updated_date", "category__updated_date", "tags__updated_date")
     
     def get_queryset(self):
-        user = self.request.user
+        return self.queryset.visible_to(self.request.user)
 
-        if user.is_staff:
-            return Post.objects.all()
-
-        if user.is_authenticated:
-            return Post.objects.filter(
-                Q(status="published") | Q(author=user.profile)
-            )
-
-        return Post.objects.filter(status="published")
-
-    
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         self.perform_destroy(instance)
@@ -52,7 +50,53 @@ class PostViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user.profile)
 
-class CategoryViewSet(ModelViewSet):
+    # Posts accepted by one `bulk` request.
+    bulk_create_limit = 5000
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        '''Create a list of posts in one transaction, see `PostListSerializer`.'''
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of posts.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.bulk_create_limit:
+            return Response(
+                {'detail': f'At most {self.bulk_create_limit} posts can be created at once.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        posts = serializer.save(author=request.user.profile)
+        created = Post.objects.with_related().filter(pk__in=[post.pk for post in posts]).order_by('pk')
+        return Response(self.get_serializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, FastJSONRenderer])
+    def export(self, request):
+        '''
+        Stream every post the user can see as NDJSON, see `NDJSONExporter`.
+
+        Query parameters: `since` (ISO 8601 date or datetime) keeps rows updated
+        since then, `comments=1` appends their comments. Gzipped on the fly when
+        the client accepts it.
+        '''
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_since(since)
+            except ValueError as exc:
+                return Response({'since': [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+        comments = request.query_params.get('comments', '').lower() in ('1', 'true', 'yes')
+        chunks = NDJSONExporter(request.user, since=since or None, comments=comments, request=request).chunks()
+
+        response = StreamingHttpResponse(content_type=NDJSONRenderer.media_type)
+        response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if GZIP_ACCEPTED.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            chunks = gzip_chunks(chunks)
+            response['Content-Encoding'] = 'gzip'
+        response.streaming_content = chunks
+        return response
+
+class CategoryViewSet(ConditionalGetMixin, ModelViewSet):
     """
     ViewSet for managing post categories.
 
@@ -63,7 +107,7 @@ class CategoryViewSet(ModelViewSet):
     serializer_class = CategorySerialzer
     lookup_field = "slug"
 
-class TagViewSet(ModelViewSet):
+class TagViewSet(ConditionalGetMixin, ModelViewSet):
     """
     ViewSet for managing post tags.
 
@@ -74,7 +118,7 @@ class TagViewSet(ModelViewSet):
     serializer_class = TagSerializer
     lookup_field = "slug"
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, FastListMixin, StreamingResponseMixin, ModelViewSet):
     """
     ViewSet for managing comments on blog posts.
 
@@ -90,9 +134,11 @@ class CommentViewSet(ModelViewSet):
 
     queryset = Comment.objects.filter(is_approved=True)
     serializer_class = CommentSerializer
+    fast_list_serializer = FastCommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly, IsAuthorOrAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['post', 'author', 'is_approved']
+    conditional_fields = ("updated_date", "post__updated_date")
     
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -100,22 +146,23 @@ class CommentViewSet(ModelViewSet):
         return Response({"detail": "Comment deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user.profile)
+        # Staff comments are approved right away, decided here from the
+        # authenticated user so creating a comment is a single INSERT.
+        user = self.request.user
+        serializer.save(author=user.profile, is_approved=user.is_staff, approval_decided=True)
+
+    def perform_update(self, serializer):
+        # A comment moved to another post takes its counts along.
+        comment = serializer.instance
+        old_post_id, was_approved = comment.post_id, comment.is_approved
+        serializer.save().update_post_counts(old_post_id, was_approved)
 
     def get_queryset(self):
-        user = self.request.user
-        if user.is_staff:
-            return Comment.objects.all()
-        elif user.is_authenticated:
-            return Comment.objects.filter(
-                Q(is_approved=True) | Q(author=user.profile)
-            )
-        return Comment.objects.filter(is_approved=True)
+        return Comment.objects.visible_to(self.request.user)
         
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     def approve(self, request, pk=None):
         comment = self.get_object()
-        comment.is_approved = True
-        comment.save()
+        Comment.objects.filter(pk=comment.pk).approve()
         return Response({'detail':'Comment approved'})
\ No newline at end of file
@@ -0,0 +1,354 @@
+import tempfile
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from datetime import timedelta
+from urllib import parse
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from drf_spectacular.views import SpectacularAPIView
+from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.utils import ConnectionHandler
+from django.utils import timezone
+from rest_framework.filters import SearchFilter
+from rest_framework.relations import HyperlinkedIdentityField, HyperlinkedRelatedField
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from blog.api.v1.filters import PostSearchFilter
+from blog.api.v1.pagination import CustomPagination, KeysetPagination
+from blog.api.v1.export import NDJSONExporter, gzip_chunks
+from blog.api.v1.fast import FastCommentSerializer, FastPostSerializer
+from blog.api.v1.renderers import FastJSONRenderer, StreamingJSONRenderer
+from blog.api.v1.serializers import CategorySerialzer, CommentSerializer, PostSerializer
+from blog.models import Category, Comment, Post, Tag
+from blog.search import get_search_backend
+from blog.slugs import allocate_slug, allocate_slugs
+from config.db import MODES, POOLED_ENGINES, database
+from config.db.pool import close_pools, pool_metrics
+from config.schema import CachedSpectacularAPIView, SchemaCache, code_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Run blog API micro-benchmarks against a seeded dataset. "
+        "Everything runs inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("case", choices=sorted(self.cases()))
+        parser.add_argument("--size", type=int, default=20000, help="Number of rows to seed.")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement, best one is reported.")
+
+    @classmethod
+    def cases(cls):
+        return {name[len("bench_"):]: name for name in dir(cls) if name.startswith("bench_")}
+
+    def handle(self, *args, **options):
+        self.size = options["size"]
+        self.repeat = options["repeat"]
+        with transaction.atomic():
+            getattr(self, self.cases()[options["case"]])()
+            transaction.set_rollback(True)
+
+    # helpers
+
+    def measure(self, func):
+        best = None
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def report(self, label, seconds):
+        self.stdout.write(f"{label:<50} {seconds * 1000:10.2f} ms")
+
+    def seed_posts(self, size, title=None, status="published"):
+        user = get_user_model().objects.create_user(email="benchmark@example.com", password="benchmark")
+        category = Category.objects.create(title="Benchmark", slug="benchmark")
+        now = timezone.now()
+        posts = [
+            Post(
+                author=user.profile,
+                category=category,
+                title=title or f"Benchmark post {i}",
+                slug=f"benchmark-post-{i}",
+                content=f"Benchmark content number {i}",
+                status=status,
+                created_date=now - timedelta(seconds=i),
+            )
+            for i in range(size)
+        ]
+        Post.objects.bulk_create(posts, batch_size=1000)
+        return user.profile
+
+    # cases
+
+    def bench_pagination(self):
+        """Page-number vs keyset pagination at increasing depth."""
+        self.seed_posts(self.size)
+        factory = APIRequestFactory(SERVER_NAME="localhost")
+        queryset = Post.objects.filter(status="published")
+        page_size = 50
+        last_page = self.size // page_size
+
+        for page in sorted({1, last_page // 10 or 1, last_page // 2 or 1, last_page}):
+            def page_number():
+                request = Request(factory.get("/", {"page": page, "page_size": page_size}))
+                CustomPagination().paginate_queryset(queryset, request)
+
+            offset = (page - 1) * page_size
+            cursor = None
+            if offset:
+                anchor = queryset.order_by("-created_date", "-id")[offset - 1]
+                paginator = KeysetPagination()
+                paginator.base_url = "/"
+                link = paginator.encode_cursor(anchor, reverse=False)
+                cursor = parse.parse_qs(parse.urlsplit(link).query)["cursor"][0]
+
+            def keyset():
+                params = {"page_size": page_size}
+                if cursor:
+                    params["cursor"] = cursor
+                KeysetPagination().paginate_queryset(queryset, Request(factory.get("/", params)))
+
+            self.report(f"page-number pagination, page {page}", self.measure(page_number))
+            self.report(f"keyset pagination, page {page}", self.measure(keyset))
+
+    def bench_search(self):
+        """icontains SearchFilter vs the full-text index."""
+        self.seed_posts(self.size)
+        backend = get_search_backend()
+        start = time.perf_counter()
+        backend.rebuild()
+        self.report(f"index build, {self.size} posts", time.perf_counter() - start)
+
+        queryset = Post.objects.filter(status="published")
+        factory = APIRequestFactory(SERVER_NAME="localhost")
+
+        class View:
+            search_fields = ["title", "content", "author__user__email"]
+
+        for terms in ["number 4242", "content", "missing"]:
+            request = Request(factory.get("/", {"search": terms}))
+
+            def icontains():
+                list(SearchFilter().filter_queryset(request, queryset, View())[:50])
+
+            def full_text():
+                list(PostSearchFilter().filter_queryset(request, queryset, View())[:50])
+
+            self.report(f"icontains search '{terms}'", self.measure(icontains))
+            self.report(f"full-text search '{terms}'", self.measure(full_text))
+
+    def bench_serializer(self):
+        """PostSerializer with reverse()-based links vs templated links, per 1,000 rows."""
+        self.seed_posts(self.size)
+
+        class ReverseCategorySerializer(CategorySerialzer):
+            serializer_url_field = HyperlinkedIdentityField
+
+        class ReversePostSerializer(PostSerializer):
+            category = ReverseCategorySerializer()
+            category_link = HyperlinkedRelatedField(
+                source="category", view_name="blog:api-v1:category-detail", lookup_field="slug", read_only=True
+            )
+
+        posts = list(Post.objects.with_related())
+        request = Request(APIRequestFactory(SERVER_NAME="localhost").get("/"))
+        per_thousand = 1000 / len(posts)
+        for label, serializer_class in (("reverse()", ReversePostSerializer), ("templated", PostSerializer)):
+            def serialize():
+                serializer_class(posts, many=True, context={"request": request}).data
+            self.report(f"serialize posts, {label} links, per 1k rows", self.measure(serialize) * per_thousand)
+
+    def bench_fast_list(self):
+        """DRF serializers vs the values()-based fast path, fetch plus serialize."""
+        profile = self.seed_posts(self.size)
+        tags = Tag.objects.bulk_create([Tag(name=f"Tag {i}", slug=f"tag-{i}") for i in range(5)])
+        posts = list(Post.objects.values_list("pk", flat=True))
+        Through = Post.tags.through
+        Through.objects.bulk_create(
+            [Through(post_id=pk, tag_id=tag.pk) for pk in posts for tag in tags[:pk % 5]], batch_size=1000
+        )
+        Comment.objects.bulk_create(
+            [Comment(post_id=pk, author=profile, content=f"Comment on {pk}") for pk in posts], batch_size=1000
+        )
+        context = {"request": Request(APIRequestFactory(SERVER_NAME="localhost").get("/"))}
+        page = 100
+
+        cases = [
+            ("posts, PostSerializer", lambda: PostSerializer(
+                Post.objects.with_related()[:page], many=True, context=context).data),
+            ("posts, FastPostSerializer", lambda: FastPostSerializer(context).serialize(
+                FastPostSerializer(context).rows(Post.objects.all())[:page])),
+            ("comments, CommentSerializer", lambda: CommentSerializer(
+                Comment.objects.all()[:page], many=True, context=context).data),
+            ("comments, FastCommentSerializer", lambda: FastCommentSerializer(context).serialize(
+                FastCommentSerializer(context).rows(Comment.objects.all())[:page])),
+        ]
+        for label, func in cases:
+            seconds = self.measure(func)
+            self.stdout.write(f"{label:<50} {seconds * 1000:10.2f} ms {page / seconds:10.0f} rows/s")
+
+    def bench_render(self):
+        """JSONRenderer vs FastJSONRenderer vs streaming, time and peak memory for one big list."""
+        self.seed_posts(self.size)
+        context = {"request": Request(APIRequestFactory(SERVER_NAME="localhost").get("/"))}
+        serializer = FastPostSerializer(context)
+        data = {"count": self.size, "results": serializer.serialize(serializer.rows(Post.objects.all()))}
+
+        def consume(chunks):
+            size = 0
+            for chunk in chunks:
+                size += len(chunk)
+            return size
+
+        cases = [
+            ("JSONRenderer", lambda: JSONRenderer().render(data)),
+            ("FastJSONRenderer", lambda: FastJSONRenderer().render(data)),
+            ("StreamingJSONRenderer, consumed", lambda: consume(StreamingJSONRenderer().stream(data))),
+        ]
+        for label, func in cases:
+            seconds = self.measure(func)
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.stdout.write(f"{label:<50} {seconds * 1000:10.2f} ms {peak / 2 ** 20:10.1f} MiB peak")
+
+    def bench_export(self):
+        """Full NDJSON export: paging the list serializer vs the streaming exporter, time and peak memory."""
+        self.seed_posts(self.size)
+        context = {"request": Request(APIRequestFactory(SERVER_NAME="localhost").get("/"))}
+        page_size = 100
+
+        def paged():
+            queryset = Post.objects.with_related().filter(status="published").order_by("pk")
+            for start in range(0, self.size, page_size):
+                JSONRenderer().render(PostSerializer(queryset[start:start + page_size], many=True, context=context).data)
+
+        def consume(chunks):
+            for _ in chunks:
+                pass
+
+        cases = [
+            (f"list serializer, pages of {page_size}", paged),
+            ("NDJSONExporter", lambda: consume(NDJSONExporter(AnonymousUser()).chunks())),
+            ("NDJSONExporter, gzip", lambda: consume(gzip_chunks(NDJSONExporter(AnonymousUser()).chunks()))),
+        ]
+        for label, func in cases:
+            seconds = self.measure(func)
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.stdout.write(
+                f"{label:<50} {seconds * 1000:10.2f} ms {self.size / seconds:10.0f} rows/s {peak / 2 ** 20:8.1f} MiB peak"
+            )
+
+    def bench_schema(self):
+        """OpenAPI schema response: introspection on every request vs the cached view, cold and warm."""
+        factory = APIRequestFactory(SERVER_NAME="localhost")
+        uncached = SpectacularAPIView.as_view()
+        cache = SchemaCache(version="benchmark")
+        cached = CachedSpectacularAPIView.as_view(schema_cache=cache)
+
+        def cold():
+            cache.clear()
+            return cached(factory.get("/api/schema/"))
+
+        etag = cold()["ETag"]
+        with tempfile.TemporaryDirectory() as directory:
+            cache.path = Path(directory, "schema.json")
+            cache.save()
+            cases = [
+                ("SpectacularAPIView", lambda: uncached(factory.get("/api/schema/")).render()),
+                ("CachedSpectacularAPIView, cold", cold),
+                ("CachedSpectacularAPIView, cached", lambda: cached(factory.get("/api/schema/"))),
+                (
+                    "CachedSpectacularAPIView, If-None-Match (304)",
+                    lambda: cached(factory.get("/api/schema/", HTTP_IF_NONE_MATCH=etag)),
+                ),
+                ("loading the built schema file", lambda: SchemaCache(cache.path, version="benchmark").entries),
+                ("code_version() (once per process)", code_version),
+            ]
+            for label, func in cases:
+                self.report(label, self.measure(func))
+
+    def bench_slugs(self):
+        """Slugs for `--size` posts with one title: batch allocation, then one more post at that depth."""
+        author = self.seed_posts(0)
+        queryset = Post.objects.all()
+        title = "Same title"
+
+        start = time.perf_counter()
+        slugs = allocate_slugs(queryset, [title] * self.size)
+        self.report(f"allocate_slugs(), batch of {self.size}", time.perf_counter() - start)
+        Post.objects.bulk_create(
+            [Post(author=author, title=title, slug=slug, content="...") for slug in slugs], batch_size=1000
+        )
+
+        def probe():
+            # What a probe-per-suffix loop costs: one query per taken suffix.
+            base, number = slugs[0], 2
+            while queryset.filter(slug=f"{base}-{number}").exists():
+                number += 1
+
+        self.report(f"allocate_slug(), {self.size} taken", self.measure(lambda: allocate_slug(queryset, title)))
+        self.report(f"Post.save(), {self.size} taken", self.measure(
+            lambda: Post(author=author, title=title, content="...").save()
+        ))
+        self.report(f"probe-per-suffix loop, {self.size} taken", self.measure(probe))
+
+    def bench_connections(self):
+        """Per-request connection handling in each `config.db` mode, `--size` requests from 4 threads."""
+        base = {
+            key: value for key, value in settings.DATABASES[connection.alias].items()
+            if key in ("ENGINE", "NAME", "USER", "PASSWORD", "HOST", "PORT", "OPTIONS")
+        }
+        unpooled = {pooled: engine for engine, pooled in POOLED_ENGINES.items()}
+        base["ENGINE"] = unpooled.get(base["ENGINE"], base["ENGINE"])
+        threads, per_thread = 4, max(1, self.size // 4)
+
+        def run(handler):
+            def serve():
+                db = handler["default"]
+                for _ in range(per_thread):
+                    # What close_old_connections() does on request_started / request_finished.
+                    db.close_if_unusable_or_obsolete()
+                    with db.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                    db.close_if_unusable_or_obsolete()
+                db.close()
+
+            workers = [threading.Thread(target=serve) for _ in range(threads)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        for mode in MODES:
+            if mode == "pgbouncer":
+                # Same as "persistent" without a PgBouncer in between.
+                continue
+            handler = ConnectionHandler({"default": database(mode, pool={"max_size": 2}, **base)})
+            seconds = self.measure(lambda: run(handler))
+            handler.close_all()
+            line = f"{mode:<20} {seconds * 1000:10.2f} ms {seconds / (threads * per_thread) * 1e6:8.1f} us/request"
+            if mode == "pool":
+                metrics = pool_metrics()["default"]
+                line += (
+                    f"  {metrics['checkouts']} checkouts, {metrics['connects']} connects, "
+                    f"{metrics['waits']} waited, wait avg {metrics['wait_avg'] * 1e6:.1f} us "
+                    f"max {metrics['wait_max'] * 1e3:.2f} ms"
+                )
+                close_pools()
+            self.stdout.write(line)
@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from config.schema import CachedSpectacularAPIView, SchemaCache
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema in every format `CachedSpectacularAPIView` serves and write it "
+        "to OPENAPI_SCHEMA_CACHE['path'], for workers to load instead of introspecting the API. "
+        "Run at build time, after the code is in place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="Write here instead of OPENAPI_SCHEMA_CACHE['path'].")
+        parser.add_argument(
+            "--lang", action="append", default=[],
+            help="Also build the schema translated to this language. Repeatable.",
+        )
+
+    def handle(self, *args, **options):
+        config = dict(getattr(settings, "OPENAPI_SCHEMA_CACHE", {}))
+        if options["output"]:
+            config["path"] = options["output"]
+        if not config.get("path"):
+            raise CommandError("Set OPENAPI_SCHEMA_CACHE['path'] or pass --output.")
+        cache = SchemaCache(**config)
+        cache.clear()
+
+        view = CachedSpectacularAPIView.as_view(schema_cache=cache)
+        factory = APIRequestFactory()
+        media_types = [renderer.media_type for renderer in CachedSpectacularAPIView.renderer_classes]
+        start = time.perf_counter()
+        for lang in [None, *options["lang"]]:
+            for media_type in media_types:
+                request = factory.get("/", {"lang": lang} if lang else {}, HTTP_ACCEPT=media_type)
+                response = view(request)
+                if response.status_code != 200:
+                    raise CommandError(f"Building the {media_type} schema failed with status {response.status_code}.")
+        cache.save()
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(cache.entries)} schemas for version {cache.version} to {cache.path} "
+            f"in {time.perf_counter() - start:.1f}s."
+        ))
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.api.v1.export import CHUNK_SIZE, NDJSONExporter, gzip_chunks, parse_since
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream posts, and optionally their comments, as NDJSON. Exports what an "
+        "anonymous visitor sees unless --as-user is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", default="-", help="File to write, '-' for stdout.")
+        parser.add_argument("--since", help="Only rows updated at or after this ISO 8601 date or datetime.")
+        parser.add_argument("--comments", action="store_true", help="Append the exported posts' comments.")
+        parser.add_argument("--as-user", help="Email of the user whose visibility rules apply.")
+        parser.add_argument(
+            "--gzip", action="store_true",
+            help="Gzip the output, implied by an --output ending in .gz.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = parse_since(options["since"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        user = AnonymousUser()
+        if options["as_user"]:
+            try:
+                user = get_user_model().objects.get(email=options["as_user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user with email '{options['as_user']}'.")
+
+        output = options["output"]
+        chunks = NDJSONExporter(
+            user, since=since, comments=options["comments"], chunk_size=options["chunk_size"]
+        ).chunks()
+        if options["gzip"] or output.endswith(".gz"):
+            chunks = gzip_chunks(chunks)
+
+        if output != "-":
+            with open(output, "wb") as stream:
+                for chunk in chunks:
+                    stream.write(chunk)
+            return
+        # Bytes go straight to the underlying binary stream when there is one.
+        stream = getattr(self.stdout._out, "buffer", None)
+        if stream is None and options["gzip"]:
+            raise CommandError("Gzipped output needs --output or a binary stdout.")
+        for chunk in chunks:
+            if stream is not None:
+                stream.write(chunk)
+            else:
+                self.stdout.write(chunk.decode(), ending="")
+        if stream is not None:
+            stream.flush()
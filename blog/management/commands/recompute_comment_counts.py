@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.comment_count and Post.approved_comment_count from the comments table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Posts recounted per transaction, keeps row locks short on large tables.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        fixed = checked = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                fixed += Post.objects.filter(pk__in=pks).recompute_comment_counts()
+            checked += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} posts, fixed {fixed}."))
@@ -1,15 +1,69 @@
-from django.db import models
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from django.utils.text import slugify
+from .search import get_search_backend
+from .slugs import SlugMixin, allocate_slugs
 
 # Create your models here.
-class Post(models.Model):
+class PostQuerySet(models.QuerySet):
+    def with_related(self):
+        """
+        Join everything `PostSerializer` reads so a page of posts costs a fixed
+        number of queries: author, author's user and category in the main query,
+        tags in a single prefetch (ordered by id, like the fast list path).
+        """
+        return self.select_related("author__user", "category").prefetch_related(
+            Prefetch("tags", queryset=Tag.objects.order_by("pk"))
+        )
+
+    def visible_to(self, user):
+        """
+        Restrict posts to the ones `user` is allowed to see.
+
+        - Admins: every post.
+        - Authenticated users: published posts and their own drafts.
+        - Anonymous users: published posts only.
+        """
+        if user.is_staff:
+            return self.all()
+        if user.is_authenticated:
+            return self.filter(Q(status="published") | Q(author__user_id=user.pk))
+        return self.filter(status="published")
+
+    def recompute_comment_counts(self):
+        """
+        Recount `comment_count` and `approved_comment_count` from the comments
+        table for posts whose counters drifted. Returns the number of posts fixed.
+        """
+        comments = Comment.objects.filter(post=OuterRef("pk")).order_by().values("post")
+        total = Subquery(comments.annotate(n=Count("pk")).values("n"))
+        approved = Subquery(comments.filter(is_approved=True).annotate(n=Count("pk")).values("n"))
+        drifted = self.annotate(
+            actual_total=Coalesce(total, 0),
+            actual_approved=Coalesce(approved, 0),
+        ).filter(
+            ~Q(comment_count=F("actual_total")) | ~Q(approved_comment_count=F("actual_approved"))
+        )
+        return self.filter(pk__in=drifted.values("pk")).update(
+            comment_count=Coalesce(total, 0),
+            approved_comment_count=Coalesce(approved, 0),
+            updated_date=timezone.now(),
+        )
+
+
+class Post(SlugMixin, models.Model):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('published', 'Published'),
     )
 
-    author = models.ForeignKey("accounts.Profile", on_delete=models.CASCADE)
+    # Indexed as the leading column of `blog_post_author_status_idx`.
+    author = models.ForeignKey("accounts.Profile", on_delete=models.CASCADE, db_index=False)
     image = models.ImageField(null=True, blank=True, upload_to="posts")
     category = models.ForeignKey('Category' ,on_delete=models.SET_NULL, null=True, related_name="posts")
     tags = models.ManyToManyField('Tag', blank=True, related_name='posts')
@@ -19,61 +73,188 @@ class Post(models.Model):
     slug = models.SlugField(unique=True, blank=True)
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
+    # Maintained incrementally by comment signals and `CommentQuerySet.approve`,
+    # `manage.py recompute_comment_counts` repairs drift.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    approved_comment_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    objects = PostQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_date']
+        # Lists are ordered by (created_date, id), see `KeysetPagination`.
+        indexes = [
+            models.Index(fields=["status", "created_date", "id"], name="blog_post_status_created_idx"),
+            models.Index(fields=["author", "status", "created_date"], name="blog_post_author_status_idx"),
+            models.Index(
+                fields=["created_date", "id"], name="blog_post_published_idx",
+                condition=Q(status="published"),
+            ),
+        ]
     
     def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
         super().save(*args, **kwargs)
+        self.update_search_index(kwargs.get("using"), kwargs.get("update_fields"))
+
+    def update_search_index(self, using=None, update_fields=None):
+        if update_fields is not None and not {"title", "content"} & set(update_fields):
+            return
+        get_search_backend(using or self._state.db).update([self.pk])
 
     def __str__(self):
         return self.title
 
-class Category(models.Model):
+class CategoryQuerySet(models.QuerySet):
+    def resolve(self, items, batch_size=500):
+        """
+        Bulk `get_or_create(**data)` for each dict in `items`, in order (None
+        entries stay None): one lookup per `batch_size` distinct categories and
+        one `bulk_create` for the missing ones.
+        """
+        keys = [tuple(sorted(data.items())) if data else None for data in items]
+        wanted = list({key for key in keys if key})
+        shapes = {tuple(name for name, _ in key) for key in wanted}
+        found = {}
+        for start in range(0, len(wanted), batch_size):
+            lookup = reduce(or_, (Q(**dict(key)) for key in wanted[start:start + batch_size]))
+            # Ordered newest first so the oldest match is the one kept.
+            for category in self.filter(lookup).order_by("-pk"):
+                for shape in shapes:
+                    found[tuple((name, getattr(category, name)) for name in shape)] = category
+
+        missing = [key for key in wanted if key not in found]
+        new = [self.model(**dict(key)) for key in missing]
+        unslugged = [category for category in new if not category.slug]
+        slugs = allocate_slugs(self.model._base_manager.using(self.db), [category.title for category in unslugged])
+        for category, slug in zip(unslugged, slugs):
+            category.slug = slug
+        self.bulk_create(new, batch_size=batch_size)
+        found.update(zip(missing, new))
+        return [found[key] if key else None for key in keys]
+
+
+class Category(SlugMixin, models.Model):
     title = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(unique=True, blank=True)
     title = models.CharField(max_length=100)
     slug = models.SlugField(blank=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    objects = CategoryQuerySet.as_manager()
     
     class Meta:
         verbose_name = "category"
         verbose_name_plural = "categories"
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.title)
-        super().save(*args, **kwargs)
-
     def __str__(self):
         return self.title
 
 
-class Tag(models.Model):
+class Tag(SlugMixin, models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True, blank=True)
 
     name = models.CharField(max_length=50)
     slug = models.SlugField(blank=True)
+    updated_date = models.DateTimeField(auto_now=True)
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+    slug_source = "name"
 
     def __str__(self):
         return self.name
 
+class CommentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Restrict comments to the ones `user` is allowed to see.
+
+        - Admins: every comment.
+        - Authenticated users: approved comments and their own.
+        - Anonymous users: approved comments only.
+        """
+        if user.is_staff:
+            return self.all()
+        if user.is_authenticated:
+            return self.filter(Q(is_approved=True) | Q(author__user_id=user.pk))
+        return self.filter(is_approved=True)
+
+    def approve(self):
+        """
+        Approve the pending comments in this queryset and add them to their
+        posts' `approved_comment_count`. Returns the number of approved comments.
+        """
+        with transaction.atomic(using=self.db):
+            pending = list(
+                self.filter(is_approved=False).select_for_update().values_list("pk", "post_id")
+            )
+            if not pending:
+                return 0
+            now = timezone.now()
+            approved = Comment.objects.filter(pk__in=[pk for pk, _ in pending]).update(
+                is_approved=True, updated_date=now
+            )
+
+            per_post = defaultdict(int)
+            for _, post_id in pending:
+                per_post[post_id] += 1
+            # One UPDATE per distinct increment rather than one per post.
+            by_increment = defaultdict(list)
+            for post_id, increment in per_post.items():
+                by_increment[increment].append(post_id)
+            for increment, post_ids in by_increment.items():
+                Post.objects.filter(pk__in=post_ids).update(
+                    approved_comment_count=F("approved_comment_count") + increment,
+                    updated_date=now,
+                )
+            return approved
+
+
 class Comment(models.Model):
-    post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name='comments')
+    # Indexed as the leading column of `blog_comment_post_approved_idx`.
+    post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name='comments', db_index=False)
     author = models.ForeignKey('accounts.Profile', on_delete=models.CASCADE)  
     content = models.TextField()
     created_date = models.DateTimeField(auto_now_add=True)  
     is_approved = models.BooleanField(default=False)
+    updated_date = models.DateTimeField(auto_now=True)
+    
+    objects = CommentQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_date'] 
+        indexes = [
+            models.Index(fields=["post", "is_approved", "created_date"], name="blog_comment_post_approved_idx"),
+            models.Index(
+                fields=["created_date", "id"], name="blog_comment_approved_idx",
+                condition=Q(is_approved=True),
+            ),
+        ]
     
+    def update_post_counts(self, old_post_id, was_approved):
+        """
+        Adjust the posts' counters after this comment was saved having been on
+        `old_post_id` with `is_approved` == `was_approved`: moved, its approval
+        changed, or both.
+        """
+        if old_post_id == self.post_id and was_approved == self.is_approved:
+            return
+        now = timezone.now()
+        if old_post_id == self.post_id:
+            Post.objects.filter(pk=self.post_id).update(
+                approved_comment_count=F("approved_comment_count") + int(self.is_approved) - int(was_approved),
+                updated_date=now,
+            )
+            return
+        Post.objects.filter(pk=old_post_id).update(
+            comment_count=F("comment_count") - 1,
+            approved_comment_count=F("approved_comment_count") - int(was_approved),
+            updated_date=now,
+        )
+        Post.objects.filter(pk=self.post_id).update(
+            comment_count=F("comment_count") + 1,
+            approved_comment_count=F("approved_comment_count") + int(self.is_approved),
+            updated_date=now,
+        )
+
     def __str__(self):
-        return f'{self.content[:12]}'
\ No newline at end of file
+        return f'{self.content[:12]}'
@@ -0,0 +1,196 @@
+"""
+Full-text search index for posts.
+
+Each database vendor gets a backend that knows how to create the index
+(called from a migration), keep it in sync with `Post` rows and run ranked
+searches against it:
+
+- PostgreSQL: a weighted `tsvector` column on `blog_post` with a GIN index.
+- SQLite: an FTS5 virtual table ranked with bm25.
+- anything else: case-insensitive `LIKE` matching without ranking.
+
+Titles are weighted above content in every backend.
+"""
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+
+class BaseSearchBackend:
+    title_weight = 10.0
+    content_weight = 1.0
+    chunk_size = 500
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def install(self):
+        pass
+
+    def uninstall(self):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def update(self, pks):
+        pass
+
+    def remove(self, pks):
+        pass
+
+    def search(self, queryset, terms):
+        """Filter `queryset` to posts matching `terms`, best matches first."""
+        return queryset.filter(self.matches(terms)).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def matches(self, terms):
+        """
+        A condition for posts matching `terms`, unranked, to combine with other
+        filters. Uncorrelated, so it's evaluated once however it's nested.
+        """
+        return Q(title__icontains=terms) | Q(content__icontains=terms)
+
+    def chunks(self, pks):
+        pks = list(pks)
+        for start in range(0, len(pks), self.chunk_size):
+            yield pks[start:start + self.chunk_size]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    config = "english"
+    vector_sql = (
+        "setweight(to_tsvector(%(config)s, coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector(%(config)s, coalesce(content, '')), 'B')"
+    )
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("ALTER TABLE blog_post ADD COLUMN IF NOT EXISTS search_vector tsvector")
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS blog_post_search_vector_idx "
+                "ON blog_post USING GIN (search_vector)"
+            )
+        self.rebuild()
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("DROP INDEX IF EXISTS blog_post_search_vector_idx")
+            cursor.execute("ALTER TABLE blog_post DROP COLUMN IF EXISTS search_vector")
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE blog_post SET search_vector = {self.vector_sql}",
+                {"config": self.config},
+            )
+
+    def update(self, pks):
+        with self.connection.cursor() as cursor:
+            for chunk in self.chunks(pks):
+                cursor.execute(
+                    f"UPDATE blog_post SET search_vector = {self.vector_sql} WHERE id = ANY(%(pks)s)",
+                    {"config": self.config, "pks": chunk},
+                )
+
+    def search(self, queryset, terms):
+        # ts_rank's default weights give 'A' (title) 1.0 and 'B' (content) 0.4.
+        query = "websearch_to_tsquery(%s, %s)"
+        return (
+            queryset.alias(search_match=RawSQL(
+                f"blog_post.search_vector @@ {query}",
+                (self.config, terms),
+                output_field=BooleanField(),
+            ))
+            .filter(search_match=True)
+            .annotate(search_rank=RawSQL(
+                f"ts_rank(blog_post.search_vector, {query})",
+                (self.config, terms),
+                output_field=FloatField(),
+            ))
+            .order_by("-search_rank", "-created_date")
+        )
+
+    def matches(self, terms):
+        return Q(pk__in=RawSQL(
+            "SELECT id FROM blog_post WHERE search_vector @@ websearch_to_tsquery(%s, %s)",
+            (self.config, terms),
+        ))
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    table = "blog_post_fts"
+
+    def install(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} "
+                "USING fts5(title, content, tokenize='porter unicode61')"
+            )
+        self.rebuild()
+
+    def uninstall(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, content) "
+                "SELECT id, title, content FROM blog_post"
+            )
+
+    def update(self, pks):
+        with self.connection.cursor() as cursor:
+            for chunk in self.chunks(pks):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", chunk)
+                cursor.execute(
+                    f"INSERT INTO {self.table} (rowid, title, content) "
+                    f"SELECT id, title, content FROM blog_post WHERE id IN ({placeholders})",
+                    chunk,
+                )
+
+    def remove(self, pks):
+        with self.connection.cursor() as cursor:
+            for chunk in self.chunks(pks):
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"DELETE FROM {self.table} WHERE rowid IN ({placeholders})", chunk)
+
+    def to_match_query(self, terms):
+        # Quote every word so user input can't inject FTS5 query syntax.
+        words = re.findall(r"\w+", terms)
+        return " ".join(f'"{word}"' for word in words)
+
+    def search(self, queryset, terms):
+        match = self.to_match_query(terms)
+        if not match:
+            return queryset.none()
+        # Join the FTS table once so SQLite drives the query from the index.
+        # bm25() is lower-is-better, negate it so every backend ranks descending.
+        return queryset.extra(
+            tables=[self.table],
+            where=[f"{self.table}.rowid = blog_post.id", f"{self.table} MATCH %s"],
+            params=[match],
+            select={"search_rank": f"-bm25({self.table}, %s, %s)"},
+            select_params=[self.title_weight, self.content_weight],
+        ).order_by("-search_rank", "-created_date")
+
+    def matches(self, terms):
+        match = self.to_match_query(terms)
+        if not match:
+            return Q(pk__in=[])
+        return Q(pk__in=RawSQL(f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", (match,)))
+
+
+BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    connection = connections[using]
+    return BACKENDS.get(connection.vendor, BaseSearchBackend)(connection)
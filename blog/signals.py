@@ -1,10 +1,98 @@
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.db.models import F
 from django.dispatch import receiver
-from .models import Comment
+from django.utils import timezone
+from .api.v1.cache import invalidate_post_details, note_deletion
+from .models import Category, Comment, Post, Tag
+from .search import get_search_backend
+
+@receiver(pre_save, sender=Comment)
+def auto_approved_admin_comment(sender, instance, raw=False, **kwargs):
+    # Decided before the INSERT, so a staff comment is written once. The API
+    # decides `is_approved` from `request.user` and marks it decided (see
+    # `CommentViewSet.perform_create`), elsewhere the author's user is looked up here.
+    decided = getattr(instance, "_approval_decided", False)
+    if instance._state.adding and not raw and not decided and not instance.is_approved:
+        instance.is_approved = instance.author.user.is_staff
 
 @receiver(post_save, sender=Comment)
-def auto_approved_admin_comment(sender, instance, created, **kwargs):
-    if created:
-        if instance.author.user.is_staff:
-            instance.is_approved = True
-            instance.save()
\ No newline at end of file
+def count_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F("comment_count") + 1,
+            approved_comment_count=F("approved_comment_count") + int(instance.is_approved),
+            updated_date=timezone.now(),
+        )
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_count=F("comment_count") - 1,
+        approved_comment_count=F("approved_comment_count") - int(instance.is_approved),
+        updated_date=timezone.now(),
+    )
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_search_index(sender, instance, using, **kwargs):
+    get_search_backend(using).remove([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_detail(sender, instance, **kwargs):
+    invalidate_post_details([instance.slug])
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_related_posts(sender, instance, created=False, **kwargs):
+    # Saving or deleting a category or tag changes post payloads without saving
+    # the posts. Bump their updated_date, which keys the detail cache and the
+    # ETag / Last-Modified validators, so every process sees the change.
+    if not created:
+        invalidate_post_details(instance.posts.values_list("slug", flat=True))
+        instance.posts.update(updated_date=timezone.now())
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            Post.objects.filter(pk=instance.pk).update(updated_date=timezone.now())
+            invalidate_post_details([instance.slug])
+    elif action in ("post_add", "post_remove"):
+        posts = Post.objects.filter(pk__in=pk_set)
+        invalidate_post_details(posts.values_list("slug", flat=True))
+        posts.update(updated_date=timezone.now())
+    elif action == "pre_clear":
+        invalidate_post_details(instance.posts.values_list("slug", flat=True))
+        instance.posts.update(updated_date=timezone.now())
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def note_row_deletion(sender, **kwargs):
+    note_deletion(sender)
+
+@receiver(post_init, sender=settings.AUTH_USER_MODEL)
+def remember_author_email(sender, instance, **kwargs):
+    # Read from __dict__, a user loaded without its email isn't queried for it.
+    instance._original_email = instance.__dict__.get("email")
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_author_posts(sender, instance, created, update_fields=None, **kwargs):
+    # Post and comment payloads embed the author's email, bump their
+    # updated_date so ETag / Last-Modified validators change too. Logins,
+    # password changes and other saves that keep the email skip this.
+    original = getattr(instance, "_original_email", None)
+    instance._original_email = instance.__dict__.get("email")
+    if created or (update_fields is not None and "email" not in update_fields):
+        return
+    if original is None or original != instance.email:
+        posts = Post.objects.filter(author__user=instance)
+        invalidate_post_details(posts.values_list("slug", flat=True))
+        now = timezone.now()
+        posts.update(updated_date=now)
+        Comment.objects.filter(author__user=instance).update(updated_date=now)
@@ -0,0 +1,169 @@
+import hashlib
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Case, Q, Value, When
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+# Slugs looked up per query, keeps SQL parameter counts well under the
+# backend limits (SQLite's expression depth in particular).
+CHUNK_SIZE = 500
+
+# Inserts retried when another writer took the slug first, on backends
+# without `lock_slugs`.
+SAVE_ATTEMPTS = 5
+
+SUFFIX = re.compile(r"[1-9][0-9]*")
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def base_slug(text, max_length, fallback):
+    # Leave room for a "-<n>" suffix so the allocated slug still fits.
+    slug = slugify(text)[:max_length - 6].strip("-")
+    return slug or fallback
+
+
+def _base_slugs(queryset, texts, field):
+    model = queryset.model
+    max_length = model._meta.get_field(field).max_length
+    return [base_slug(text, max_length, model._meta.model_name) for text in texts]
+
+
+def _suffix(slug, base):
+    """n for "`base`-n", else None."""
+    number = slug[len(base) + 1:]
+    if slug.startswith(f"{base}-") and SUFFIX.fullmatch(number):
+        return int(number)
+    return None
+
+
+def lock_slugs(queryset, bases):
+    """
+    Hold a PostgreSQL advisory lock per base slug of `queryset`'s table until
+    the current transaction ends, so concurrent writers allocate suffixes for
+    the same base one after the other. Transaction-level locks work behind
+    PgBouncer; outside a transaction or on other backends this does nothing.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql" or not connection.in_atomic_block:
+        return
+    table = queryset.model._meta.db_table
+    keys = sorted({
+        int.from_bytes(hashlib.blake2b(f"{table}:{base}".encode(), digest_size=8).digest(), "big", signed=True)
+        for base in bases
+    })
+    if keys:
+        with connection.cursor() as cursor:
+            # Taken in key order, so writers locking overlapping sets can't deadlock.
+            cursor.execute("SELECT pg_advisory_xact_lock(k) FROM unnest(%s::bigint[]) AS k ORDER BY k", [keys])
+
+
+def allocate_slug(queryset, text, field="slug"):
+    """
+    The slug of `text` if no row of `queryset` has it, else the one numbered
+    after the highest "-<n>" variant. One query: the base and its variants
+    come from a prefix scan of the slug index (the `varchar_pattern_ops`
+    index on PostgreSQL), ordered so the base and then the highest number are
+    read first.
+    """
+    (base,) = _base_slugs(queryset, [text], field)
+    lock_slugs(queryset, [base])
+    exact = Q(**{field: base})
+    variants = (
+        queryset.filter(exact | Q(**{f"{field}__startswith": f"{base}-"}))
+        .order_by(Case(When(exact, then=Value(0)), default=Value(1)), Length(field).desc(), f"-{field}")
+        .values_list(field, flat=True)
+        .iterator(chunk_size=20)
+    )
+    if next(variants, None) != base:
+        return base
+    for slug in variants:
+        number = _suffix(slug, base)
+        if number is not None:
+            return f"{base}-{number + 1}"
+    return f"{base}-2"
+
+
+def allocate_slugs(queryset, texts, field="slug"):
+    """
+    Return one unique slug per entry of `texts`, in order, avoiding both the
+    rows already in `queryset` and each other.
+
+    A text whose slug is free gets it unchanged; otherwise the next unused
+    "-<n>" suffix is appended. Costs one query when nothing collides, plus one
+    prefix query per `CHUNK_SIZE` colliding slugs.
+    """
+    bases = _base_slugs(queryset, texts, field)
+    unique_bases = set(bases)
+    lock_slugs(queryset, unique_bases)
+
+    taken = set()
+    for chunk in _chunks(unique_bases):
+        taken.update(queryset.filter(**{f"{field}__in": chunk}).values_list(field, flat=True))
+
+    # Bases that collide, with the database or within this batch, need to
+    # know which numbered variants already exist.
+    seen = set()
+    colliding = set(taken)
+    for base in bases:
+        if base in seen:
+            colliding.add(base)
+        seen.add(base)
+
+    next_suffix = dict.fromkeys(colliding, 2)
+    for chunk in _chunks(colliding):
+        prefixes = reduce(or_, (Q(**{f"{field}__startswith": f"{base}-"}) for base in chunk))
+        for slug in queryset.filter(prefixes).values_list(field, flat=True):
+            taken.add(slug)
+            base = slug.rpartition("-")[0]
+            number = _suffix(slug, base)
+            if base in next_suffix and number is not None:
+                next_suffix[base] = max(next_suffix[base], number + 1)
+
+    slugs = []
+    assigned = set()
+    for base in bases:
+        slug = base
+        if slug in taken or slug in assigned:
+            while True:
+                slug = f"{base}-{next_suffix[base]}"
+                next_suffix[base] += 1
+                if slug not in taken and slug not in assigned:
+                    break
+        assigned.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+class SlugMixin:
+    """
+    For models whose `slug` is filled in from `slug_source` on first save:
+    the slug is allocated with `allocate_slug` and the row inserted in one
+    transaction. Without advisory locks, an insert that loses the slug to a
+    concurrent writer is retried with the next one, up to `SAVE_ATTEMPTS`.
+    """
+    slug_source = "title"
+
+    def save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        queryset = type(self)._base_manager.using(using)
+        with transaction.atomic(using=using):
+            for attempt in range(1, SAVE_ATTEMPTS + 1):
+                self.slug = allocate_slug(queryset, getattr(self, self.slug_source))
+                try:
+                    with transaction.atomic(using=using):
+                        return super().save(*args, **kwargs)
+                except IntegrityError:
+                    if attempt == SAVE_ATTEMPTS or not queryset.filter(slug=self.slug).exists():
+                        self.slug = ""
+                        raise
@@ -0,0 +1,48 @@
+"""
+Database connection handling, picked per deployment with `database()`:
+
+- "none": a new connection for every request, Django's default.
+- "persistent": each worker thread keeps its connection for `conn_max_age`
+  seconds and checks it's alive before reusing it for a new request.
+- "pool": connections go back to a bounded per-process pool after each
+  request (`config.db.pool`), for threaded and ASGI workers, where one
+  persistent connection per thread would be too many.
+- "pgbouncer": persistent connections to PgBouncer in transaction pooling
+  mode, which may hand each transaction a different server connection.
+  Server-side cursors are turned off since they outlive the transaction;
+  other session state (session advisory locks, `SET` without `LOCAL`,
+  `LISTEN`) must not be used either.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+MODES = ("none", "persistent", "pool", "pgbouncer")
+
+POOLED_ENGINES = {
+    "django.db.backends.postgresql": "config.db.backends.postgresql",
+    "django.db.backends.sqlite3": "config.db.backends.sqlite3",
+}
+
+
+def database(mode, conn_max_age=600, pool=None, **settings):
+    """
+    A `DATABASES` entry from `settings` (ENGINE, NAME, ...) for connection
+    `mode`. `pool` holds the `ConnectionPool` options for "pool".
+    """
+    if mode not in MODES:
+        raise ImproperlyConfigured(f"Unknown database connection mode '{mode}', use one of {', '.join(MODES)}.")
+    if mode == "none":
+        settings["CONN_MAX_AGE"] = 0
+    elif mode == "pool":
+        engine = settings.get("ENGINE")
+        if engine not in POOLED_ENGINES:
+            raise ImproperlyConfigured(f"No pooled backend for '{engine}'.")
+        settings["ENGINE"] = POOLED_ENGINES[engine]
+        # Connections return to the pool at the end of each request.
+        settings["CONN_MAX_AGE"] = 0
+        settings["POOL"] = dict(pool or {})
+    else:
+        settings["CONN_MAX_AGE"] = conn_max_age
+        settings["CONN_HEALTH_CHECKS"] = True
+        if mode == "pgbouncer":
+            settings["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return settings
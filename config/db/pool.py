@@ -0,0 +1,251 @@
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe pool of DB-API connections.
+
+    At most `max_size` connections are open, idle or checked out;
+    `checkout()` waits up to `timeout` seconds for one to come back and then
+    raises `PoolTimeout`. Idle connections are closed after `max_idle`
+    seconds and all of them after `max_lifetime`. One idle for longer than
+    `check_idle` seconds runs `SELECT 1` before it's handed out again, and is
+    replaced if that fails.
+
+    Connections inherited through `fork()` belong to the parent and are
+    dropped, not closed, in the child.
+    """
+
+    def __init__(self, max_size=10, timeout=5, max_idle=600, max_lifetime=3600, check_idle=30):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_idle = check_idle
+        self._idle = deque()  # (connection, created, returned), most recently returned last
+        self._created = {}  # id(connection) -> created, for checked out connections
+        self._size = 0
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'timeouts': 0,
+            'connects': 0,
+            'closes': 0,
+            'failed_checks': 0,
+        }
+
+    def checkout(self, connect):
+        """A connection from the pool, or a new one from `connect()`."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+        waited = False
+        while True:
+            expired = []
+            with self._cond:
+                self._after_fork()
+                while True:
+                    now = time.monotonic()
+                    expired += self._expire_idle(now)
+                    if self._idle:
+                        connection, created, returned = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        connection = created = returned = None
+                        break
+                    if now >= deadline:
+                        self._metrics['timeouts'] += 1
+                        raise PoolTimeout(
+                            f'No database connection available within {self.timeout}s '
+                            f'({self.max_size} in use).'
+                        )
+                    waited = True
+                    self._cond.wait(deadline - now)
+                wait = time.monotonic() - start
+                self._metrics['checkouts'] += 1
+                self._metrics['wait_total'] += wait
+                self._metrics['wait_max'] = max(self._metrics['wait_max'], wait)
+                self._metrics['waits'] += waited
+                waited = False
+            self._close(expired)
+
+            if connection is None:
+                try:
+                    connection = connect()
+                except BaseException:
+                    self._release_slot()
+                    raise
+                created = time.monotonic()
+                with self._cond:
+                    self._metrics['connects'] += 1
+            elif time.monotonic() - returned >= self.check_idle and not self._ping(connection):
+                with self._cond:
+                    self._metrics['failed_checks'] += 1
+                self._discard(connection)
+                continue
+            with self._cond:
+                self._created[id(connection)] = created
+            return connection
+
+    def checkin(self, connection, reusable=True):
+        """Return a checked out connection; it's closed instead unless `reusable`."""
+        now = time.monotonic()
+        with self._cond:
+            created = self._created.pop(id(connection), None)
+            if created is None:
+                # Checked out before a fork, the slot no longer exists.
+                return
+            if reusable and now - created < self.max_lifetime:
+                self._idle.append((connection, created, now))
+                self._cond.notify()
+                return
+        self._discard(connection)
+
+    def close_all(self):
+        """Close the idle connections; checked out ones are closed when returned."""
+        with self._cond:
+            idle = [connection for connection, _, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        self._close(idle)
+
+    def metrics(self):
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics['size'] = self._size
+            metrics['idle'] = len(self._idle)
+        metrics['in_use'] = metrics['size'] - metrics['idle']
+        checkouts = metrics['checkouts']
+        metrics['wait_avg'] = metrics['wait_total'] / checkouts if checkouts else 0.0
+        return metrics
+
+    def _after_fork(self):
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle.clear()
+            self._created.clear()
+            self._size = 0
+
+    def _expire_idle(self, now):
+        # Oldest returned first; the lifetime check catches the rest on checkin.
+        expired = []
+        while self._idle and (
+            now - self._idle[0][2] >= self.max_idle or now - self._idle[0][1] >= self.max_lifetime
+        ):
+            expired.append(self._idle.popleft()[0])
+        self._size -= len(expired)
+        if expired:
+            self._cond.notify(len(expired))
+        return expired
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _discard(self, connection):
+        self._release_slot()
+        self._close([connection])
+
+    def _close(self, connections):
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        if connections:
+            with self._cond:
+                self._metrics['closes'] += len(connections)
+
+    @staticmethod
+    def _ping(connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    """The pool for connections to the database `settings_dict` describes."""
+    key = (alias, *(str(settings_dict.get(name)) for name in ('NAME', 'HOST', 'PORT', 'USER')))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(**settings_dict.get('POOL', {}))
+        return pool
+
+
+def pool_metrics():
+    """`ConnectionPool.metrics()` of this process's pools, by database alias."""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {key[0]: pool.metrics() for key, pool in pools.items()}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    For `DatabaseWrapper`s: `connect()` checks a connection out of the
+    alias's `ConnectionPool`, configured by the `POOL` setting of the
+    database, and `close()` returns it. Connections that errored or are
+    closed inside a transaction are closed for real.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        connect = super().get_new_connection
+        created = []
+
+        def new_connection():
+            created.append(True)
+            return connect(conn_params)
+
+        connection = self.pool.checkout(new_connection)
+        if not created:
+            self.reuse_connection(connection)
+        return connection
+
+    def reuse_connection(self, connection):
+        """Set up the wrapper as `get_new_connection` would for `connection`."""
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reusable = not (self.in_atomic_block or self.errors_occurred or self.needs_rollback)
+        with self.wrap_database_errors:
+            if reusable and not self.autocommit:
+                self.connection.rollback()
+            self.pool.checkin(self.connection, reusable)
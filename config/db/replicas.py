@@ -0,0 +1,305 @@
+"""
+Read replicas for safe-method requests.
+
+`ReplicaMiddleware` routes the reads of GET and HEAD requests, through
+`ReplicaRouter`, to one of the replica aliases of `DATABASE_REPLICATION`; all
+other requests, writes, and reads inside a transaction or after a write in the
+same request use the primary. A replica is picked once per request, round
+robin or the least lagging one, and skipped for `retry_after` seconds when it
+can't be connected to, or for the request when it lags more than `max_lag`
+seconds; with none left, reads go to the primary.
+
+A client that wrote is pinned to the primary for `pin_seconds`, so it reads its
+own writes: by a cookie, and for requests with an `Authorization` header by
+the cache (which has to be shared between processes to pin across them). That
+only holds for replicas less than `pin_seconds` behind, so `max_lag` defaults
+to `pin_seconds` and can't exceed it.
+
+Data read from a replica may be stale; read what goes into a shared cache
+inside `use_primary()`.
+"""
+import hashlib
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+SELECTIONS = ("round_robin", "least_lag")
+READ_METHODS = ("GET", "HEAD")
+
+PIN_COOKIE = "db_pin"
+PIN_KEY_PREFIX = "db:pin"
+
+# Seconds the replica is behind; 0 on a primary or one that has replayed all it received.
+POSTGRES_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+class ReplicaSet:
+    """
+    Picks the replica alias a request reads from, see the module docstring.
+    Lags are measured at most every `lag_interval` seconds per replica.
+    """
+
+    def __init__(
+        self,
+        replicas=(),
+        selection="round_robin",
+        pin_seconds=5,
+        max_lag=None,
+        lag_interval=1,
+        retry_after=30,
+        primary_models=(),
+        primary=DEFAULT_DB_ALIAS,
+    ):
+        if selection not in SELECTIONS:
+            raise ImproperlyConfigured(f"Unknown replica selection '{selection}', use one of {', '.join(SELECTIONS)}.")
+        self.replicas = list(replicas)
+        self.selection = selection
+        if max_lag is None:
+            max_lag = pin_seconds
+        if max_lag > pin_seconds:
+            raise ImproperlyConfigured(
+                f"Replica max_lag ({max_lag}s) exceeds pin_seconds ({pin_seconds}s), "
+                "pinned clients could read from a replica without their writes."
+            )
+        self.pin_seconds = pin_seconds
+        self.max_lag = max_lag
+        self.lag_interval = lag_interval
+        self.retry_after = retry_after
+        self.primary_models = {label.lower() for label in primary_models}
+        self.primary = primary
+        self._turn = itertools.count()
+        self._down = {}  # alias -> monotonic time it's tried again
+        self._lags = {}  # alias -> (seconds, measured at)
+        self._lock = threading.Lock()
+        self._metrics = {
+            "reads": dict.fromkeys([primary, *self.replicas], 0),
+            "fallbacks": 0,
+            "failures": 0,
+            "lagging": 0,
+        }
+
+    def __bool__(self):
+        return bool(self.replicas)
+
+    def choose(self):
+        """A replica alias that's up and connected, or the primary."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [alias for alias in self.replicas if self._down.get(alias, 0) <= now]
+        candidates = self._by_lag(candidates, now)
+        if self.selection == "round_robin" and candidates:
+            start = next(self._turn) % len(candidates)
+            candidates = candidates[start:] + candidates[:start]
+
+        for alias in candidates:
+            try:
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                self.mark_down(alias)
+                continue
+            self._count("reads", alias)
+            return alias
+        if self.replicas:
+            self._count("fallbacks")
+        self._count("reads", self.primary)
+        return self.primary
+
+    def mark_down(self, alias):
+        with self._lock:
+            self._down[alias] = time.monotonic() + self.retry_after
+            self._lags.pop(alias, None)
+            self._metrics["failures"] += 1
+
+    def lag(self, alias):
+        """Seconds replica `alias` is behind the primary."""
+        connection = connections[alias]
+        if connection.vendor != "postgresql":
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0])
+
+    def _by_lag(self, candidates, now):
+        lags = {}
+        for alias in candidates:
+            with self._lock:
+                lag, measured = self._lags.get(alias, (None, None))
+            if measured is None or now - measured >= self.lag_interval:
+                try:
+                    lag = self.lag(alias)
+                except DatabaseError:
+                    self.mark_down(alias)
+                    continue
+                with self._lock:
+                    self._lags[alias] = (lag, now)
+            if lag > self.max_lag:
+                self._count("lagging")
+                continue
+            lags[alias] = lag
+        if self.selection == "least_lag":
+            return sorted(lags, key=lags.get)
+        return [alias for alias in candidates if alias in lags]
+
+    def _count(self, name, alias=None):
+        with self._lock:
+            if alias is None:
+                self._metrics[name] += 1
+            else:
+                self._metrics[name][alias] = self._metrics[name].get(alias, 0) + 1
+
+    def metrics(self):
+        now = time.monotonic()
+        with self._lock:
+            metrics = {**self._metrics, "reads": dict(self._metrics["reads"])}
+            metrics["down"] = sorted(alias for alias, until in self._down.items() if until > now)
+            metrics["lag"] = {alias: lag for alias, (lag, _) in self._lags.items()}
+        return metrics
+
+
+_replica_set = None
+_replica_set_lock = threading.Lock()
+
+
+def get_replica_set():
+    global _replica_set
+    with _replica_set_lock:
+        if _replica_set is None:
+            _replica_set = ReplicaSet(**getattr(settings, "DATABASE_REPLICATION", {}))
+        return _replica_set
+
+
+class _Routing:
+    """Where the reads of the current request go."""
+
+    def __init__(self, replica_set, use_primary):
+        self.replica_set = replica_set
+        self.use_primary = use_primary
+        self.wrote = False
+        self.alias = None
+
+    def db_for_read(self, model):
+        primary = self.replica_set.primary
+        if (
+            self.use_primary
+            or self.wrote
+            or model._meta.label_lower in self.replica_set.primary_models
+            or connections[primary].in_atomic_block
+        ):
+            return primary
+        if self.alias is None:
+            self.alias = self.replica_set.choose()
+        return self.alias
+
+
+_routing = ContextVar("replica_routing", default=None)
+
+
+def reads_from_replica():
+    """Whether the current request has read from a replica."""
+    routing = _routing.get()
+    return routing is not None and routing.alias not in (None, routing.replica_set.primary)
+
+
+@contextmanager
+def use_primary():
+    """Send the current request's reads to the primary inside the block."""
+    routing = _routing.get()
+    if routing is None:
+        yield
+        return
+    use_primary = routing.use_primary
+    routing.use_primary = True
+    try:
+        yield
+    finally:
+        routing.use_primary = use_primary
+
+
+class ReplicaRouter:
+    """Database router for `ReplicaMiddleware`; outside a request everything uses the primary."""
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        return routing.db_for_read(model)
+
+    def db_for_write(self, model, **hints):
+        routing = _routing.get()
+        if routing is None:
+            return None
+        routing.wrote = True
+        # Not the instance's database, which may be the replica it was read from.
+        return routing.replica_set.primary
+
+    def allow_relation(self, obj1, obj2, **hints):
+        replica_set = get_replica_set()
+        group = {replica_set.primary, *replica_set.replicas}
+        if obj1._state.db in group and obj2._state.db in group:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary.
+        if db in get_replica_set().replicas:
+            return False
+        return None
+
+
+def _pin_key(request):
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if not authorization:
+        return None
+    return f"{PIN_KEY_PREFIX}:{hashlib.sha256(authorization.encode()).hexdigest()[:32]}"
+
+
+def is_pinned(request):
+    """Whether the client of `request` wrote within the last `pin_seconds`."""
+    try:
+        if float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _pin_key(request)
+    return key is not None and cache.get(key) is not None
+
+
+def pin(request, response, seconds):
+    """Send the client of `request` to the primary for the next `seconds`."""
+    response.set_cookie(PIN_COOKIE, str(int(time.time() + seconds) + 1), max_age=seconds, httponly=True)
+    key = _pin_key(request)
+    if key is not None:
+        cache.set(key, True, seconds)
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replica_set = get_replica_set()
+        if not replica_set:
+            return self.get_response(request)
+
+        write = request.method not in READ_METHODS
+        routing = _Routing(replica_set, use_primary=write or is_pinned(request))
+        token = _routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        if routing.wrote or (write and response.status_code < 400):
+            pin(request, response, replica_set.pin_seconds)
+        return response
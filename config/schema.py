@@ -0,0 +1,202 @@
+"""
+The OpenAPI schema, served from memory.
+
+drf-spectacular introspects every view and serializer on each schema request.
+`CachedSpectacularAPIView` does that once per process and format, keeping the
+rendered bytes and an ETag; `manage.py build_schema` does it at build time
+and writes the results to `OPENAPI_SCHEMA_CACHE['path']`, so workers start
+with them. The file is only used while its version matches `code_version()`,
+anything else is generated on first request.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import namedtuple
+from importlib import import_module
+from pathlib import Path
+
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.functional import cached_property
+from django.utils import translation
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+from rest_framework.settings import api_settings
+
+SchemaEntry = namedtuple("SchemaEntry", ["body", "content_type", "etag", "disposition"])
+
+# Only sources decide the schema.
+SKIPPED_DIRS = {"migrations", "tests", "__pycache__"}
+
+
+def code_version():
+    """
+    A hash of the project's Python sources (installed apps under `BASE_DIR`
+    and the settings package) and of the schema libraries' versions.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    roots = {Path(import_module(settings.ROOT_URLCONF).__file__).resolve().parent}
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path).resolve()
+        if path.is_relative_to(base_dir):
+            roots.add(path)
+
+    digest = hashlib.sha256(f"{drf_spectacular.__version__}:{rest_framework.VERSION}".encode())
+    for root in sorted(roots):
+        for directory, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name not in SKIPPED_DIRS)
+            for filename in sorted(filenames):
+                if filename.endswith(".py"):
+                    path = Path(directory, filename)
+                    digest.update(str(path.relative_to(base_dir)).encode())
+                    digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class SchemaCache:
+    """
+    Rendered schemas by (media type, language, API version), loaded from
+    `path` on first use when it was built for `version`.
+    """
+
+    def __init__(self, path=None, version=None):
+        self.path = Path(path) if path else None
+        self._version = version
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @cached_property
+    def version(self):
+        return self._version or code_version()
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self.load()
+        return self._entries
+
+    def load(self):
+        if self.path is None or not self.path.exists():
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != self.version:
+            return {}
+        return {
+            tuple(item["key"]): SchemaEntry(
+                item["body"].encode(), item["content_type"], item["etag"], item["disposition"]
+            )
+            for item in data["entries"]
+        }
+
+    def save(self):
+        data = {
+            "version": self.version,
+            "entries": [
+                {**entry._asdict(), "key": list(key), "body": entry.body.decode()}
+                for key, entry in self.entries.items()
+            ],
+        }
+        # Write next to the target and rename, so readers never see half a file.
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, body, content_type, disposition):
+        entry = SchemaEntry(body, content_type, f'"{hashlib.sha256(body).hexdigest()[:32]}"', disposition)
+        with self._lock:
+            self.entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+
+
+_schema_cache = None
+_schema_cache_lock = threading.Lock()
+
+
+def get_schema_cache():
+    global _schema_cache
+    with _schema_cache_lock:
+        if _schema_cache is None:
+            _schema_cache = SchemaCache(**getattr(settings, "OPENAPI_SCHEMA_CACHE", {}))
+        return _schema_cache
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    `SpectacularAPIView` answering from `schema_cache`, by default
+    `get_schema_cache()`, with an ETag so clients holding the current schema
+    get a 304. Non-public schemas depend on the requesting user and are
+    generated every time.
+    """
+    schema_cache = None
+
+    def get_cache(self):
+        return self.schema_cache if self.schema_cache is not None else get_schema_cache()
+
+    def clean_params(self, request):
+        """
+        Drop `lang` values outside `LANGUAGES` and `version` values outside
+        `ALLOWED_VERSIONS`, so the schema is generated, and cached, for the
+        defaults instead of once per made-up value.
+        """
+        params = request._request.GET.copy()
+        lang = params.get("lang")
+        if lang:
+            try:
+                params["lang"] = translation.get_supported_language_variant(lang)
+            except LookupError:
+                del params["lang"]
+        if params.get("version") and params["version"] not in (api_settings.ALLOWED_VERSIONS or ()):
+            del params["version"]
+        request._request.GET = params
+
+    def get_cache_key(self, request):
+        lang = request.GET.get("lang") if settings.USE_I18N else None
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        return (request.accepted_renderer.media_type, lang or "", version or "")
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if not self.serve_public:
+            return super().get(request, *args, **kwargs)
+        self.clean_params(request)
+        cache = self.get_cache()
+        key = self.get_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            renderer = request.accepted_renderer
+            body = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f"{content_type}; charset={renderer.charset}"
+            entry = cache.set(key, body, content_type, response["Content-Disposition"])
+
+        etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if entry.etag in etags or "*" in etags:
+            return HttpResponseNotModified(headers={"ETag": entry.etag})
+        return HttpResponse(
+            entry.body,
+            content_type=entry.content_type,
+            headers={"ETag": entry.etag, "Content-Disposition": entry.disposition},
+        )
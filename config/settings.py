@@ -14,6 +14,8 @@ from datetime import timedelta
 import os
 from pathlib import Path
 
+from config.db import database
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -54,10 +56,12 @@ INSTALLED_APPS = [
     # local apps
     'accounts.apps.AccountsConfig',
     'blog.apps.BlogConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.db.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -91,17 +95,69 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
+# How connections are reused, see config.db: none, persistent, pool or pgbouncer.
+# `DB_POOL` options apply to "pool" (config.db.pool.ConnectionPool).
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'persistent')
+DB_POOL = {
+    'max_size': 10,
+    'timeout': 5,
+    'max_idle': 600,
+    'check_idle': 30,
+}
+
+DB_SETTINGS = {
+    'ENGINE': 'django.db.backends.postgresql',
+    'NAME': 'postgres',
+    'USER': 'postgres',
+    'PASSWORD': 'postgres',
+    'HOST': 'db',
+    'PORT': 5432,
+    # 'ENGINE': 'django.db.backends.sqlite3',
+    # 'NAME': BASE_DIR / 'db.sqlite3',
+}
+
+# Streaming replicas of the primary, as "replica_<n>" aliases; GET and HEAD
+# requests read from them (config.db.replicas).
+DB_REPLICA_HOSTS = [host for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host]
+
 DATABASES = {
+    'default': database(DB_CONNECTION_MODE, pool=DB_POOL, **DB_SETTINGS),
+    **{
+        f'replica_{n}': database(
+            DB_CONNECTION_MODE,
+            pool=DB_POOL,
+            **{**DB_SETTINGS, 'HOST': host, 'TEST': {'MIRROR': 'default'}},
+        )
+        for n, host in enumerate(DB_REPLICA_HOSTS)
+    },
+}
+
+DATABASE_ROUTERS = ['config.db.replicas.ReplicaRouter']
+
+# `selection` is "round_robin" or "least_lag". Clients that wrote read from the
+# primary for `pin_seconds`, which should cover the usual replication lag;
+# pins by Authorization header are kept in the default cache, shared (CACHES).
+DATABASE_REPLICATION = {
+    'replicas': [f'replica_{n}' for n in range(len(DB_REPLICA_HOSTS))],
+    'selection': os.environ.get('DB_REPLICA_SELECTION', 'round_robin'),
+    'pin_seconds': 5,
+    # At most pin_seconds, so pinned clients read their own writes.
+    'max_lag': 5,
+    'lag_interval': 1,
+    'retry_after': 30,
+    # Revocations have to take effect without waiting for the replicas.
+    'primary_models': ['accounts.revokedtoken'],
+}
+
+
+# Shared by every worker process. Post detail payloads (blog.api.v1.cache),
+# the deletion times behind list validators and replica pins by Authorization
+# header (config.db.replicas) are only right when all processes see one cache.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres',
-        'PASSWORD': 'postgres',
-        'HOST': 'db',
-        'PORT': 5432
-        # 'ENGINE': 'django.db.backends.sqlite3',
-        # 'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/0'),
+    },
 }
 
 
@@ -163,14 +219,15 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.api.authentication.JWTClaimsAuthentication',
     ),
     
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_PAGINATION_CLASS': 'blog.api.v1.pagination.CustomPagination',
     
     'DEFAULT_RENDERER_CLASSES': (
-        'rest_framework.renderers.JSONRenderer',
+        'blog.api.v1.renderers.FastJSONRenderer',
+        'blog.api.v1.renderers.StreamingJSONRenderer',
     )
 
     
@@ -188,6 +245,30 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
 }
 
+# Validated access tokens kept in memory per process, see
+# `accounts.api.authentication.TokenCache`. 0 disables the cache.
+JWT_TOKEN_CACHE = {
+    'maxsize': 10000,
+}
+
+# Per-process view of revoked tokens, see `accounts.revocation.RevocationList`.
+# Revocations made by other processes apply within `refresh_interval` seconds.
+JWT_REVOCATION = {
+    'capacity': 100000,
+    'error_rate': 0.001,
+    'refresh_interval': 2,
+    # Seconds each refresh reads back, for revocations that commit late.
+    'refresh_overlap': 60,
+}
+
+# Pre-generated OpenAPI schema for config.schema.CachedSpectacularAPIView, written
+# by `manage.py build_schema`. It is used while `version` (by default a hash of the
+# project's sources) matches the one it was built for.
+OPENAPI_SCHEMA_CACHE = {
+    'path': BASE_DIR / 'openapi-schema.json',
+    'version': os.environ.get('APP_VERSION'),
+}
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Rest Blog Api',
     'DESCRIPTION': 'Documented API using drf-spectacular',
@@ -201,4 +282,20 @@ EMAIL_HOST_USER = ''
 EMAIL_HOST_PASSWORD = ''
 EMAIL_USE_TLS = False
 EMAIL_USE_SSL = False
-DEFAULT_FROM_EMAIL = 'no-reply@example.com'
\ No newline at end of file
+DEFAULT_FROM_EMAIL = 'no-reply@example.com'
+# Email jobs reuse one connection per worker thread (accounts.api.utils.EmailConnection)
+EMAIL_CONNECTION = {
+    'idle_timeout': 30,
+}
+
+# Job queues (jobs app). `concurrency` caps running jobs per queue across all
+# workers; with `max_backlog` jobs ready, `enqueue` runs new ones in the caller.
+JOBS_QUEUES = {
+    'email': {'concurrency': 4, 'max_backlog': 1000},
+}
+
+# Create tags that don't exist yet when a post references them by slug.
+BLOG_CREATE_MISSING_TAGS = False
+
+# Serve post and comment lists through blog.api.v1.fast instead of the DRF serializers.
+BLOG_FAST_LIST_SERIALIZATION = True
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'queue', 'status', 'priority', 'attempts', 'run_at')
+    list_filter = ('status', 'queue')
+    search_fields = ('task',)
+    readonly_fields = ('locked_at', 'locked_by', 'last_error', 'created_date', 'updated_date')
+    ordering = ('-created_date',)
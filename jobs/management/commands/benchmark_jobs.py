@@ -0,0 +1,75 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import Job
+from jobs.tasks import enqueue
+from jobs.worker import Worker
+
+
+def noop(**kwargs):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure job queue throughput: enqueue, claim and a full worker run. "
+        "Everything runs inside a transaction that is rolled back at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("case", choices=sorted(self.cases()))
+        parser.add_argument("--size", type=int, default=5000, help="Number of jobs per measurement.")
+
+    @classmethod
+    def cases(cls):
+        return {name[len("bench_"):]: name for name in dir(cls) if name.startswith("bench_")}
+
+    def handle(self, *args, **options):
+        self.size = options["size"]
+        with transaction.atomic():
+            getattr(self, self.cases()[options["case"]])()
+            transaction.set_rollback(True)
+
+    # helpers
+
+    def report(self, label, seconds):
+        self.stdout.write(f"{label:<50} {seconds * 1000:10.2f} ms {self.size / seconds:12.0f} jobs/s")
+
+    def timed(self, func):
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+
+    def seed_jobs(self):
+        Job.objects.bulk_create(
+            [Job(task=f"{__name__}.noop", priority=i % 3) for i in range(self.size)],
+            batch_size=1000,
+        )
+
+    # cases
+
+    def bench_enqueue(self):
+        """One INSERT per job, as the views do."""
+        def single():
+            for i in range(self.size):
+                enqueue(noop, {"n": i})
+        self.report(f"enqueue, {self.size} jobs", self.timed(single))
+
+    def bench_claim(self):
+        """Claiming alone, one job and ten jobs per round trip."""
+        for limit in (1, 10):
+            self.seed_jobs()
+
+            def claim_all():
+                while Job.objects.claim("benchmark", limit=limit):
+                    pass
+            self.report(f"claim, {limit} per call", self.timed(claim_all))
+            Job.objects.all().delete()
+
+    def bench_worker(self):
+        """Claim, run and mark done: what a worker sustains per thread."""
+        self.seed_jobs()
+        worker = Worker(burst=True)
+        self.report(f"worker run, {self.size} jobs", self.timed(worker.work))
@@ -0,0 +1,43 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued jobs until stopped (SIGINT/SIGTERM finish the running jobs first)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queue", action="append", dest="queues", default=[],
+            help="Queue to take jobs from, can be repeated. Defaults to every queue.",
+        )
+        parser.add_argument("--concurrency", type=int, default=1, help="Jobs run at the same time by this worker.")
+        parser.add_argument(
+            "--batch-size", type=int, default=1,
+            help="Jobs each thread claims at once and runs in turn, over the same connections.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when no job is ready.")
+        parser.add_argument(
+            "--stale-after", type=int, default=600,
+            help=(
+                "Requeue jobs whose worker hasn't reported in for this many seconds, checked on "
+                "startup and every quarter of it. Running jobs report in as often, so tasks may run longer."
+            ),
+        )
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is ready.")
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            queues=options["queues"],
+            concurrency=options["concurrency"],
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+            stale_after=options["stale_after"],
+            burst=options["burst"],
+        )
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        worker.work()
+        self.stdout.write(self.style.SUCCESS(f"Processed {worker.processed} jobs, {worker.failed} failed."))
@@ -0,0 +1,181 @@
+import random
+import traceback
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+def queue_limits():
+    """Per-queue limits on running jobs, from `settings.JOBS_QUEUES`."""
+    return {
+        name: options["concurrency"]
+        for name, options in getattr(settings, "JOBS_QUEUES", {}).items()
+        if options.get("concurrency")
+    }
+
+
+class JobQuerySet(models.QuerySet):
+    def ready(self, queues=None):
+        jobs = self.filter(status=Job.QUEUED, run_at__lte=timezone.now())
+        if queues:
+            jobs = jobs.filter(queue__in=queues)
+        return jobs
+
+    def claim(self, worker, queues=None, limit=1):
+        """
+        Mark up to `limit` runnable jobs as running for `worker` and return them,
+        highest priority first.
+
+        On databases with `SKIP LOCKED` the candidate rows are locked so
+        concurrent workers pick different jobs without waiting on each other.
+        Elsewhere (SQLite) the UPDATE re-checks `status`, so a job another
+        worker claimed in between is simply left out.
+        """
+        connection = connections[self.db]
+        now = timezone.now()
+        with transaction.atomic(using=self.db):
+            limits = {
+                name: limit for name, limit in queue_limits().items()
+                if not queues or name in queues
+            }
+            if limits and connection.vendor == "postgresql":
+                # Serialize claims so the running-jobs count below stays true.
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [zlib.crc32(b"jobs.claim")])
+
+            candidates = self.ready(queues).order_by("-priority", "run_at", "pk")
+            free = {}
+            if limits:
+                running = dict(
+                    self.filter(status=Job.RUNNING, queue__in=limits)
+                    .values_list("queue").annotate(n=Count("pk")).order_by()
+                )
+                free = {name: limit - running.get(name, 0) for name, limit in limits.items()}
+                candidates = candidates.exclude(queue__in=[name for name, n in free.items() if n <= 0])
+
+            if connection.features.has_select_for_update_skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            pks = []
+            for pk, queue in candidates.values_list("pk", "queue")[:limit]:
+                if queue in free:
+                    if free[queue] <= 0:
+                        continue
+                    free[queue] -= 1
+                pks.append(pk)
+            if not pks:
+                return []
+            self.filter(pk__in=pks, status=Job.QUEUED).update(
+                status=Job.RUNNING,
+                attempts=F("attempts") + 1,
+                locked_at=now,
+                locked_by=worker,
+            )
+            claimed = self.filter(pk__in=pks, status=Job.RUNNING, locked_by=worker, locked_at=now)
+            return list(claimed.order_by("-priority", "run_at", "pk"))
+
+    def release(self, pks, worker):
+        """Put jobs `worker` claimed but didn't start back in their queue, attempt not counted."""
+        return self.filter(pk__in=pks, status=Job.RUNNING, locked_by=worker).update(
+            status=Job.QUEUED, attempts=F("attempts") - 1, locked_at=None, locked_by="",
+        )
+
+    def requeue_stale(self, older_than):
+        """
+        Put back jobs whose worker died mid-run, or fail them when that run was
+        their last attempt. Workers refresh `locked_at` of the jobs they're
+        running (see `Worker.heartbeat`), so a long task isn't taken for a
+        dead one. Returns the numbers of jobs requeued and failed.
+        """
+        cutoff = timezone.now() - older_than
+        stale = self.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+        with transaction.atomic(using=self.db):
+            failed = stale.filter(attempts__gte=F("max_attempts")).update(
+                status=Job.FAILED, locked_at=None, locked_by="",
+                last_error="The worker stopped before the job finished.",
+            )
+            requeued = stale.update(status=Job.QUEUED, locked_at=None, locked_by="")
+        return requeued, failed
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+
+    queue = models.CharField(max_length=50, default="default")
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_date = models.DateTimeField(auto_now_add=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-priority", "run_at"],
+                condition=Q(status="queued"),
+                name="jobs_job_ready_idx",
+            ),
+            # Running-jobs counts for queue limits and the stale-job sweep.
+            models.Index(
+                fields=["queue", "locked_at"],
+                condition=Q(status="running"),
+                name="jobs_job_running_idx",
+            ),
+        ]
+
+    # Retry delays grow as base * 2 ** (attempt - 1), capped and jittered.
+    RETRY_BASE = timedelta(seconds=10)
+    RETRY_MAX = timedelta(hours=1)
+
+    def run(self):
+        """Call the task function with the payload and record the outcome."""
+        try:
+            import_string(self.task)(**self.payload)
+        except Exception:
+            self.fail(traceback.format_exc())
+            return False
+        self.status = self.DONE
+        self.locked_at = None
+        self.last_error = ""
+        self.save(update_fields=["status", "locked_at", "last_error", "updated_date"])
+        return True
+
+    def fail(self, error):
+        if self.attempts >= self.max_attempts:
+            self.status = self.FAILED
+        else:
+            self.status = self.QUEUED
+            self.run_at = timezone.now() + self.retry_delay()
+        self.locked_at = None
+        self.locked_by = ""
+        self.last_error = error
+        self.save(update_fields=["status", "run_at", "locked_at", "locked_by", "last_error", "updated_date"])
+
+    def retry_delay(self):
+        delay = min(self.RETRY_BASE * 2 ** max(self.attempts - 1, 0), self.RETRY_MAX)
+        return delay * random.uniform(0.8, 1.2)
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
@@ -0,0 +1,58 @@
+import functools
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+
+def enqueue(task, payload=None, queue="default", priority=0, max_attempts=5, run_at=None):
+    """
+    Store a job that calls `task` (a dotted path or a module-level function)
+    with `payload` as keyword arguments. The payload must be JSON-serializable.
+
+    Once `queue` has its `max_backlog` (from `settings.JOBS_QUEUES`) of jobs
+    ready, a job due now is run in the caller instead, so producers slow down
+    to the workers' pace. It's stored first and retried by the workers if it
+    fails.
+    """
+    if callable(task):
+        task = f"{task.__module__}.{task.__qualname__}"
+    now = timezone.now()
+    run_at = run_at or now
+    inline = run_at <= now and backlogged(queue)
+    job = Job.objects.create(
+        task=task,
+        payload=payload or {},
+        queue=queue,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_at=run_at,
+        **({"status": Job.RUNNING, "attempts": 1, "locked_at": now, "locked_by": "inline"} if inline else {}),
+    )
+    if inline:
+        job.run()
+    return job
+
+
+def backlogged(queue):
+    """Whether `queue` has at least its `max_backlog` of jobs ready to run."""
+    limit = getattr(settings, "JOBS_QUEUES", {}).get(queue, {}).get("max_backlog")
+    if not limit:
+        return False
+    return Job.objects.ready([queue]).order_by()[:limit].count() >= limit
+
+
+def task(queue="default", priority=0, max_attempts=5):
+    """
+    Give a module-level function an `enqueue(**kwargs)` helper that defers it
+    to the job queue with these defaults. Calling the function directly still
+    runs it inline.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def deferred(**kwargs):
+            return enqueue(func, kwargs, queue=queue, priority=priority, max_attempts=max_attempts)
+        func.enqueue = deferred
+        return func
+    return decorator
@@ -0,0 +1,242 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from jobs.tasks import enqueue, task
+from jobs.worker import Worker
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+@task(queue="test")
+def record(value):
+    calls.append(value)
+
+
+def explode():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def test_enqueued_job_runs_once():
+    job = record.enqueue(value="hello")
+    assert job.task == "jobs.tests.test_queue.record"
+    assert job.queue == "test"
+
+    worker = Worker(burst=True)
+    worker.work()
+    assert calls == ["hello"]
+    assert worker.processed == 1
+
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 1
+
+    Worker(burst=True).work()
+    assert calls == ["hello"]
+
+
+def test_higher_priority_runs_first():
+    enqueue(record, {"value": "low"})
+    enqueue(record, {"value": "high"}, priority=10)
+    enqueue(record, {"value": "middle"}, priority=5)
+    Worker(burst=True).work()
+    assert calls == ["high", "middle", "low"]
+
+
+def test_future_jobs_wait():
+    enqueue(record, {"value": "later"}, run_at=timezone.now() + timedelta(minutes=5))
+    Worker(burst=True).work()
+    assert calls == []
+
+
+def test_failed_job_is_retried_with_backoff():
+    job = enqueue(explode, max_attempts=2)
+    Worker(burst=True).work()
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert "RuntimeError: boom" in job.last_error
+    assert job.run_at > timezone.now() + timedelta(seconds=5)
+
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    Worker(burst=True).work()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+
+
+def test_retry_delay_grows_and_is_capped():
+    job = Job(attempts=1)
+    first = job.retry_delay()
+    job.attempts = 4
+    assert job.retry_delay() > first
+    job.attempts = 30
+    assert job.retry_delay() <= Job.RETRY_MAX * 1.2
+
+
+def test_claimed_jobs_are_not_claimed_again():
+    for i in range(3):
+        enqueue(record, {"value": i})
+    first = Job.objects.claim("worker-a", limit=2)
+    second = Job.objects.claim("worker-b", limit=2)
+    assert len(first) == 2
+    assert len(second) == 1
+    assert {job.pk for job in first}.isdisjoint(job.pk for job in second)
+    assert all(job.status == Job.RUNNING for job in first + second)
+
+
+def test_queue_concurrency_limit(settings):
+    settings.JOBS_QUEUES = {"test": {"concurrency": 1}}
+    enqueue(record, {"value": 1}, queue="test")
+    enqueue(record, {"value": 2}, queue="test")
+    enqueue(record, {"value": 3}, queue="other")
+
+    claimed = Job.objects.claim("worker-a", limit=3)
+    assert sorted(job.queue for job in claimed) == ["other", "test"]
+    assert Job.objects.claim("worker-b", queues=["test"]) == []
+
+    claimed[0].run()
+    claimed[1].run()
+    assert len(Job.objects.claim("worker-b", queues=["test"])) == 1
+
+
+def test_stale_jobs_are_requeued():
+    job = enqueue(record, {"value": "stale"})
+    Job.objects.claim("dead-worker")
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+    Worker(burst=True, stale_after=60).work()
+    assert calls == ["stale"]
+
+
+def test_stale_jobs_out_of_attempts_fail():
+    job = enqueue(record, {"value": "stale"}, max_attempts=1)
+    Job.objects.claim("dead-worker")
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+    Worker(burst=True, stale_after=60).work()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.last_error
+    assert calls == []
+
+
+def test_heartbeat_keeps_long_running_jobs():
+    worker = Worker(stale_after=60)
+    mine = enqueue(record, {"value": "long"})
+    Job.objects.claim(f"{worker.name}:0")
+    theirs = enqueue(record, {"value": "dead"})
+    Job.objects.claim("dead-worker:0")
+    Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+    assert worker.heartbeat() == 1
+    assert Job.objects.requeue_stale(timedelta(seconds=60)) == (1, 0)
+    assert Job.objects.get(pk=mine.pk).status == Job.RUNNING
+    assert Job.objects.get(pk=theirs.pk).status == Job.QUEUED
+
+
+def test_jobs_of_a_worker_killed_just_before_a_restart_are_swept(settings):
+    settings.JOBS_QUEUES = {"test": {"concurrency": 1}}
+    record.enqueue(value="interrupted")
+    record.enqueue(value="waiting")
+    killed = Worker(stale_after=60)
+    Job.objects.claim(f"{killed.name}:0")
+
+    # Restarted well within `stale_after`: the killed worker's job still
+    # looks alive and holds the queue's only slot.
+    worker = Worker(burst=True, stale_after=60)
+    assert worker.name != killed.name
+    worker.work()
+    assert calls == []
+
+    # The killed worker's heartbeat stopped, the next sweep frees the slot.
+    Job.objects.filter(status=Job.RUNNING).update(locked_at=timezone.now() - timedelta(seconds=90))
+    assert worker.heartbeat() == 0
+    assert worker.sweep() == (1, 0)
+    worker.work()
+    assert sorted(calls) == ["interrupted", "waiting"]
+
+
+def test_batches_are_claimed_together(monkeypatch):
+    for i in range(5):
+        enqueue(record, {"value": i})
+    claims = []
+    claim = Job.objects.claim
+
+    def counting(*args, **kwargs):
+        claims.append(kwargs["limit"])
+        return claim(*args, **kwargs)
+
+    monkeypatch.setattr(Job.objects, "claim", counting)
+    Worker(burst=True, batch_size=3).work()
+    assert sorted(calls) == list(range(5))
+    # 3, 2 and the empty claim that ends the burst.
+    assert claims == [3, 3, 3]
+
+
+stopping_worker = {}
+
+
+def stop_the_worker():
+    stopping_worker["worker"].stop()
+
+
+def test_stopping_worker_releases_the_rest_of_its_batch():
+    enqueue(stop_the_worker, priority=1)
+    waiting = [enqueue(record, {"value": i}) for i in range(2)]
+    worker = stopping_worker["worker"] = Worker(burst=True, batch_size=3)
+    worker.work()
+    assert worker.processed == 1
+    assert calls == []
+    for job in waiting:
+        job.refresh_from_db()
+        assert (job.status, job.attempts, job.locked_by) == (Job.QUEUED, 0, "")
+
+
+def test_backlogged_queue_runs_new_jobs_inline(settings):
+    settings.JOBS_QUEUES = {"test": {"max_backlog": 2}}
+    record.enqueue(value=1)
+    record.enqueue(value=2)
+    assert calls == []
+    job = record.enqueue(value=3)
+    assert calls == [3]
+    assert (job.status, job.attempts) == (Job.DONE, 1)
+    # Jobs due later wait for the workers anyway.
+    enqueue(record, {"value": 4}, queue="test", run_at=timezone.now() + timedelta(hours=1))
+    assert calls == [3]
+
+
+def test_run_jobs_command():
+    enqueue(record, {"value": "cli"}, queue="test")
+    enqueue(record, {"value": "skipped"}, queue="other")
+    out = StringIO()
+    call_command("run_jobs", "--burst", "--queue", "test", stdout=out)
+    assert calls == ["cli"]
+    assert "Processed 1 jobs, 0 failed." in out.getvalue()
+
+
+def test_password_reset_email_is_queued(django_user_model):
+    user = django_user_model.objects.create_user(email="queued@example.com", password="test1234")
+    response = APIClient().post(
+        reverse("accounts:api-v1:password-reset-request"), {"email": user.email}, format="json"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert mail.outbox == []
+    job = Job.objects.get()
+    assert job.queue == "email"
+
+    Worker(queues=["email"], burst=True).work()
+    assert [m.to for m in mail.outbox] == [[user.email]]
@@ -0,0 +1,122 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import timedelta
+
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Claims and runs jobs from the given queues (all queues when empty).
+
+    `concurrency` threads each claim up to `batch_size` jobs at a time and run
+    them in turn, so a thread's jobs share its connections (e.g. the SMTP one,
+    `accounts.api.utils.EmailConnection`). Claimed jobs count against queue
+    concurrency limits until they've run, and those a stopping worker hasn't
+    started go back to their queue. A single-threaded worker runs in
+    the calling thread. With `burst=True` the worker exits once nothing is
+    runnable instead of polling for more.
+
+    Every quarter of `stale_after` (and on startup) a heartbeat refreshes the
+    `locked_at` of the jobs this worker runs, so tasks may take longer than
+    `stale_after`, and sweeps jobs whose worker hasn't reported in for
+    `stale_after` back into their queue (see `JobQuerySet.requeue_stale`).
+    A worker killed mid-run holds up queue concurrency limits until then.
+    """
+
+    def __init__(self, queues=None, concurrency=1, batch_size=1, poll_interval=1.0, stale_after=600, burst=False):
+        self.queues = list(queues or [])
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stale_after = timedelta(seconds=stale_after)
+        self.heartbeat_interval = max(stale_after / 4, 1)
+        self.burst = burst
+        self.stopping = threading.Event()
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        # Unique per run, a restarted container can reuse the host name and pid.
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def work(self):
+        self.sweep()
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(finished,), name="jobs-heartbeat", daemon=True)
+        heartbeat.start()
+        try:
+            if self.concurrency == 1:
+                self._loop(0)
+                return
+            threads = [
+                threading.Thread(target=self._thread, args=(i,), name=f"jobs-worker-{i}")
+                for i in range(self.concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            finished.set()
+            heartbeat.join()
+
+    def heartbeat(self):
+        """Mark the jobs this worker is running as alive. Returns how many there are."""
+        return Job.objects.filter(status=Job.RUNNING, locked_by__startswith=f"{self.name}:").update(
+            locked_at=timezone.now(),
+        )
+
+    def sweep(self):
+        """Requeue, or fail, the jobs of workers that stopped reporting in."""
+        requeued, failed = Job.objects.requeue_stale(self.stale_after)
+        if requeued or failed:
+            logger.warning("Requeued %d stale jobs, %d out of attempts failed", requeued, failed)
+        return requeued, failed
+
+    def _heartbeat(self, finished):
+        try:
+            while not finished.wait(self.heartbeat_interval):
+                try:
+                    self.heartbeat()
+                    self.sweep()
+                except DatabaseError:
+                    logger.exception("Job heartbeat failed")
+        finally:
+            connection.close()
+
+    def _thread(self, index):
+        try:
+            self._loop(index)
+        finally:
+            connection.close()
+
+    def _loop(self, index):
+        worker = f"{self.name}:{index}"
+        while not self.stopping.is_set():
+            jobs = Job.objects.claim(worker, self.queues, limit=self.batch_size)
+            if not jobs:
+                if self.burst:
+                    break
+                self.stopping.wait(self.poll_interval)
+                continue
+            for i, job in enumerate(jobs):
+                if self.stopping.is_set():
+                    Job.objects.release([job.pk for job in jobs[i:]], worker)
+                    break
+                ok = job.run()
+                if not ok:
+                    logger.warning("Job %s (%s) failed, attempt %d/%d", job.pk, job.task, job.attempts, job.max_attempts)
+                with self._lock:
+                    self.processed += 1
+                    self.failed += not ok